@@ -33,25 +33,69 @@ integration with matplotlib using imshow, colorbar and colorwheel.
 .. moduleauthor:: Glen Fletcher <mail@glenfletcher.com>
 """
 
-from ZtoRGBpy._core import remap, Scale, LinearScale, LogScale, \
-    RGBColorProfile, sRGB_HIGH, sRGB_LOW, sRGB
+from ZtoRGBpy._core import Workspace, Scale, LinearScale, LogScale, RGBColorProfile, sRGB_HIGH, sRGB_LOW, sRGB
+from ZtoRGBpy._kernel import set_backend, get_backend, register_backend
+from ZtoRGBpy._tabulated import TabulatedScale
+from ZtoRGBpy._remapper import remap, Remapper, remap_polar, remap_iq, remap_stream, remap_batch
+from ZtoRGBpy import _backends  # registers the optional backends
+from ZtoRGBpy._fit import fit_scale, ScaleEstimator, MinMaxEstimator, QuantileSketch
+from ZtoRGBpy._lut import LUTRemapper
+from ZtoRGBpy._waterfall import Waterfall
+from ZtoRGBpy._target import RenderTarget
 from ZtoRGBpy._info import __authors__, __copyright__, __license__, \
     __contact__, __version__, __title__, __desc__
 
-try:
-    from ZtoRGBpy._mpl import colorbar, colorwheel, imshow
-except ImportError:
-    # pylint: disable=C0111
-    _mpl_requirement = "Requires matplotlib>=1.3,<3"
 
-    def colorbar():
-        raise NotImplementedError(_mpl_requirement)
+def _load_mpl():
+    """Imports the matplotlib integration, or placeholders if matplotlib isn't available"""
+    try:
+        from ZtoRGBpy._mpl import colorbar, colorwheel, imshow
+    except ImportError:
+        # pylint: disable=C0111
+        _mpl_requirement = "Requires matplotlib>=1.3,<3"
+
+        def colorbar():
+            raise NotImplementedError(_mpl_requirement)
+
+        def colorwheel():
+            raise NotImplementedError(_mpl_requirement)
+
+        def imshow():
+            raise NotImplementedError(_mpl_requirement)
+    return {'colorbar': colorbar, 'colorwheel': colorwheel, 'imshow': imshow}
+
+
+def _load_parallel():
+    from ZtoRGBpy._parallel import ProcessRemapper
+    return {'ProcessRemapper': ProcessRemapper}
+
+
+# Names whose modules are slow to import, matplotlib.pyplot and multiprocessing respectively,
+# which are only imported on first use
+_lazy = {'colorbar': _load_mpl, 'colorwheel': _load_mpl, 'imshow': _load_mpl, 'ProcessRemapper': _load_parallel}
+
+# The lazy names are defined by __getattr__ on first access, which pylint can't see
+# pylint: disable=undefined-all-variable
+__all__ = ['remap', 'remap_polar', 'remap_iq', 'remap_stream', 'remap_batch', 'fit_scale', 'set_backend', 'get_backend',
+           'register_backend', 'Remapper', 'Workspace', 'ProcessRemapper', 'LUTRemapper', 'Waterfall', 'RenderTarget',
+           'Scale', 'LinearScale', 'LogScale', 'TabulatedScale', 'ScaleEstimator', 'MinMaxEstimator', 'QuantileSketch',
+           'RGBColorProfile', 'sRGB_HIGH', 'sRGB_LOW', 'sRGB', 'imshow', 'colorbar', 'colorwheel']
+# pylint: enable=undefined-all-variable
+
+
+def __getattr__(name):
+    if name not in _lazy:
+        raise AttributeError("module 'ZtoRGBpy' has no attribute {0!r:s}".format(name))
+    for key, value in _lazy[name]().items():
+        _real_module[key] = value.__module__
+        value.__module__ = "ZtoRGBpy"
+        globals()[key] = value
+    return globals()[name]
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_lazy))
 
-    def colorwheel():
-        raise NotImplementedError(_mpl_requirement)
-    
-    def imshow():
-        raise NotImplementedError(_mpl_requirement)
 
 _real_module = {}
 
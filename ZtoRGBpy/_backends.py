@@ -0,0 +1,183 @@
+# -*- coding: utf-8 -*-
+# =================================================================================
+#  Copyright 2019 Glen Fletcher <mail@glenfletcher.com>
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+#
+#  All documentation this file as docstrings or comments are licensed under the
+#  Creative Commons Attribution-ShareAlike 4.0 International License; you may
+#  not use this documentation except in compliance with this License.
+#  You may obtain a copy of this License at
+#
+#    https://creativecommons.org/licenses/by-sa/4.0
+#
+# =================================================================================
+"""
+ZtoRGB compute backend module
+
+Provides the optional 'numexpr' and 'numba' backends for the colour stage of the mapping
+
+.. moduleauthor:: Glen Fletcher <mail@glenfletcher.com>
+"""
+from importlib import import_module
+
+import numpy as np
+
+from ZtoRGBpy._core import _LIGHTNESS_CUTOFF, RGBColorProfile
+from ZtoRGBpy._kernel import _ColorKernel, register_backend, _remove_gamma
+
+
+def _gamma_exponent(profile):
+    """Returns the exponent removing the gamma correction of ``profile``, or `None` if it overrides
+    `RGBColorProfile.remove_gamma`, in which case it is applied to the RGB values afterwards"""
+    if type(profile).remove_gamma is not RGBColorProfile.remove_gamma:
+        return None
+    return 1.0 / profile.gamma
+
+
+class _NumExprKernel(_ColorKernel):
+    """Colour stage evaluated by numexpr, computing each channel in a single pass over the data"""
+    def __init__(self, profile, real_type, trans_matrix=None, chroma_limit=None):
+        import numexpr
+        _ColorKernel.__init__(self, profile, real_type, trans_matrix, chroma_limit)
+        self._numexpr = numexpr
+        self._exponent = _gamma_exponent(profile)
+        constant = self.dtype.type
+        self._constants = {'cutoff': constant(1 - _LIGHTNESS_CUTOFF), 'chroma': self.chroma_limit}
+        if self._exponent is None:
+            self._channel = '(k0 * u + k1 * v) * f + l'
+        elif self._exponent == 1:
+            self._channel = 'where((u != u) | (v != v), 0, (k0 * u + k1 * v) * f + l)'
+        else:
+            self._channel = 'where((u != u) | (v != v), 0, ((k0 * u + k1 * v) * f + l) ** e)'
+            self._constants['e'] = constant(self._exponent)
+
+    def __call__(self, data, rgb, workspace):
+        evaluate = self._numexpr.evaluate
+        shape = data.shape
+        values = dict(self._constants, u=data.real, v=data.imag)
+        # The magnitude is computed by numpy, numexpr has no overflow safe equivalent of hypot
+        values['m'] = workspace.get('magnitude', shape, self.dtype)
+        np.abs(data, out=values['m'])
+        values['l'] = workspace.get('luminance', shape, self.dtype)
+        evaluate('(1 - where(m > 1, 1, m) * cutoff) ** 3', values, out=values['l'])
+        values['f'] = workspace.get('chrome', shape, self.dtype)
+        evaluate('where(m == 0, 0, (1 - l) * chroma / m)', values, out=values['f'])
+        channel = workspace.get('channel', shape, self.dtype)
+        for index in range(3):
+            values['k0'], values['k1'] = self.trans_matrix[index]
+            evaluate(self._channel, values, out=channel)
+            rgb[..., index] = channel
+        if self._exponent is None:
+            _remove_gamma(self.profile, rgb)
+            np.copyto(rgb, 0, where=np.isnan(data)[..., np.newaxis])
+        return rgb
+
+
+# Compiled numba functions, created on first use
+_numba = {}
+
+
+def _numba_functions():
+    """Returns the compiled numba functions, compiling them on first use"""
+    if not _numba:
+        import numba
+
+        @numba.njit(nogil=True, cache=True, error_model='numpy')
+        def remove_gamma(value, exponent):
+            if exponent == 2.0:
+                return value * value
+            elif exponent == 1.0:
+                return value
+            elif exponent == 0.5:
+                return np.sqrt(value)
+            return value ** exponent
+
+        @numba.njit(nogil=True, cache=True, error_model='numpy')
+        def remap(u, v, trans_matrix, chroma_limit, cutoff, exponent, rgb):
+            for i in range(u.shape[0]):
+                if np.isnan(u[i]) or np.isnan(v[i]):
+                    rgb[i, 0] = rgb[i, 1] = rgb[i, 2] = 0
+                    continue
+                magnitude = np.hypot(u[i], v[i])
+                luminance = 1 - min(magnitude, 1.0) * cutoff
+                luminance = luminance * luminance * luminance
+                chrome = (1 - luminance) * chroma_limit
+                if magnitude == 0:
+                    magnitude = 1.0
+                for q in range(3):
+                    value = (trans_matrix[q, 0] * u[i] + trans_matrix[q, 1] * v[i]) / magnitude * chrome + luminance
+                    rgb[i, q] = value if exponent == 0 else remove_gamma(value, exponent)
+
+        @numba.njit(nogil=True, cache=True, error_model='numpy')
+        def quantized(u, v, trans_matrix, chroma_limit, cutoff, exponent, channels):
+            for i in range(u.shape[0]):
+                if np.isnan(u[i]) or np.isnan(v[i]):
+                    channels[i, 0] = channels[i, 1] = channels[i, 2] = 0
+                    continue
+                magnitude = np.hypot(u[i], v[i])
+                luminance = 1 - min(magnitude, 1.0) * cutoff
+                luminance = luminance * luminance * luminance
+                chrome = (1 - luminance) * chroma_limit
+                if magnitude == 0:
+                    magnitude = 1.0
+                for q in range(3):
+                    value = (trans_matrix[q, 0] * u[i] + trans_matrix[q, 1] * v[i]) / magnitude * chrome + luminance
+                    value = np.rint(remove_gamma(value, exponent) * 255)
+                    # NaNs, from infinite values, are mapped to 0
+                    channels[i, q] = 255 if value > 255 else value if value >= 0 else 0
+
+        _numba['remap'] = remap
+        _numba['quantized'] = quantized
+    return _numba
+
+
+class _NumbaKernel(_ColorKernel):
+    """Colour stage compiled by numba, computing all the channels of each pixel in a single pass over the data"""
+    def __init__(self, profile, real_type, trans_matrix=None, chroma_limit=None):
+        # Raises ImportError if numba isn't available, the functions are compiled on first use
+        import_module('numba')
+        _ColorKernel.__init__(self, profile, real_type, trans_matrix, chroma_limit)
+        self._exponent = _gamma_exponent(profile)
+        self._matrix = self.trans_matrix.astype(float)
+
+    def _arguments(self, data):
+        data = data.reshape(-1)
+        # An exponent of 0 skips the gamma removal, which is then applied to the RGB values afterwards
+        return (data.real, data.imag, self._matrix, float(self.chroma_limit), 1 - _LIGHTNESS_CUTOFF,
+                0.0 if self._exponent is None else self._exponent)
+
+    def __call__(self, data, rgb, workspace):
+        target = rgb if rgb.flags.c_contiguous else workspace.get('rgb_contiguous', rgb.shape, self.dtype)
+        _numba_functions()['remap'](*self._arguments(data), target.reshape(-1, 3))
+        if target is not rgb:
+            rgb[...] = target
+        if self._exponent is None:
+            _remove_gamma(self.profile, rgb)
+            np.copyto(rgb, 0, where=np.isnan(data)[..., np.newaxis])
+        return rgb
+
+    def quantized(self, data, out, workspace):
+        if self._exponent is None:
+            return _ColorKernel.quantized(self, data, out, workspace)
+        if out.dtype == np.uint32:
+            channels = out.view(np.uint8).reshape(-1, 4)
+            channels[:, 3] = 255
+        else:
+            channels = out.reshape(-1, 3)
+        _numba_functions()['quantized'](*self._arguments(data), channels)
+        return out
+
+
+register_backend('numexpr', _NumExprKernel)
+register_backend('numba', _NumbaKernel)
@@ -0,0 +1,153 @@
+# -*- coding: utf-8 -*-
+# =================================================================================
+#  Copyright 2019 Glen Fletcher <mail@glenfletcher.com>
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+#
+#  All documentation this file as docstrings or comments are licensed under the
+#  Creative Commons Attribution-ShareAlike 4.0 International License; you may
+#  not use this documentation except in compliance with this License.
+#  You may obtain a copy of this License at
+#
+#    https://creativecommons.org/licenses/by-sa/4.0
+#
+# =================================================================================
+"""
+ZtoRGB batch module
+
+Provides the mapping of batches of arrays in a single pass
+
+.. moduleauthor:: Glen Fletcher <mail@glenfletcher.com>
+"""
+from functools import partial
+
+import numpy as np
+
+from ZtoRGBpy._core import Scale, _block_limits, _resolve_precision, _scale_values
+from ZtoRGBpy._kernel import _PIXEL_TYPES, _prepare_out, _remap_formatted
+
+
+def _item_limits(values, workspace, magnitude, computed):
+    """Returns the magnitude limits of ``values``, writing their magnitude to ``magnitude``, and recording that it
+    was computed in the list ``computed``"""
+    computed.append(True)
+    return _block_limits(values, workspace, magnitude)
+
+
+class _BatchMixin(object):
+    """Methods of `Remapper` mapping batches of arrays in a single pass"""
+    def batch(self, items, per_item=False, out=None, return_metadata=False):
+        """Converts a batch of arrays of complex values to RGB triples
+
+        The batch is either a stacked array, whose first axis indexes the items, or a sequence of arrays of
+        any shapes. Rather than mapping each item separately, the whole batch is mapped by a single pass of the
+        colour stage, so the overhead of each call is paid once per batch rather than once per item, which
+        dominates when mapping many small arrays. The result is identical to calling the `Remapper` for each
+        item, with a subclass of `Scale` fitted either to the whole batch, or to each item.
+
+        Parameters
+        ----------
+        items : {`array <numpy.ndarray>` [N, ...], `list` [ `array_like <numpy.asarray>` ]}
+            Complex input data, either stacked along the first axis, or a sequence of arrays, which are copied
+            into a single array before mapping.
+
+        per_item : `bool`, optional, default: `False`
+            Fit a subclass of `Scale` to each item, rather than to the whole batch. Only the scaling is then
+            performed separately for each item. Ignored if ``scale`` is an instance of `Scale`.
+
+        out : {`array <numpy.ndarray>`, `list` [ `array <numpy.ndarray>` ]}, optional, default: `None`
+            Array into which the result of a stacked ``items`` is written, as for `remap`, or for a sequence,
+            a sequence of such arrays, one for each item.
+
+        return_metadata : `bool`, optional, default: `False`
+            Return the scale and profile instance used to generate the mapping.
+
+        Returns
+        -------
+        rgb : {`array <numpy.ndarray>` [N, ..., 3], `list` [ `array <numpy.ndarray>` ]}
+            RGB values of a stacked ``items``, as for `remap`, or for a sequence, a list of the RGB values of
+            each item, which unless ``out`` is given are views of a single array.
+
+        scale : {`Scale`, `list` [ `Scale` ]}
+            Present only if ``return_metadata`` = `True`. The actual `Scale` instance used to map the batch,
+            or if ``per_item`` is `True`, a list of the instance used for each item.
+
+        profile : `RGBColorProfile`
+            Present only if ``return_metadata`` = `True`. The `RGBColorProfile` used to generate the mapping.
+        """
+        workspace = self._workspace.local()
+        stacked = all(hasattr(items, attr) for attr in ('shape', 'dtype', '__getitem__'))
+        if stacked:
+            if len(items.shape) == 0:
+                raise ValueError("items must have at least one dimension.")
+            data, complex_type, real_type = self._input(items)
+            blocks = range(data.shape[0])
+            shapes = [data.shape[1:]] * data.shape[0]
+            batch_out = out = _prepare_out(out, data.shape, self.pixel_format, real_type)
+        else:
+            items = [np.asarray(item) for item in items]
+            complex_type, real_type = _resolve_precision(self.precision,
+                                                         np.result_type(*[item.dtype for item in items] or [float]))
+            shapes = [item.shape for item in items]
+            stops = np.cumsum([item.size for item in items], dtype=int).tolist()
+            blocks = [slice(stop - item.size, stop) for item, stop in zip(items, stops)]
+            data = workspace.get('batch_input', (stops[-1] if stops else 0,), complex_type)
+            for item, block in zip(items, blocks):
+                data[block] = item.reshape(-1)
+            if out is not None:
+                out = list(out)
+                if len(out) != len(items):
+                    raise ValueError("out must contain one array for each item.")
+                for item_out, shape in zip(out, shapes):
+                    _prepare_out(item_out, shape, self.pixel_format, real_type)
+            batch_shape = data.shape if self.pixel_format == 'rgba32' else data.shape + (3,)
+            batch_type = _PIXEL_TYPES.get(self.pixel_format, real_type)
+            if out is None:
+                batch_out = np.empty(batch_shape, batch_type)
+            else:
+                batch_out = workspace.get('batch_out', batch_shape, batch_type)
+        if per_item and not isinstance(self.scale, Scale):
+            scale = self._batch_per_item(data, blocks, shapes, batch_out, workspace, complex_type, real_type)
+        else:
+            batch_out, scale = self._remap(data, self._fit, batch_out, workspace)
+        if stacked:
+            rgb = batch_out
+        else:
+            tail = () if self.pixel_format == 'rgba32' else (3,)
+            rgb = [batch_out[block].reshape(shape + tail) for block, shape in zip(blocks, shapes)]
+            if out is not None:
+                for item_out, item_rgb in zip(out, rgb):
+                    np.copyto(item_out, item_rgb, casting='unsafe')
+                rgb = out
+        if return_metadata:
+            return rgb, scale, self.profile
+        else:
+            return rgb
+
+    def _batch_per_item(self, data, blocks, shapes, out, workspace, complex_type, real_type):
+        """Maps the batch ``data``, fitting the scale to each of the ``blocks``, returning the list of scales"""
+        if self.chunk_bytes is not None or self.workers is not None:
+            return [self._remap(data[block], self._fit, out[block], workspace)[1] for block in blocks]
+        data = np.asarray(data, complex_type)
+        magnitude = workspace.get('input_magnitude', data.shape, real_type)
+        scaled = workspace.get('scaled', data.shape, complex_type)
+        scales = []
+        for block, shape in zip(blocks, shapes):
+            values = data[block].reshape(shape)
+            item_magnitude = magnitude[block].reshape(shape)
+            computed = []
+            scale = self._fit(partial(_item_limits, values, workspace, item_magnitude, computed))
+            _scale_values(values, scale, scaled[block].reshape(shape), item_magnitude if computed else None)
+            scales.append(scale)
+        _remap_formatted(scaled, self._cached_kernel(real_type), self.pixel_format, out, workspace)
+        return scales
@@ -25,13 +25,18 @@
 """
 ZtoRGB core module
 
-Provides all core functions
+Provides the scales, color profiles and scratch buffers, and the helpers shared by the mapping
 
 .. moduleauthor:: Glen Fletcher <mail@glenfletcher.com>
 """
+import operator
+import threading
 from collections.abc import Sequence, Mapping
+from contextlib import contextmanager
 from copy import copy
+from functools import reduce
 from inspect import getfullargspec
+from weakref import WeakKeyDictionary
 
 import numpy as np
 
@@ -57,20 +62,55 @@ class Scale(object):
     def __init__(self):
         pass
 
-    def __call__(self, value):
+    def __call__(self, value, magnitude=None, out=None):
         """Transform value with scaling function
 
         This method must be overridden by the subclass to define the transformation.
 
+        Subclasses whose ``__call__`` only accepts ``value`` are still supported, `remap` then copies the
+        returned array into its own buffer, rather than passing it as ``out``.
+
         Parameters
         ----------
         value: `array_like <numpy.asarray>` [...]
             Array of value to be transformed, by the scaling function.
+        magnitude: `array <numpy.ndarray>` [ ``value.shape`` ], optional, default: `None`
+            Precomputed ``abs(value)``, which may be used rather than computing it again, must not be modified.
+        out: `array <numpy.ndarray>` [ ``value.shape`` ], optional, default: `None`
+            Array into which the result is written, rather than allocating a new array.
 
         Returns
         -------
         scaled: `array <numpy.ndarray>` [ ``value.shape`` ]
-            Scaled transformation (:math:`T(v)`) of ``value`` such that :math:`0 \le |T(v)| \le 1`.
+            Scaled transformation (:math:`T(v)`) of ``value`` such that :math:`0 \le |T(v)| \le 1`,
+            ``out`` if given.
+        """
+        raise NotImplementedError()
+
+    def polar(self, magnitude, out=None):
+        """Transform values given by their magnitude
+
+        This method may be overridden by subclasses whose transformation has the form
+
+        .. math::
+            T(v) = A(|v|) + \\frac{v}{|v|} \\cdot G(|v|)
+
+        with a real offset :math:`A` and gain :math:`G`, as for the built in scales, allowing `remap_polar` to
+        map values given as a magnitude and phase without forming the complex values.
+
+        Parameters
+        ----------
+        magnitude: `array <numpy.ndarray>` [...]
+            Non-negative magnitudes :math:`|v|` of the values to be transformed, must not be modified.
+        out: `array <numpy.ndarray>` [ ``magnitude.shape`` ], optional, default: `None`
+            Array into which the gain is written, rather than allocating a new array.
+
+        Returns
+        -------
+        offset: {`float`, `array <numpy.ndarray>` [ ``magnitude.shape`` ]}
+            Offset :math:`A(|v|)`, a `float` if it doesn't depend on :math:`|v|`.
+        gain: `array <numpy.ndarray>` [ ``magnitude.shape`` ]
+            Gain :math:`G(|v|)`, ``out`` if given.
         """
         raise NotImplementedError()
 
@@ -186,8 +226,20 @@ class LinearScale(Scale):
         Scale.__init__(self)
         self.mag = float(vmax)
 
-    def __call__(self, value):
-        return np.asarray(value) / self.mag
+    def __call__(self, value, magnitude=None, out=None):
+        return np.divide(value, self.mag, out=out)
+
+    def polar(self, magnitude, out=None):
+        return 0.0, np.divide(magnitude, self.mag, out=out)
+
+    def _real(self, value, magnitude=None, out=None):
+        # Equal to the real part of __call__(value + 0j), as complex division by a real value multiplies by its
+        # reciprocal
+        return np.multiply(value, 1 / value.dtype.type(self.mag), out=out)
+
+    def _rescaled(self, factor):
+        """Returns the scale transforming ``v`` as this scale transforms ``v * factor``"""
+        return LinearScale(self.mag / factor)
 
     def ticks(self):
         """Returns a list of tick marks suitable for a colorbar
@@ -240,19 +292,25 @@ class LogScale(Scale):
         self.__args = [vmin, vmax]
         self.__kwargs = {'lmax': lmax}
         Scale.__init__(self)
-        self.logmin = np.log10(vmin)
-        self.logmax = np.log10(vmax)
+        self.logmin = float(np.log10(vmin))
+        self.logmax = float(np.log10(vmax))
         self.lightness_max = lmax
         self.lightness_buf = 1.0 - lmax
-        self.factor = self.lightness_max/(self.logmax-self.logmin)
+        # Divided as numpy values, giving inf or nan rather than raising for vmin == vmax, such as when fitted to
+        # data of constant magnitude
+        self.factor = float(np.float64(self.lightness_max) / (self.logmax - self.logmin))
 
-    def __call__(self, value):
+    def __call__(self, value, magnitude=None, out=None):
         """Transform value with scaling function
 
         Parameters
         ----------
         value: `array_like <numpy.asarray>` [...]
             Array of values to be transformed, by the scaling function.
+        magnitude: `array <numpy.ndarray>` [ ``value.shape`` ], optional, default: `None`
+            Precomputed ``abs(value)``, computed if not given.
+        out: `array <numpy.ndarray>` [ ``value.shape`` ], optional, default: `None`
+            Array into which the result is written, rather than allocating a new array.
 
         Returns
         -------
@@ -270,9 +328,46 @@ class LogScale(Scale):
 
         """
         value = np.asarray(value)
-        avalue = abs(value)
-        return self.lightness_buf+(value*(np.log10(avalue) -
-                                          self.logmin)/avalue)*self.factor
+        if magnitude is None:
+            magnitude = np.abs(value)
+        # The logarithm is computed into out, unless it's the value itself, multiplying it by the value as before
+        # as the product is commutative
+        logvalue = np.log10(magnitude, out=None if out is None or np.may_share_memory(out, value) else out)
+        logvalue -= self.logmin
+        out = np.multiply(value, logvalue, out=out)
+        out /= magnitude
+        out *= self.factor
+        out += self.lightness_buf
+        return out
+
+    def polar(self, magnitude, out=None):
+        zero = magnitude == 0
+        gain = np.log10(magnitude, out=out)
+        gain -= self.logmin
+        gain *= self.factor
+        # As for __call__, where v / |v| is undefined at zero
+        np.copyto(gain, np.nan, where=zero)
+        return self.lightness_buf, gain
+
+    def _real(self, value, magnitude=None, out=None):
+        # Equal to the real part of __call__(value + 0j), as complex division by a real value multiplies by its
+        # reciprocal. The given magnitude is overwritten by its reciprocal
+        if magnitude is None:
+            magnitude = np.abs(value)
+        logvalue = np.log10(magnitude, out=None if out is None or np.may_share_memory(out, value) else out)
+        logvalue -= self.logmin
+        out = np.multiply(value, logvalue, out=out)
+        out *= np.divide(1, magnitude, out=magnitude)
+        out *= self.factor
+        out += self.lightness_buf
+        return out
+
+    def _rescaled(self, factor):
+        """Returns the scale transforming ``v`` as this scale transforms ``v * factor``"""
+        scale = copy(self)
+        scale.logmin = self.logmin - float(np.log10(factor))
+        scale.logmax = self.logmax - float(np.log10(factor))
+        return scale
 
     def ticks(self):
         """Returns a list of tick marks suitable for a colorbar
@@ -353,7 +448,7 @@ class RGBColorProfile(object):
         return red_ratio, blue_ratio
 
     # noinspection PyPep8Naming
-    def remove_gamma(self, RGB):
+    def remove_gamma(self, RGB, out=None):
         """Removes gamma correction from color
 
         Parameters
@@ -361,6 +456,9 @@ class RGBColorProfile(object):
         RGB : `array_like <numpy.asarray>` [...]
             gamma corrected RGB color values
 
+        out : `array <numpy.ndarray>` [ ``RGB.shape`` ], optional, default: `None`
+            Array into which the result is written, may be ``RGB`` itself to remove the gamma correction in place.
+
         Returns
         -------
         rgb : `array <numpy.ndarray>` [ ``RGB.shape`` ]
@@ -370,7 +468,7 @@ class RGBColorProfile(object):
         -----
         Equivalent to :math:`{rgb} = {RGB}^{\\frac{1}{\\gamma}}`
         """
-        return np.asarray(RGB) ** (1.0 / self.gamma)
+        return np.power(RGB, 1.0 / self.gamma, out=out)
 
     def apply_gamma(self, rgb):
         """Applies gamma correction to color
@@ -466,14 +564,7 @@ class RGBColorProfile(object):
         The limiting chroma is computed from the transformation matrix
         as described in Fletcher 2019\ :cite:`RGBColorProfile-fletcher2019`.
         """
-        trans_matrix = self.get_transform()
-        chroma_limit = [trans_matrix[0, 1], trans_matrix[2, 0]]
-        kg2 = (trans_matrix[1, 0] ** 2 + trans_matrix[1, 1] ** 2)
-        chroma_limit.append(- ((trans_matrix[1, 0] + np.sqrt(kg2)) * kg2 /
-                               (kg2 + trans_matrix[1, 0] * np.sqrt(kg2))))
-        chroma_limit.append(- ((trans_matrix[1, 0] - np.sqrt(kg2)) * kg2 /
-                               (kg2 - trans_matrix[1, 0] * np.sqrt(kg2))))
-        return 1 / max(chroma_limit)
+        return _chroma_limit(self.get_transform())
 
     def __repr__(self):
         return "{0:s}.{1:s}({2!r:s}, {3:g})".format(type(self).__module__,
@@ -481,6 +572,17 @@ class RGBColorProfile(object):
                                                     self.weights, self.gamma)
 
 
+def _chroma_limit(trans_matrix):
+    """Returns the limiting chroma for the transformation matrix ``trans_matrix``"""
+    chroma_limit = [trans_matrix[0, 1], trans_matrix[2, 0]]
+    kg2 = (trans_matrix[1, 0] ** 2 + trans_matrix[1, 1] ** 2)
+    chroma_limit.append(- ((trans_matrix[1, 0] + np.sqrt(kg2)) * kg2 /
+                           (kg2 + trans_matrix[1, 0] * np.sqrt(kg2))))
+    chroma_limit.append(- ((trans_matrix[1, 0] - np.sqrt(kg2)) * kg2 /
+                           (kg2 - trans_matrix[1, 0] * np.sqrt(kg2))))
+    return 1 / max(chroma_limit)
+
+
 # pylint: disable=C0103
 # These constants should start with lowercase s, as this is the correct
 # usage, for writing sRGB
@@ -490,63 +592,104 @@ sRGB = copy(sRGB_HIGH)
 # pylint: enable=C0103
 
 
-def remap(data, scale=None, profile=None, return_int=False, return_metadata=False, **kwargs):
-    """Converts an array of complex values to RGB triples
-
-    For 2d arrays of complex numbers the returned array is suitable
-    for passing to `pyplot.imshow <matplotlib.pyplot.imshow>` from matplotlib.
-
-    Parameters
-    ----------
-    data : `array_like <numpy.asarray>` [...]
-        Complex input data.
-
-    scale : {`Scale`, 'linear', 'log'}, optional, default: `None`
-        Use to define the magnitude scaling of the data. Data is transformed by this object to a interval
-        of :math:`[0.0, 1.0]`
-
-        If passed an instance of `Scale`, then this instance is use to scale the data.
-
-        If passed a subclass of `Scale`, an instance is then created of this subclass, as
-        ``scale([min(abs(data)),] max(abs(data)), **kwargs)``.
-
-        'linear' or `None` are equivalent to passing `LinearScale`, while 'log' is equivalent to passing `LogScale`
+class Workspace(object):
+    """Reusable scratch buffers for `remap`
 
-    profile: {`RGBColorProfile`, 'srgb', 'srgb_high', 'srgb_low'}, optional, default: `None`
-        ColorProfile representing the RGB colorspace to convert the complex data to.
+    Holds the intermediate arrays used by `remap`, so that repeated calls on data of the same shape
+    reuse the same memory rather than allocating new temporaries on every call.
 
-        'srgb' or `None` are equivalent to passing `sRGB`, while 'srgb_high' or 'srgb_low' are respectively
-        equivalent to passing `sRGB_HIGH` or `sRGB_LOW`.
+    A `Workspace` must not be shared between concurrent calls of `remap`, except through `Workspace.local`.
 
-    return_int : `bool`, optional, default: `False`
-        If true, returns integers in the interval :math:`[0, 255]`
-        rather than floats in the interval :math:`[0.0, 1.0]`.
-
-    return_metadata : `bool`, optional, default: `False`
-        Return the scale and profile instance used to generate the mapping.
-
-    Other Parameters
-    ----------------
-    **kwargs :
-        These parameters are passed to the ``scale`` class when creating an automatic instance for scaling.
-
-    Returns
+    Example
     -------
-    rgb : `array <numpy.ndarray>` [ ``data.shape``, 3]
-        Array containing RGB color values with the last dimension representing the RGB triplets.
 
-        If ``return_int`` is `False` then the values are floating point in the interval :math:`[0.0, 1.0]`.
+        >>> import ZtoRGBpy
+        >>> import numpy as np
+        >>> workspace = ZtoRGBpy.Workspace()
+        >>> rgb = np.empty((64, 64, 3))
+        >>> for frame in frames:
+        ...     ZtoRGBpy.remap(frame, scale=ZtoRGBpy.LinearScale(2.0), out=rgb, workspace=workspace)
+    """
+    def __init__(self):
+        self._buffers = {}
+        self._views = {}
+        # Keyed by the thread, so the workspace of a thread is released with it
+        self._locals = WeakKeyDictionary()
+        self._lock = threading.Lock()
 
-        If ``return_int`` is `True` then the values are integers in the interval :math:`[0, 255]`.
+    def get(self, name, shape, dtype):
+        """Returns the named scratch buffer, allocating it only if the existing buffer is too small or of a different
+        ``dtype``
 
-    scale : `Scale`
-        Present only if ``return_metadata`` = `True`. The actual `Scale` instance used to generate the mapping.
+        Parameters
+        ----------
+        name: `str`
+            Name of the buffer
+        shape: `tuple` [ `int`, ...]
+            Required shape of the buffer
+        dtype: `dtype <numpy.dtype>`
+            Required data type of the buffer
 
-    profile : `RGBColorProfile`
-        Present only if ``return_metadata`` = `True`. The actual `RGBColorProfile`
-        instance used to generate the mapping.
-    """
-    data = np.asarray(data, complex)
+        Returns
+        -------
+        buffer: `array <numpy.ndarray>` [ ``shape`` ]
+            Uninitialised contiguous buffer
+        """
+        key = (name, shape, dtype)
+        view = self._views.get(key)
+        if view is not None:
+            return view
+        shape = tuple(shape)
+        dtype = np.dtype(dtype)
+        size = reduce(operator.mul, shape, 1)
+        buffer = self._buffers.get(name)
+        if buffer is None or buffer.size < size or buffer.dtype != dtype:
+            buffer = np.empty(shape, dtype)
+            self._buffers[name] = buffer
+            self._views = {view_key: view for view_key, view in self._views.items() if view_key[0] != name}
+        view = buffer.reshape(-1)[:size].reshape(shape)
+        if len(self._views) >= 64:
+            self._views.clear()
+        self._views[key] = view
+        return view
+
+    def local(self):
+        """Returns a `Workspace` private to the calling thread
+
+        Returns
+        -------
+        workspace: `Workspace`
+            The same `Workspace` is returned for every call from a given thread, and released once the thread
+            has exited.
+        """
+        thread = threading.current_thread()
+        with self._lock:
+            workspace = self._locals.get(thread)
+            if workspace is None:
+                workspace = Workspace()
+                self._locals[thread] = workspace
+        return workspace
+
+    def clear(self):
+        """Releases all scratch buffers, including those of the thread local workspaces"""
+        self._buffers.clear()
+        self._views.clear()
+        with self._lock:
+            self._locals.clear()
+
+    @property
+    def nbytes(self):
+        """`int`: Total size in bytes of all scratch buffers, including those of the thread local workspaces"""
+        with self._lock:
+            workspaces = list(self._locals.values())
+        return (sum(buffer.nbytes for buffer in self._buffers.values()) +
+                sum(workspace.nbytes for workspace in workspaces))
+
+
+_LIGHTNESS_CUTOFF = (4 ** (1 / 3.0)) / 2
+
+
+def _resolve_profile(profile):
     if profile is None or isinstance(profile, str) and profile.lower() == 'srgb':
         profile = sRGB
     elif isinstance(profile, str) and profile.lower() == 'srgb_high':
@@ -555,44 +698,207 @@ def remap(data, scale=None, profile=None, return_int=False, return_metadata=Fals
         profile = sRGB_LOW
     if not isinstance(profile, RGBColorProfile):
         raise ValueError("profile can't be converted to an instance of RGBColorProfile.")
+    return profile
 
+
+def _scale_class(scale):
+    """Returns the `Scale` subclass named by ``scale``, or ``scale`` itself if it isn't a name"""
     if scale is None or isinstance(scale, str) and scale.lower() == 'linear':
         scale = LinearScale
     elif isinstance(scale, str) and scale.lower() == 'log':
         scale = LogScale
+    return scale
+
+
+def _scale_num_args(scale):
+    """Returns the number of positional arguments accepted by the `Scale` subclass ``scale``"""
+    return len(getfullargspec(scale).args) - 1
+
+
+def _resolve_scale(scale, limits, kwargs, num_args=None):
+    scale = _scale_class(scale)
     if isinstance(scale, type) and issubclass(scale, Scale):
-        spec = getfullargspec(scale)
-        num_args = len(spec.args) - 1
+        if num_args is None:
+            num_args = _scale_num_args(scale)
         if num_args == 0:
             scale = scale(**kwargs)
         elif num_args == 1:
-            scale = scale(np.nanmax(np.abs(data)), **kwargs)
+            scale = scale(limits()[1], **kwargs)
         elif num_args > 1:
-            scale = scale(np.nanmin(np.abs(data)), np.nanmax(np.abs(data)), **kwargs)
+            scale = scale(*limits(), **kwargs)
     if not isinstance(scale, Scale):
         raise ValueError("scale can't be converted to an instance of Scale.")
+    return scale
+
+
+# Number of values processed at a time by blockwise stages, small enough for the intermediate results to stay in cache
+_BLOCK_SIZE = 65536
+
+
+def _block_limits(values, workspace=None, magnitude=None):
+    """Returns the minimum and maximum magnitude of ``values``, ignoring NaNs
+
+    The magnitude is computed and reduced `_BLOCK_SIZE` values at a time, while still in cache, rather than
+    creating a temporary array of the magnitude of all the ``values``. If ``magnitude`` is given, the
+    magnitude of all the values is also written to it, for use by the `Scale`. Integer ``values`` are converted
+    to `float`, as by `remap`, a block at a time, before taking their magnitude, so it can't overflow.
+    """
+    values = np.reshape(values, -1)
+    integer = values.dtype.kind in 'biu'
+    if magnitude is not None:
+        blocks = magnitude.reshape(-1)
+    else:
+        if workspace is None:
+            workspace = Workspace()
+        blocks = workspace.get('limits', (min(values.size, _BLOCK_SIZE),),
+                               np.dtype(float) if integer else np.finfo(values.dtype).dtype)
+    vmin = vmax = np.nan
+    for start in range(0, values.size, _BLOCK_SIZE):
+        stop = min(start + _BLOCK_SIZE, values.size)
+        block = blocks[start:stop] if magnitude is not None else blocks[:stop - start]
+        if integer:
+            np.copyto(block, values[start:stop], casting='unsafe')
+            np.abs(block, out=block)
+        else:
+            np.abs(values[start:stop], out=block)
+        vmin = np.fmin(vmin, np.fmin.reduce(block))
+        vmax = np.fmax(vmax, np.fmax.reduce(block))
+    return vmin, vmax
+
+
+def _merge_limits(limits, other):
+    return np.fmin(limits[0], other[0]), np.fmax(limits[1], other[1])
+
 
-    trans_matrix = profile.get_transform()
-    chroma_limit = profile.get_chroma_limit()
-    lightness_cutoff = (4 ** (1 / 3.0)) / 2
-    data = np.asarray(scale(data), complex)
-    nan = np.isnan(data)
-    data[nan] = 0
-    magnitude = np.abs(data).reshape(*(data.shape + (1,)))
-    data = data.view(float).reshape(*(data.shape + (2,)))
-    luminance = (1-(1-lightness_cutoff)*np.clip(magnitude, 0, 1))**3
-    chrome = chroma_limit*(1-luminance)
-    rbg = np.einsum('qz,...z->...q', trans_matrix, data)
-    rbg /= (magnitude > 0)*magnitude + (magnitude == 0)
-    rbg *= chrome
-    rbg += luminance
-    rbg = profile.remove_gamma(rbg)
-    rbg[nan, :] = 0
-    if return_int:
-        ret = (rbg * 255).astype('i8')
+def _magnitude_limits(data, blocks, value_type, mapper=map, workspace=None):
+    """Returns the minimum and maximum magnitude of ``data``, ignoring NaNs, reading one block at a time,
+    converted to ``value_type``
+
+    If ``mapper`` isn't `map` the blocks are reduced concurrently, using a separate child of ``workspace``
+    for each thread.
+    """
+    if workspace is None:
+        workspace = Workspace()
+
+    def block_limits(block):
+        block_workspace = workspace if mapper is map else workspace.local()
+        return _block_limits(np.asarray(data[block], value_type), block_workspace)
+    return reduce(_merge_limits, mapper(block_limits, blocks), (np.nan, np.nan))
+
+
+@contextmanager
+def _executor(workers):
+    """Provides an `Executor` for ``workers``, which is either `None`, the number of threads or an `Executor`"""
+    if workers is None:
+        yield None
+        return
+    # Imported here, as concurrent.futures is slow to import and only needed when using threads
+    from concurrent.futures import Executor, ThreadPoolExecutor
+    if isinstance(workers, Executor):
+        yield workers
     else:
-        ret = rbg
-    if return_metadata:
-        return ret, scale, profile
+        with ThreadPoolExecutor(int(workers)) as executor:
+            yield executor
+
+
+# Memory used to map each tile, when mapping using multiple threads
+_TILE_BYTES = 2 ** 22
+
+
+def _row_blocks(shape, chunk_bytes, real_type):
+    """Splits the first axis of ``shape`` into blocks of rows, requiring approximately ``chunk_bytes`` to map"""
+    if chunk_bytes is None or len(shape) == 0:
+        return [Ellipsis]
+    # Bytes per value of the converted input, scale output, scratch buffers and RGB result
+    value_bytes = 12 * real_type.itemsize + 2
+    row_bytes = value_bytes * int(np.prod(shape[1:]))
+    rows = max(1, int(chunk_bytes) // max(1, row_bytes))
+    return [slice(start, start + rows) for start in range(0, shape[0], rows)]
+
+
+def _check_out(out, shape, kinds):
+    if not isinstance(out, np.ndarray):
+        raise ValueError("out must be an instance of numpy.ndarray.")
+    if out.shape != shape:
+        raise ValueError("out must have shape {0!r:s}, not {1!r:s}.".format(shape, out.shape))
+    if out.dtype.kind not in kinds and out.dtype.char not in kinds:
+        raise ValueError("out can't have dtype {0!s:s}.".format(out.dtype))
+
+
+_PRECISIONS = {'double': (np.dtype(complex), np.dtype(float)),
+               'single': (np.dtype(np.complex64), np.dtype(np.float32))}
+
+
+def _resolve_precision(precision, dtype):
+    if precision is None:
+        precision = 'double'
+    elif isinstance(precision, str) and precision.lower() == 'auto':
+        if np.result_type(dtype, np.complex64) == np.complex64:
+            precision = 'single'
+        else:
+            precision = 'double'
+    if not isinstance(precision, str) or precision.lower() not in _PRECISIONS:
+        raise ValueError("precision must be one of 'double', 'single' or 'auto'.")
+    return _PRECISIONS[precision.lower()]
+
+
+# The `Scale.__call__` implementations transforming each value independently, allowing data to be scaled in tiles,
+# extended by `TabulatedScale`
+_ELEMENTWISE_CALLS = {LinearScale.__call__, LogScale.__call__}
+
+# The `Scale.__call__` implementations using the magnitude of the values, which is then computed into the workspace
+# rather than allocated by the scale, extended by `TabulatedScale`
+_MAGNITUDE_CALLS = {LogScale.__call__}
+
+
+class _Planes(object):
+    """Complex array like view of separate ``real`` and ``imag`` planes, combined one block at a time when read,
+    and multiplied by ``factor`` if given"""
+
+    def __init__(self, real=None, imag=None, factor=None):
+        self.factor = factor
+        if real is None and imag is None:
+            raise ValueError("data or at least one of real and imag must be given.")
+        self.real = None if real is None else np.asarray(real)
+        self.imag = None if imag is None else np.asarray(imag)
+        planes = [plane for plane in (self.real, self.imag) if plane is not None]
+        if len(planes) == 2 and planes[0].shape != planes[1].shape:
+            raise ValueError("real and imag must have the same shape.")
+        self.shape = planes[0].shape
+        self.dtype = np.result_type(*([plane.dtype for plane in planes] + [np.complex64]))
+
+    def __getitem__(self, index):
+        block = np.zeros((self.real if self.real is not None else self.imag)[index].shape, self.dtype)
+        if self.real is not None:
+            block.real = self.real[index]
+        if self.imag is not None:
+            block.imag = self.imag[index]
+        if self.factor is not None:
+            block *= self.factor
+        return block
+
+    def __array__(self, dtype=None, copy=None):
+        return np.asarray(self[...], dtype)
+
+
+# Whether the ``__call__`` of each `Scale` subclass accepts the ``magnitude`` and ``out`` arguments
+_SCALE_OUT = {}
+
+
+def _scale_accepts_out(scale):
+    """Returns whether ``scale`` supports the ``magnitude`` and ``out`` arguments of `Scale.__call__`"""
+    call = type(scale).__call__
+    if call not in _SCALE_OUT:
+        spec = getfullargspec(call)
+        _SCALE_OUT[call] = spec.varkw is not None or {'magnitude', 'out'} <= set(spec.args + spec.kwonlyargs)
+    return _SCALE_OUT[call]
+
+
+def _scale_values(values, scale, out, magnitude=None):
+    """Writes ``scale(values)`` to ``out``, ``magnitude`` is ``abs(values)`` if already known"""
+    if _scale_accepts_out(scale):
+        result = scale(values, magnitude=magnitude, out=out)
     else:
-        return ret
+        result = scale(values)
+    if result is not out:
+        np.copyto(out, result)
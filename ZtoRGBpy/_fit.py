@@ -0,0 +1,386 @@
+# -*- coding: utf-8 -*-
+# =================================================================================
+#  Copyright 2019 Glen Fletcher <mail@glenfletcher.com>
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+#
+#  All documentation this file as docstrings or comments are licensed under the
+#  Creative Commons Attribution-ShareAlike 4.0 International License; you may
+#  not use this documentation except in compliance with this License.
+#  You may obtain a copy of this License at
+#
+#    https://creativecommons.org/licenses/by-sa/4.0
+#
+# =================================================================================
+"""
+ZtoRGB scale fitting module
+
+Provides fitting of scales to a sample or percentiles of the data, and mergeable estimators for fitting scales
+to data read in parts
+
+.. moduleauthor:: Glen Fletcher <mail@glenfletcher.com>
+"""
+import numpy as np
+
+from ZtoRGBpy._core import _BLOCK_SIZE, _block_limits, _merge_limits, _resolve_scale
+
+
+def _sample_indices(size, sample, sampling, seed):
+    """Returns the sorted flat indices of ``sample`` values out of ``size``"""
+    if sampling == 'strided':
+        return (np.arange(sample) * (size / sample)).astype(np.intp)
+    indices = np.random.RandomState(seed).randint(0, size, sample)
+    indices.sort()
+    return indices
+
+
+def fit_scale(data, scale=None, sample=None, percentile=None, sampling='random', seed=0, **kwargs):
+    """Fits a scale to the magnitude of a sample of the data, or of all the data
+
+    Equivalent to the automatic instance created by `remap` when passed a subclass of `Scale`, except that
+    the magnitude limits may be estimated from a sample of the data, and may be percentiles of the magnitude
+    rather than its minimum and maximum, so that a few extreme values don't compress the range of the
+    remaining data. The returned instance can then be passed to `remap`, `Remapper` or `remap_stream`.
+
+    Parameters
+    ----------
+    data : `array_like <numpy.asarray>` [...]
+        Complex input data, may be a `numpy.memmap`, in which case only the sampled values are read.
+
+    scale : {`Scale`, 'linear', 'log'}, optional, default: `None`
+        Subclass of `Scale` to fit, as for `remap`.
+
+    sample : `int`, optional, default: `None`
+        Number of values used to estimate the limits, if `None` or at least ``data.size``, all the values are
+        used and the limits are exact.
+
+    percentile : `tuple` [ `float`, `float` ], optional, default: `None`
+        Lower and upper percentiles of the magnitude, in the interval :math:`[0, 100]`, used as the minimum and
+        maximum magnitude, such as (0.1, 99.9). If `None`, the minimum and maximum magnitude are used.
+
+    sampling : {'random', 'strided'}, optional, default: 'random'
+        How the ``sample`` values are chosen, either uniformly at random (with replacement), or evenly spaced
+        over the flattened ``data``. Strided sampling is deterministic, but the error bounds below only hold for
+        random sampling, a strided sample can miss periodic structure in the data.
+
+    seed : `int`, optional, default: 0
+        Seed for the random sampling.
+
+    Other Parameters
+    ----------------
+    **kwargs :
+        These parameters are passed to the ``scale`` class when creating the instance.
+
+    Returns
+    -------
+    scale : `Scale`
+        Fitted instance of ``scale``.
+
+    Notes
+    -----
+    For a random sample of :math:`n` values, the Dvoretzky-Kiefer-Wolfowitz inequality bounds the difference
+    between the fraction of the sample and the fraction of all the data below any magnitude, such that with
+    probability :math:`1 - \\alpha`, the difference is at most
+
+    .. math::
+        \\epsilon = \\sqrt{\\frac{\\ln(2 / \\alpha)}{2 n}}
+
+    Hence a limit estimated as the :math:`p` percentile of the sample lies between the :math:`p - 100 \\epsilon`
+    and :math:`p + 100 \\epsilon` percentiles of all the data, and for the minimum and maximum at most a
+    fraction :math:`\\epsilon` of the data lies outside the estimated limits. With :math:`\\alpha = 10^{-3}`
+
+    ============  ================================
+    ``sample``    :math:`100 \\epsilon` (percent)
+    ============  ================================
+    10000         1.95
+    100000        0.62
+    1000000       0.20
+    ============  ================================
+
+    so estimating the 0.1 and 99.9 percentiles needs a sample of about :math:`10^7` values, for which
+    :math:`100 \\epsilon = 0.062`, while the 1 and 99 percentiles are estimated well by :math:`10^6` values.
+
+    Example
+    -------
+
+        >>> import ZtoRGBpy
+        >>> field = numpy.load('field.npy', mmap_mode='r')
+        >>> scale = ZtoRGBpy.fit_scale(field, 'log', sample=1000000, percentile=(1, 99))
+        >>> rgb = ZtoRGBpy.remap(field, scale, chunk_bytes=2**26)
+    """
+    if sampling not in ('random', 'strided'):
+        raise ValueError("sampling must be one of 'random' or 'strided'.")
+    if percentile is not None and (len(percentile) != 2 or not 0 <= percentile[0] <= percentile[1] <= 100):
+        raise ValueError("percentile must be a pair of increasing percentiles in the interval [0, 100].")
+    if sample is not None and int(sample) < 1:
+        raise ValueError("sample must be at least 1.")
+
+    def limits():
+        values = np.asarray(data)
+        if values.ndim == 0:
+            values = values.reshape(1)
+        if sample is not None and int(sample) < values.size:
+            indices = _sample_indices(values.size, int(sample), sampling, seed)
+            values = values[np.unravel_index(indices, values.shape)]
+        if percentile is None:
+            return _block_limits(values)
+        if values.dtype.kind in 'biu':
+            # abs of the minimum signed integer overflows
+            values = values.astype(float)
+        return tuple(np.nanpercentile(np.abs(values), percentile))
+    return _resolve_scale(scale, limits, kwargs)
+
+
+class ScaleEstimator(object):
+    """Abstract base class for mergeable estimators of the magnitude limits used to fit a `Scale`
+
+    An estimator is updated with each part of the data in turn, and estimators of separate parts of the data,
+    possibly in separate processes, are merged, before fitting a `Scale` to the combined estimate. Estimators
+    are picklable, so can be returned from worker processes.
+
+    Example
+    -------
+
+        >>> import functools, multiprocessing, ZtoRGBpy
+        >>> def sketch(path):
+        ...     return ZtoRGBpy.QuantileSketch((1, 99)).update(numpy.load(path, mmap_mode='r'))
+        >>> with multiprocessing.Pool() as pool:
+        ...     sketches = pool.map(sketch, glob.glob('fields/*.npy'))
+        >>> scale = functools.reduce(ZtoRGBpy.QuantileSketch.merge, sketches).to_scale('log')
+    """
+    def update(self, data):
+        """Updates the estimate with the magnitude of ``data``
+
+        This method must be overridden by the subclass.
+
+        Parameters
+        ----------
+        data : `array_like <numpy.asarray>` [...]
+            Part of the complex input data, NaNs are ignored.
+
+        Returns
+        -------
+        estimator : `ScaleEstimator`
+            This estimator.
+        """
+        raise NotImplementedError()
+
+    def merge(self, other):
+        """Updates the estimate with that of another estimator of the same type
+
+        This method must be overridden by the subclass.
+
+        Parameters
+        ----------
+        other : `ScaleEstimator`
+            Estimator of another part of the data.
+
+        Returns
+        -------
+        estimator : `ScaleEstimator`
+            This estimator.
+        """
+        raise NotImplementedError()
+
+    def limits(self):
+        """Returns the estimated minimum and maximum magnitude
+
+        This method must be overridden by the subclass.
+
+        Returns
+        -------
+        vmin : `float`
+            Estimated minimum magnitude, NaN if there is no data.
+        vmax : `float`
+            Estimated maximum magnitude, NaN if there is no data.
+        """
+        raise NotImplementedError()
+
+    def to_scale(self, scale=None, **kwargs):
+        """Fits a scale to the estimated limits
+
+        Parameters
+        ----------
+        scale : {`Scale`, 'linear', 'log'}, optional, default: `None`
+            Subclass of `Scale` to fit, as for `remap`.
+
+        Other Parameters
+        ----------------
+        **kwargs :
+            These parameters are passed to the ``scale`` class when creating the instance.
+
+        Returns
+        -------
+        scale : `Scale`
+            Fitted instance of ``scale``.
+        """
+        return _resolve_scale(scale, self.limits, kwargs)
+
+    def _check_merge(self, other):
+        if type(other) is not type(self):
+            raise ValueError("other must be an instance of {0:s}.".format(type(self).__name__))
+
+
+class MinMaxEstimator(ScaleEstimator):
+    """Exact minimum and maximum magnitude
+
+    Fits the same `Scale` as `remap` would if passed all the data at once.
+    """
+    def __init__(self):
+        ScaleEstimator.__init__(self)
+        self.vmin = np.nan
+        self.vmax = np.nan
+
+    def update(self, data):
+        self.vmin, self.vmax = (float(limit) for limit in _merge_limits((self.vmin, self.vmax),
+                                                                         _block_limits(np.asarray(data))))
+        return self
+
+    def merge(self, other):
+        self._check_merge(other)
+        self.vmin, self.vmax = (float(limit) for limit in _merge_limits((self.vmin, self.vmax),
+                                                                         (other.vmin, other.vmax)))
+        return self
+
+    def limits(self):
+        return self.vmin, self.vmax
+
+    def __repr__(self):
+        return "{0:s}.{1:s}(vmin={2:g}, vmax={3:g})".format(type(self).__module__, type(self).__name__,
+                                                           self.vmin, self.vmax)
+
+
+class QuantileSketch(ScaleEstimator):
+    """Approximate percentiles of the magnitude, from a histogram with logarithmically spaced bins
+
+    Parameters
+    ----------
+    percentile : `tuple` [ `float`, `float` ], optional, default: `None`
+        Lower and upper percentiles of the magnitude used as the limits, in the interval :math:`[0, 100]`,
+        such as (0.1, 99.9). If `None`, the exact minimum and maximum magnitude are used.
+
+    resolution : `int`, optional, default: 100
+        Number of bins per decade of magnitude.
+
+    Notes
+    -----
+    Each magnitude is counted in a bin of relative width :math:`10^{1 / resolution}`, and a percentile is
+    estimated as the geometric centre of the bin containing it, so the estimate has a relative error of at
+    most :math:`10^{1 / (2 \\cdot resolution)} - 1`, 1.16% for the default ``resolution``. The 0 and 100
+    percentiles are exact. The memory used is proportional to the number of decades spanned by the data,
+    and doesn't depend on the amount of data.
+    """
+    def __init__(self, percentile=None, resolution=100):
+        ScaleEstimator.__init__(self)
+        if percentile is not None and (len(percentile) != 2 or not 0 <= percentile[0] <= percentile[1] <= 100):
+            raise ValueError("percentile must be a pair of increasing percentiles in the interval [0, 100].")
+        if int(resolution) < 1:
+            raise ValueError("resolution must be at least 1.")
+        self.percentile = percentile
+        self.resolution = int(resolution)
+        self.vmin = np.nan
+        self.vmax = np.nan
+        self.zeros = 0
+        self.infinite = 0
+        self.offset = 0
+        self.counts = np.zeros(0, np.int64)
+
+    @property
+    def count(self):
+        """Number of values, excluding NaNs, counted by the sketch"""
+        return self.zeros + self.infinite + int(self.counts.sum())
+
+    def _add_counts(self, offset, counts):
+        if self.counts.size == 0:
+            self.offset, self.counts = offset, counts.astype(np.int64)
+            return
+        start = min(self.offset, offset)
+        stop = max(self.offset + self.counts.size, offset + counts.size)
+        if start != self.offset or stop != self.offset + self.counts.size:
+            merged = np.zeros(stop - start, np.int64)
+            merged[self.offset - start:self.offset - start + self.counts.size] = self.counts
+            self.offset, self.counts = start, merged
+        self.counts[offset - start:offset - start + counts.size] += counts
+
+    def update(self, data):
+        values = np.reshape(np.asarray(data), -1)
+        for start in range(0, values.size, _BLOCK_SIZE):
+            block = values[start:start + _BLOCK_SIZE]
+            # Integers are converted as by remap, so the magnitude can't overflow
+            magnitude = np.abs(block.astype(float) if block.dtype.kind in 'biu' else block)
+            magnitude = magnitude[~np.isnan(magnitude)]
+            if magnitude.size == 0:
+                continue
+            self.vmin = float(np.fmin(self.vmin, magnitude.min()))
+            self.vmax = float(np.fmax(self.vmax, magnitude.max()))
+            finite = np.isfinite(magnitude)
+            self.infinite += int(magnitude.size - np.count_nonzero(finite))
+            positive = magnitude[finite & (magnitude > 0)]
+            self.zeros += int(np.count_nonzero(finite) - positive.size)
+            if positive.size:
+                index = np.floor(np.log10(positive) * self.resolution).astype(np.int64)
+                offset = int(index.min())
+                self._add_counts(offset, np.bincount(index - offset))
+        return self
+
+    def merge(self, other):
+        self._check_merge(other)
+        if other.resolution != self.resolution:
+            raise ValueError("other must have the same resolution.")
+        self.vmin = float(np.fmin(self.vmin, other.vmin))
+        self.vmax = float(np.fmax(self.vmax, other.vmax))
+        self.zeros += other.zeros
+        self.infinite += other.infinite
+        if other.counts.size:
+            self._add_counts(other.offset, other.counts)
+        return self
+
+    def quantile(self, percentile):
+        """Returns the estimated percentile of the magnitude
+
+        Parameters
+        ----------
+        percentile : `float`
+            Percentile in the interval :math:`[0, 100]`.
+
+        Returns
+        -------
+        magnitude : `float`
+            Estimated magnitude, NaN if there is no data.
+        """
+        count = self.count
+        if count == 0:
+            return np.nan
+        if percentile <= 0:
+            return self.vmin
+        if percentile >= 100:
+            return self.vmax
+        rank = int(np.floor(percentile / 100.0 * (count - 1)))
+        if rank < self.zeros:
+            return 0.0
+        rank -= self.zeros
+        cumulative = np.cumsum(self.counts)
+        if cumulative.size == 0 or rank >= cumulative[-1]:
+            return np.inf
+        index = int(np.searchsorted(cumulative, rank, side='right'))
+        magnitude = 10 ** ((self.offset + index + 0.5) / self.resolution)
+        return float(min(max(magnitude, self.vmin), self.vmax))
+
+    def limits(self):
+        if self.percentile is None:
+            return self.vmin, self.vmax
+        return self.quantile(self.percentile[0]), self.quantile(self.percentile[1])
+
+    def __repr__(self):
+        return "{0:s}.{1:s}({2!r:s}, resolution={3:d})".format(type(self).__module__, type(self).__name__,
+                                                               self.percentile, self.resolution)
@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+# =================================================================================
+#  Copyright 2019 Glen Fletcher <mail@glenfletcher.com>
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+#
+#  All documentation this file as docstrings or comments are licensed under the
+#  Creative Commons Attribution-ShareAlike 4.0 International License; you may
+#  not use this documentation except in compliance with this License.
+#  You may obtain a copy of this License at
+#
+#    https://creativecommons.org/licenses/by-sa/4.0
+#
+# =================================================================================
+"""
+ZtoRGB I/Q module
+
+Provides the mapping of buffers of interleaved I/Q samples
+
+.. moduleauthor:: Glen Fletcher <mail@glenfletcher.com>
+"""
+import numpy as np
+
+from ZtoRGBpy._core import _ELEMENTWISE_CALLS, _Planes
+
+
+class _IQMixin(object):
+    """Methods of `Remapper` mapping buffers of interleaved I/Q samples"""
+    def iq(self, buffer, dtype='int16', shape=None, full_scale=None, out=None, workspace=None,
+           return_metadata=False):
+        """Converts a buffer of interleaved I/Q samples to RGB triples
+
+        The samples are read in place from ``buffer`` using `numpy.frombuffer`, and converted one tile at a time
+        as they are mapped, so neither the samples nor the complex values are copied in full. The normalisation
+        of the samples by ``full_scale`` is folded into the scale, if it is a `LinearScale`, `LogScale` or
+        `TabulatedScale`, which then maps the samples directly, otherwise each tile is normalised as it is
+        converted. The result is that of mapping ``(I + 1j * Q) / full_scale``, up to rounding.
+
+        Parameters
+        ----------
+        buffer : `buffer_like`
+            Object exposing the buffer interface, such as `bytes`, `bytearray`, `memoryview` or an array,
+            containing pairs of in-phase (I) and quadrature (Q) samples.
+
+        dtype : `data-type <numpy.dtype>`, optional, default: 'int16'
+            Type of each sample, usually 'int16' or 'int8', though any signed integer or floating point type is
+            accepted.
+
+        shape : `tuple` [ `int` ], optional, default: `None`
+            Shape of the mapped data, the number of I/Q pairs, defaults to a 1d array of all the pairs.
+
+        full_scale : `float`, optional, default: `None`
+            Sample value corresponding to a magnitude of one, the scale and the limits used to fit it are in
+            these units. Defaults to the magnitude of the most negative value of an integer ``dtype``, e.g. 32768
+            for 'int16', and 1 for floating point types.
+
+        out : `array <numpy.ndarray>`, optional, default: `None`
+            Array into which the result is written, as for `remap`.
+
+        workspace : `Workspace`, optional, default: `None`
+            Scratch buffers to use for the intermediate results, as for calling the `Remapper`.
+
+        return_metadata : `bool`, optional, default: `False`
+            Return the scale and profile instance used to generate the mapping.
+
+        Returns
+        -------
+        rgb : `array <numpy.ndarray>` [ ``shape``, 3]
+            RGB values, as for `remap`.
+
+        scale : `Scale`
+            Present only if ``return_metadata`` = `True`. The actual `Scale` instance used to generate the mapping,
+            in units of ``full_scale``.
+
+        profile : `RGBColorProfile`
+            Present only if ``return_metadata`` = `True`. The `RGBColorProfile` used to generate the mapping.
+        """
+        dtype = np.dtype(dtype)
+        if dtype.kind not in 'if':
+            raise ValueError("dtype must be a signed integer or floating point type.")
+        samples = np.frombuffer(buffer, dtype)
+        if samples.size % 2 != 0:
+            raise ValueError("buffer must contain a whole number of I/Q pairs.")
+        if shape is None:
+            shape = (samples.size // 2,)
+        pairs = samples.reshape(tuple(shape) + (2,))
+        if full_scale is None:
+            full_scale = -float(np.iinfo(dtype).min) if dtype.kind == 'i' else 1.0
+        factor = 1.0 / full_scale
+        scale_type = self.scale if isinstance(self.scale, type) else type(self.scale)
+        fold = scale_type.__call__ in _ELEMENTWISE_CALLS and hasattr(scale_type, '_rescaled')
+        data = _Planes(pairs[..., 0], pairs[..., 1], None if fold else factor)
+        scale = None
+
+        def fit(limits):
+            nonlocal scale
+            if fold:
+                scale = self._fit(lambda: tuple(limit * factor for limit in limits()))
+                return scale._rescaled(factor)
+            scale = self._fit(limits)
+            return scale
+        out = self._remap(data, fit, out, workspace)[0]
+        if return_metadata:
+            return out, scale, self.profile
+        else:
+            return out
@@ -0,0 +1,375 @@
+# -*- coding: utf-8 -*-
+# =================================================================================
+#  Copyright 2019 Glen Fletcher <mail@glenfletcher.com>
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+#
+#  All documentation this file as docstrings or comments are licensed under the
+#  Creative Commons Attribution-ShareAlike 4.0 International License; you may
+#  not use this documentation except in compliance with this License.
+#  You may obtain a copy of this License at
+#
+#    https://creativecommons.org/licenses/by-sa/4.0
+#
+# =================================================================================
+"""
+ZtoRGB kernel module
+
+Provides the colour stage of the mapping, and the registry of its backends
+
+.. moduleauthor:: Glen Fletcher <mail@glenfletcher.com>
+"""
+from inspect import getfullargspec
+
+import numpy as np
+
+from ZtoRGBpy._core import RGBColorProfile, sRGB, _BLOCK_SIZE, _LIGHTNESS_CUTOFF, _MAGNITUDE_CALLS, _check_out, \
+    _chroma_limit, _scale_values
+
+
+def _gamma_stage(profile):
+    """Returns a function ``gamma(channel, out)`` removing the gamma correction of ``profile``, specialised for
+    the gamma of the built in profiles, or `None` if ``profile`` overrides `RGBColorProfile.remove_gamma`"""
+    if type(profile).remove_gamma is not RGBColorProfile.remove_gamma:
+        return None
+    exponent = 1.0 / profile.gamma
+    if exponent == 1:
+        return lambda channel, out: np.copyto(out, channel)
+    elif exponent == 2:
+        return lambda channel, out: np.square(channel, out=out)
+    elif exponent == 0.5:
+        return lambda channel, out: np.sqrt(channel, out=out)
+    return lambda channel, out: np.power(channel, exponent, out=out)
+
+
+# Whether the ``remove_gamma`` of each `RGBColorProfile` subclass accepts the ``out`` argument
+_GAMMA_OUT = {}
+
+
+def _remove_gamma(profile, rgb):
+    """Removes the gamma correction of ``profile`` from ``rgb`` in place, using `RGBColorProfile.remove_gamma`,
+    which may be overridden without the ``out`` argument, or return a new array"""
+    remove_gamma = type(profile).remove_gamma
+    if remove_gamma not in _GAMMA_OUT:
+        spec = getfullargspec(remove_gamma)
+        _GAMMA_OUT[remove_gamma] = spec.varkw is not None or 'out' in spec.args + spec.kwonlyargs
+    if _GAMMA_OUT[remove_gamma]:
+        result = profile.remove_gamma(rgb, out=rgb)
+    else:
+        result = profile.remove_gamma(rgb)
+    if result is not rgb:
+        np.copyto(rgb, result)
+    return rgb
+
+
+class _ColorKernel(object):
+    """Colour stage of the mapping, converting scaled complex values to RGB for a given profile and precision
+
+    The stage is specialised for the profile when created. Each RGB channel is computed separately, using only
+    the non-zero elements of its row of the transform matrix, and the gamma correction is removed by squaring,
+    copying or a square root for a gamma of 0.5, 1 or 2 respectively, giving exactly the same result as the full
+    matrix product and `RGBColorProfile.remove_gamma`.
+
+    Subclasses may replace the computation, by overriding `__call__` and optionally `quantized`.
+    """
+    def __init__(self, profile, real_type, trans_matrix=None, chroma_limit=None):
+        if trans_matrix is None:
+            trans_matrix = profile.get_transform()
+        if chroma_limit is None:
+            chroma_limit = _chroma_limit(trans_matrix)
+        self.profile = profile
+        self.dtype = np.dtype(real_type)
+        self.trans_matrix = np.asarray(trans_matrix, self.dtype)
+        self.chroma_limit = self.dtype.type(chroma_limit)
+        # The transforms of the built in profiles have zeros at [0, 0] and [2, 1], which are skipped
+        self._rows = [[(axis, self.trans_matrix[channel, axis]) for axis in range(2)
+                       if self.trans_matrix[channel, axis] != 0] for channel in range(3)]
+        self._gamma = _gamma_stage(profile)
+
+    def __call__(self, data, rgb, workspace):
+        """Maps scaled complex ``data`` to RGB, writing the result to ``rgb``, ``data`` may be overwritten
+
+        All intermediate results use the floating point type of the kernel.
+        """
+        shape = data.shape
+        nan = workspace.get('nan', shape, bool)
+        np.isnan(data, out=nan)
+        has_nan = nan.any()
+        if has_nan:
+            np.copyto(data, 0, where=nan)
+        magnitude = workspace.get('magnitude', shape, self.dtype)
+        np.abs(data, out=magnitude)
+        return self._planar(data.real, data.imag, magnitude, nan if has_nan else None, rgb, workspace)
+
+    def planar(self, u, v, magnitude, rgb, workspace):
+        """Maps scaled values given as separate real ``u`` and imaginary ``v`` planes to RGB, writing the result
+        to ``rgb``, ``magnitude`` is ``abs(u + 1j * v)``, all three may be overwritten
+
+        ``v`` may be `None` for real values, skipping the imaginary terms of the transform.
+        """
+        nan = workspace.get('nan', u.shape, bool)
+        np.isnan(u, out=nan)
+        if v is not None:
+            nan |= np.isnan(v)
+        has_nan = nan.any()
+        if has_nan:
+            for plane in (u, v, magnitude):
+                if plane is not None:
+                    np.copyto(plane, 0, where=nan)
+        return self._planar(u, v, magnitude, nan if has_nan else None, rgb, workspace)
+
+    def _planar(self, u, v, magnitude, nan, rgb, workspace):
+        """Colour stage shared by `__call__` and `planar`, with NaNs already replaced by zero and marked by ``nan``"""
+        shape = magnitude.shape
+        luminance = workspace.get('luminance', shape, self.dtype)
+        np.clip(magnitude, 0, 1, out=luminance)
+        luminance *= 1 - _LIGHTNESS_CUTOFF
+        np.subtract(1, luminance, out=luminance)
+        luminance **= 3
+        chrome = workspace.get('chrome', shape, self.dtype)
+        np.subtract(1, luminance, out=chrome)
+        chrome *= self.chroma_limit
+        # Avoid division by zero for zero magnitudes, the uv components are zero anyway
+        zero = workspace.get('zero', shape, bool)
+        np.equal(magnitude, 0, out=zero)
+        np.copyto(magnitude, 1, where=zero)
+        uv = (u, v)
+        channel = workspace.get('channel', shape, self.dtype)
+        term = workspace.get('term', shape, self.dtype)
+        for index, row in enumerate(self._rows):
+            if v is None:
+                # Adding the zero imaginary terms doesn't change the sum
+                row = [(axis, factor) for axis, factor in row if axis == 0]
+            if not row:
+                channel[...] = 0
+            for position, (axis, factor) in enumerate(row):
+                np.multiply(uv[axis], factor, out=term if position else channel)
+                if position:
+                    channel += term
+            channel /= magnitude
+            channel *= chrome
+            channel += luminance
+            if self._gamma is None:
+                rgb[..., index] = channel
+            else:
+                self._gamma(channel, rgb[..., index])
+        if self._gamma is None:
+            _remove_gamma(self.profile, rgb)
+        if nan is not None:
+            np.copyto(rgb, 0, where=nan[..., np.newaxis])
+        return rgb
+
+    def quantized(self, data, out, workspace):
+        """Maps scaled complex ``data`` to 8 bit RGB or RGBA, writing the result to ``out``
+
+        The mapping is performed in blocks of `_BLOCK_SIZE` values, with each block rounded and clipped
+        directly into ``out``, so the floating point RGB values are never fully materialised.
+        """
+        return self._quantized(self, (data,), out, workspace)
+
+    def planar_quantized(self, u, v, magnitude, out, workspace):
+        """Maps scaled values given as separate planes, as for `planar`, to 8 bit RGB or RGBA, as for `quantized`"""
+        return self._quantized(self.planar, (u, v, magnitude), out, workspace)
+
+    def _quantized(self, stage, planes, out, workspace):
+        """Maps ``planes`` to 8 bit RGB or RGBA in blocks, calling ``stage(*blocks, rgb, workspace)`` for each"""
+        if out.dtype == np.uint32:
+            channels = out.view(np.uint8).reshape(-1, 4)
+            channels[:, 3] = 255
+        else:
+            channels = out.reshape(-1, 3)
+        planes = [None if plane is None else plane.reshape(-1) for plane in planes]
+        for start in range(0, planes[0].size, _BLOCK_SIZE):
+            blocks = [None if plane is None else plane[start:start + _BLOCK_SIZE] for plane in planes]
+            rgb = workspace.get('rgb', blocks[0].shape + (3,), self.dtype)
+            stage(*blocks, rgb, workspace)
+            rgb *= 255
+            np.rint(rgb, out=rgb)
+            np.clip(rgb, 0, 255, out=rgb)
+            np.copyto(channels[start:start + _BLOCK_SIZE, :3], rgb, casting='unsafe')
+        return out
+
+
+# Colour stage kernels by backend name, see `register_backend`
+_BACKENDS = {'numpy': _ColorKernel}
+_DEFAULT_BACKEND = {'name': 'numpy'}
+
+
+def register_backend(name, kernel):
+    """Registers a backend implementing the colour stage of the mapping
+
+    Parameters
+    ----------
+    name : `str`
+        Name of the backend, as passed to `set_backend` or the ``engine`` argument of `remap`, replacing any
+        existing backend of the same name.
+
+    kernel : `type`
+        Kernel class, usually a subclass of ``get_backend('numpy')``, created as
+        ``kernel(profile, real_type, trans_matrix, chroma_limit)`` for each profile and precision, and then
+        called as ``kernel(data, rgb, workspace)`` to map scaled complex ``data`` to the RGB values ``rgb``,
+        and as ``kernel.quantized(data, out, workspace)`` to map it to 8 bit RGB or packed RGBA ``out``.
+        Optionally it may also implement ``kernel.planar(u, v, magnitude, rgb, workspace)`` and
+        ``kernel.planar_quantized(u, v, magnitude, out, workspace)``, mapping the scaled values given as separate
+        real ``u`` and imaginary ``v`` planes, ``v`` may be `None` for real values, with ``magnitude`` their
+        magnitude, as used by `remap_polar`, all three may be overwritten. Otherwise the planes are combined to
+        complex values, and mapped as above. The kernel must set ``kernel.dtype`` to ``numpy.dtype(real_type)``,
+        as ``get_backend('numpy')`` does, it is the type of the ``rgb`` values and of the workspace buffers
+        passed to the kernel. Creating the kernel should raise `ImportError` if the backend isn't available.
+    """
+    if not isinstance(name, str):
+        raise ValueError("name must be a str.")
+    _BACKENDS[name] = kernel
+
+
+def get_backend(name=None):
+    """Returns the kernel class of a backend
+
+    Parameters
+    ----------
+    name : `str`, optional, default: `None`
+        Name of the backend, defaults to that set by `set_backend`.
+
+    Returns
+    -------
+    kernel : `type`
+        Kernel class of the backend, see `register_backend`.
+    """
+    if name is None:
+        name = _DEFAULT_BACKEND['name']
+    if name not in _BACKENDS:
+        raise ValueError("engine must be one of {0:s}.".format(", ".join(repr(key) for key in sorted(_BACKENDS))))
+    return _BACKENDS[name]
+
+
+def set_backend(name):
+    """Sets the default backend used for the colour stage of the mapping
+
+    The 'numpy' backend is the reference implementation, and is always available. The 'numexpr' and 'numba'
+    backends require the corresponding optional package, and compute each pixel in a single pass, rather than
+    one pass over all the pixels for each step of the mapping. Their RGB values differ from the 'numpy'
+    backend by rounding errors only, of at most :math:`10^{-6}` for single precision, and :math:`10^{-14}` for
+    double precision, so integer values may differ by one level. Which backend is fastest depends on the
+    machine, numexpr uses multiple threads, while the numba backend releases the GIL, so can be combined with
+    the ``workers`` argument of `remap`.
+
+    Parameters
+    ----------
+    name : {'numpy', 'numexpr', 'numba'}
+        Name of a registered backend, see `register_backend`.
+
+    Raises
+    ------
+    ImportError
+        If the backend isn't available.
+    """
+    get_backend(name)(sRGB, float)
+    _DEFAULT_BACKEND['name'] = name
+
+
+_PIXEL_FORMATS = {'float': 'f', 'int': 'iu', 'uint8': 'B', 'rgba32': 'I'}
+_PIXEL_TYPES = {'int': np.dtype('i8'), 'uint8': np.dtype(np.uint8), 'rgba32': np.dtype(np.uint32)}
+
+
+def _combine_planes(u, v, workspace):
+    """Returns the complex values with real part ``u`` and imaginary part ``v``, or zero if ``v`` is `None`"""
+    combined = workspace.get('planes_combined', u.shape, np.result_type(u.dtype, np.complex64))
+    combined.real = u
+    combined.imag = 0 if v is None else v
+    return combined
+
+
+def _remap_formatted(data, kernel, pixel_format, out, workspace):
+    """Maps scaled complex ``data`` to RGB values of the given ``pixel_format`` using ``kernel``,
+    writing the result to ``out`` if it's not `None`
+
+    ``data`` may also be a tuple of the separate planes passed to `_ColorKernel.planar`.
+    """
+    planar = isinstance(data, tuple)
+    if planar and not (hasattr(kernel, 'planar') and hasattr(kernel, 'planar_quantized')):
+        # Kernels registered without the optional planar methods are passed the combined complex values
+        data, planar = _combine_planes(data[0], data[1], workspace), False
+    shape = (data[0] if planar else data).shape + (3,)
+    if pixel_format in ('uint8', 'rgba32'):
+        if out is None:
+            out = np.empty(shape[:-1] if pixel_format == 'rgba32' else shape, _PIXEL_TYPES[pixel_format])
+        if planar:
+            return kernel.planar_quantized(*data, out, workspace)
+        return kernel.quantized(data, out, workspace)
+    real_type = kernel.dtype
+    if pixel_format == 'int':
+        rgb = workspace.get('rgb', shape, real_type)
+    elif out is not None and out.dtype == real_type:
+        rgb = out
+    elif out is not None:
+        rgb = workspace.get('rgb', shape, real_type)
+    else:
+        rgb = np.empty(shape, real_type)
+    if planar:
+        kernel.planar(*data, rgb, workspace)
+    else:
+        kernel(data, rgb, workspace)
+    if pixel_format == 'int':
+        if out is None:
+            out = np.empty(shape, 'i8')
+        return np.multiply(rgb, 255, out=out, casting='unsafe')
+    if out is not None and rgb is not out:
+        np.copyto(out, rgb, casting='unsafe')
+        return out
+    return rgb
+
+
+def _resolve_pixel_format(pixel_format, return_int):
+    if pixel_format is None:
+        pixel_format = 'int' if return_int else 'float'
+    if pixel_format not in _PIXEL_FORMATS:
+        raise ValueError("pixel_format must be one of 'float', 'int', 'uint8' or 'rgba32'.")
+    return pixel_format
+
+
+def _prepare_out(out, shape, pixel_format, real_type):
+    """Checks ``out`` is suitable for the result of mapping data of the given ``shape``, or creates it if `None`"""
+    if pixel_format != 'rgba32':
+        shape = shape + (3,)
+    if out is None:
+        return np.empty(shape, _PIXEL_TYPES.get(pixel_format, real_type))
+    _check_out(out, shape, _PIXEL_FORMATS[pixel_format])
+    if pixel_format in ('uint8', 'rgba32') and not out.flags.c_contiguous:
+        raise ValueError("out must be C contiguous.")
+    return out
+
+
+def _remap_block(values, scale, kernel, pixel_format, out, workspace, magnitude=None):
+    """Scales and maps a block of complex ``values`` using ``kernel``, writing the result to ``out``,
+    ``magnitude`` is ``abs(values)`` if already known
+
+    Real ``values`` are scaled by the ``_real`` method of the scales in `_ELEMENTWISE_CALLS`, giving exactly
+    the real part of scaling them as complex values. The imaginary part is then zero, or NaN only where the real
+    part isn't finite, so unless the scaled values include infinities they are mapped using only their real part,
+    skipping the imaginary terms of the colour stage.
+    """
+    if magnitude is None and type(scale).__call__ in _MAGNITUDE_CALLS:
+        magnitude = np.abs(values, out=workspace.get('input_magnitude', values.shape, np.finfo(values.dtype).dtype))
+    if values.dtype.kind == 'f':
+        scaled = scale._real(values, magnitude, out=workspace.get('scaled_real', values.shape, values.dtype))
+        if not np.isinf(scaled).any():
+            scaled_magnitude = workspace.get('scaled_magnitude', values.shape, values.dtype)
+            np.abs(scaled, out=scaled_magnitude)
+            _remap_formatted((scaled, None, scaled_magnitude), kernel, pixel_format, out, workspace)
+            return
+        values = np.asarray(values, np.result_type(values.dtype, np.complex64))
+        # _real may have overwritten the magnitude
+        magnitude = None
+    scaled = workspace.get('scaled', values.shape, values.dtype)
+    _scale_values(values, scale, scaled, magnitude)
+    _remap_formatted(scaled, kernel, pixel_format, out, workspace)
@@ -36,7 +36,7 @@ import matplotlib.pyplot as plt
 import numpy as np
 from matplotlib.axes import SubplotBase
 
-from ZtoRGBpy._core import remap
+from ZtoRGBpy._remapper import remap, remap_polar
 
 
 def colorbar(mappable=None, ax=None, cax=None, scale=None, profile=None, use_gridspec=True, **kw):
@@ -148,7 +148,7 @@ def colorbar(mappable=None, ax=None, cax=None, scale=None, profile=None, use_gri
         magnitude, phase = np.meshgrid(magnitude, phase)
         extent = [0, 1.0, 0, np.pi * 2]
         long_axis, short_axis = cax.xaxis, cax.yaxis
-    z_cb = cax.imshow(remap(magnitude * np.exp(1j * phase), profile=profile),
+    z_cb = cax.imshow(remap_polar(magnitude, phase, profile=profile),
                       aspect="auto",
                       extent=extent)
     short_axis.set_visible(False)
@@ -0,0 +1,251 @@
+# -*- coding: utf-8 -*-
+# =================================================================================
+#  Copyright 2019 Glen Fletcher <mail@glenfletcher.com>
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+#
+#  All documentation this file as docstrings or comments are licensed under the
+#  Creative Commons Attribution-ShareAlike 4.0 International License; you may
+#  not use this documentation except in compliance with this License.
+#  You may obtain a copy of this License at
+#
+#    https://creativecommons.org/licenses/by-sa/4.0
+#
+# =================================================================================
+"""
+ZtoRGB parallel module
+
+Provides mapping using a pool of processes, exchanging data through shared memory
+
+.. moduleauthor:: Glen Fletcher <mail@glenfletcher.com>
+"""
+import multiprocessing
+import os
+import sys
+import weakref
+from functools import partial, reduce
+
+import numpy as np
+
+try:
+    from multiprocessing import resource_tracker, shared_memory
+except ImportError:
+    shared_memory = None
+
+from ZtoRGBpy._core import Scale, Workspace, _TILE_BYTES, _block_limits, _merge_limits, _resolve_precision, \
+    _resolve_profile, _resolve_scale, _row_blocks, _scale_class
+from ZtoRGBpy._kernel import get_backend, _prepare_out, _remap_block, _resolve_pixel_format
+
+# State of a worker process, initialised once per pool
+_worker = {}
+
+
+def _init_worker(scale, profile, backend):
+    _worker['scale'] = scale
+    _worker['profile'] = profile
+    _worker['backend'] = backend
+    _worker['kernels'] = {}
+    _worker['workspace'] = Workspace()
+    _worker['shared'] = {}
+
+
+def _open_shared(name):
+    """Attaches to an existing shared memory block, without taking ownership of it"""
+    if sys.version_info >= (3, 13):
+        # track was added in python 3.13, pylint checks the call against the python it runs on
+        return shared_memory.SharedMemory(name, track=False)  # pylint: disable=unexpected-keyword-arg
+    # Otherwise the block is registered with the resource tracker shared with the parent, which already tracks it,
+    # see `ProcessRemapper.__init__`
+    return shared_memory.SharedMemory(name)
+
+
+def _attach(role, spec):
+    """Returns an array backed by the shared memory block described by ``spec``,
+    attaching to the block only when it differs from that last used for ``role``"""
+    name, shape, dtype = spec
+    shared = _worker['shared']
+    if role not in shared or shared[role].name != name:
+        if role in shared:
+            shared[role].close()
+        shared[role] = _open_shared(name)
+    return np.ndarray(shape, dtype, buffer=shared[role].buf)
+
+
+def _worker_limits(data_spec, block):
+    return _block_limits(_attach('data', data_spec)[block], _worker['workspace'])
+
+
+def _worker_remap(data_spec, out_spec, scale, pixel_format, real_type, block):
+    data = _attach('data', data_spec)
+    out = _attach('out', out_spec)
+    if real_type not in _worker['kernels']:
+        _worker['kernels'][real_type] = _worker['backend'](_worker['profile'], real_type)
+    if scale is None:
+        scale = _worker['scale']
+    _remap_block(data[block], scale, _worker['kernels'][real_type], pixel_format, out[block], _worker['workspace'])
+
+
+def _release(pool, shared):
+    """Shuts down the worker processes of ``pool`` and releases the shared memory blocks in ``shared``"""
+    pool.close()
+    pool.join()
+    for block in shared.values():
+        block.close()
+        block.unlink()
+    shared.clear()
+
+
+class ProcessRemapper(object):
+    """Maps complex values to RGB triples using a pool of processes
+
+    Equivalent to `remap`, except that the data is split into tiles of rows, which are mapped by a pool of
+    worker processes. The data and the result are exchanged with the workers through shared memory, while the
+    ``scale`` and ``profile`` are sent to each worker once, when the pool is created.
+
+    Suitable for a ``scale`` whose transformation is implemented in python, and hence doesn't benefit from
+    mapping using multiple threads. The ``scale`` must transform each value independently, in which case the
+    result is identical to that of `remap`.
+
+    The worker processes and shared memory are released by `close`, on leaving a ``with`` block, or otherwise
+    when the `ProcessRemapper` is garbage collected.
+
+    Parameters
+    ----------
+    scale : {`Scale`, 'linear', 'log'}, optional, default: `None`
+        As for `remap`. If a subclass of `Scale`, an instance is fitted for each call, and sent to
+        the workers with each tile.
+
+    profile: {`RGBColorProfile`, 'srgb', 'srgb_high', 'srgb_low'}, optional, default: `None`
+        As for `remap`.
+
+    processes : `int`, optional, default: `None`
+        Number of worker processes, defaults to the number of CPUs.
+
+    precision : {'double', 'single', 'auto'}, optional, default: `None`
+        As for `remap`.
+
+    pixel_format : {'float', 'int', 'uint8', 'rgba32'}, optional, default: `None`
+        As for `remap`, `None` is equivalent to 'float'.
+
+    chunk_bytes : `int`, optional, default: `None`
+        Approximate memory required by each worker to map a tile, defaults to 4 MiB.
+
+    engine : {'numpy', 'numexpr', 'numba'}, optional, default: `None`
+        As for `remap`.
+
+    Other Parameters
+    ----------------
+    **kwargs :
+        These parameters are passed to the ``scale`` class when creating an automatic instance for scaling.
+
+    Example
+    -------
+
+        >>> import ZtoRGBpy
+        >>> with ZtoRGBpy.ProcessRemapper(scale=ZtoRGBpy.LogScale(1e-3, 1.0), processes=8) as remapper:
+        ...     for z in batch:
+        ...         rgb = remapper(z)
+    """
+    def __init__(self, scale=None, profile=None, processes=None, precision=None, pixel_format=None,
+                 chunk_bytes=None, engine=None, **kwargs):
+        if shared_memory is None:
+            raise NotImplementedError("Requires multiprocessing.shared_memory (python>=3.8)")
+        self.profile = _resolve_profile(profile)
+        self.scale = _scale_class(scale)
+        if not isinstance(self.scale, Scale) and not (isinstance(self.scale, type) and issubclass(self.scale, Scale)):
+            raise ValueError("scale can't be converted to an instance of Scale.")
+        self.precision = precision
+        self.pixel_format = _resolve_pixel_format(pixel_format, False)
+        self.chunk_bytes = _TILE_BYTES if chunk_bytes is None else chunk_bytes
+        self._kwargs = kwargs
+        self._backend = get_backend(engine)
+        self._shared = {}
+        pool_scale = self.scale if isinstance(self.scale, Scale) else None
+        if os.name == 'posix':
+            # Workers must share the parent's resource tracker, or their own trackers
+            # would unlink the shared memory blocks when the workers exit
+            resource_tracker.ensure_running()
+        self._pool = multiprocessing.Pool(processes, initializer=_init_worker,
+                                          initargs=(pool_scale, self.profile, self._backend))
+        # Releases the pool and shared memory if the remapper is garbage collected without being closed
+        self._finalizer = weakref.finalize(self, _release, self._pool, self._shared)
+
+    def _share(self, role, shape, dtype):
+        """Returns the specification of, and an array backed by, a shared memory block for ``role``"""
+        dtype = np.dtype(dtype)
+        nbytes = max(1, int(np.prod(shape)) * dtype.itemsize)
+        if role not in self._shared or self._shared[role].size < nbytes:
+            if role in self._shared:
+                self._shared[role].close()
+                self._shared[role].unlink()
+            self._shared[role] = shared_memory.SharedMemory(create=True, size=nbytes)
+        spec = (self._shared[role].name, tuple(shape), dtype)
+        return spec, np.ndarray(shape, dtype, buffer=self._shared[role].buf)
+
+    def __call__(self, data, out=None, return_metadata=False):
+        """Converts an array of complex values to RGB triples
+
+        Parameters
+        ----------
+        data : `array_like <numpy.asarray>` [...]
+            Complex input data.
+
+        out : `array <numpy.ndarray>`, optional, default: `None`
+            Array into which the result is written, as for `remap`.
+
+        return_metadata : `bool`, optional, default: `False`
+            Return the scale and profile instance used to generate the mapping.
+
+        Returns
+        -------
+        rgb : `array <numpy.ndarray>`
+            RGB values, as for `remap`.
+
+        scale : `Scale`
+            Present only if ``return_metadata`` = `True`. The actual `Scale` instance used to generate the mapping.
+
+        profile : `RGBColorProfile`
+            Present only if ``return_metadata`` = `True`. The `RGBColorProfile` used to generate the mapping.
+        """
+        if self._pool is None:
+            raise ValueError("ProcessRemapper is closed.")
+        data = np.asarray(data)
+        complex_type, real_type = _resolve_precision(self.precision, data.dtype)
+        out = _prepare_out(out, data.shape, self.pixel_format, real_type)
+        data_spec, shared_data = self._share('data', data.shape, complex_type)
+        out_spec, shared_out = self._share('out', out.shape, out.dtype)
+        np.copyto(shared_data, data)
+        blocks = _row_blocks(data.shape, self.chunk_bytes, real_type)
+        scale = _resolve_scale(self.scale,
+                               lambda: reduce(_merge_limits, self._pool.map(partial(_worker_limits, data_spec), blocks),
+                                              (np.nan, np.nan)),
+                               self._kwargs)
+        self._pool.map(partial(_worker_remap, data_spec, out_spec, None if scale is self.scale else scale,
+                               self.pixel_format, real_type), blocks)
+        np.copyto(out, shared_out)
+        del shared_data, shared_out
+        if return_metadata:
+            return out, scale, self.profile
+        else:
+            return out
+
+    def close(self):
+        """Shuts down the worker processes and releases the shared memory"""
+        self._finalizer()
+        self._pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
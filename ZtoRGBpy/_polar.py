@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+# =================================================================================
+#  Copyright 2019 Glen Fletcher <mail@glenfletcher.com>
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+#
+#  All documentation this file as docstrings or comments are licensed under the
+#  Creative Commons Attribution-ShareAlike 4.0 International License; you may
+#  not use this documentation except in compliance with this License.
+#  You may obtain a copy of this License at
+#
+#    https://creativecommons.org/licenses/by-sa/4.0
+#
+# =================================================================================
+"""
+ZtoRGB polar module
+
+Provides the mapping of values given by their magnitude and phase
+
+.. moduleauthor:: Glen Fletcher <mail@glenfletcher.com>
+"""
+import numpy as np
+
+from ZtoRGBpy._core import _ELEMENTWISE_CALLS, _block_limits, _resolve_precision
+from ZtoRGBpy._kernel import _prepare_out, _remap_block, _remap_formatted
+
+
+def _polar_matches(scale):
+    """Returns whether ``scale.polar`` applies the same transformation as calling ``scale``
+
+    This holds for the built in scales, and where ``polar`` and ``__call__`` are defined by the same class. A
+    subclass overriding only ``__call__`` inherits a ``polar`` that no longer matches it.
+    """
+    scale_type = type(scale)
+    if scale_type.__call__ in _ELEMENTWISE_CALLS:
+        return True
+    for base in scale_type.__mro__:
+        if '__call__' in vars(base) or 'polar' in vars(base):
+            return '__call__' in vars(base) and 'polar' in vars(base)
+    return False
+
+
+def _scale_polar(scale, magnitude, out):
+    """Returns the offset and gain given by ``scale.polar``, or `None` where it isn't available or doesn't match"""
+    if _polar_matches(scale):
+        try:
+            return scale.polar(magnitude, out=out)
+        except NotImplementedError:
+            pass
+    return None
+
+
+class _PolarMixin(object):
+    """Methods of `Remapper` mapping values given by their magnitude and phase"""
+    def polar(self, magnitude, phase, out=None, workspace=None, return_metadata=False):
+        """Converts values given by their magnitude and phase to RGB triples
+
+        Equivalent to calling the `Remapper` with ``magnitude * numpy.exp(1j * phase)``, but if the `Scale`
+        implements `Scale.polar`, as do the built in scales, the magnitude is scaled directly and the colour
+        computed from the cosine and sine of the phase, without forming the complex values or their magnitude.
+        Otherwise the complex values are formed and mapped as usual. This is also the case where a subclass
+        overrides ``__call__`` but not `Scale.polar`, as the inherited `Scale.polar` no longer matches it.
+
+        Parameters
+        ----------
+        magnitude : `array_like <numpy.asarray>` [...]
+            Non-negative magnitude of the input data.
+
+        phase : `array_like <numpy.asarray>` [...]
+            Phase of the input data in radians, broadcast against ``magnitude``.
+
+        out : `array <numpy.ndarray>`, optional, default: `None`
+            Array into which the result is written, as for `remap`.
+
+        workspace : `Workspace`, optional, default: `None`
+            Scratch buffers to use for the intermediate results, as for calling the `Remapper`.
+
+        return_metadata : `bool`, optional, default: `False`
+            Return the scale and profile instance used to generate the mapping.
+
+        Returns
+        -------
+        rgb : `array <numpy.ndarray>`
+            RGB values, as for `remap`.
+
+        scale : `Scale`
+            Present only if ``return_metadata`` = `True`. The actual `Scale` instance used to generate the mapping.
+
+        profile : `RGBColorProfile`
+            Present only if ``return_metadata`` = `True`. The `RGBColorProfile` used to generate the mapping.
+        """
+        magnitude = np.asarray(magnitude)
+        phase = np.asarray(phase)
+        complex_type, real_type = _resolve_precision(self.precision, np.result_type(magnitude.dtype, phase.dtype))
+        shape = np.broadcast(magnitude, phase).shape
+        magnitude = np.broadcast_to(np.asarray(magnitude, real_type), shape)
+        if workspace is None:
+            workspace = self._workspace.local()
+        out = _prepare_out(out, shape, self.pixel_format, real_type)
+        scale = self._fit(lambda: _block_limits(magnitude, workspace))
+        u = workspace.get('polar_u', shape, real_type)
+        v = workspace.get('polar_v', shape, real_type)
+        scaled = workspace.get('polar_magnitude', shape, real_type)
+        polar = _scale_polar(scale, magnitude, scaled)
+        if polar is None:
+            data = np.multiply(magnitude, np.exp(1j * phase), dtype=complex_type)
+            _remap_block(data, scale, self._cached_kernel(real_type), self.pixel_format, out, workspace)
+        else:
+            offset, gain = polar
+            np.cos(phase, out=u)
+            np.sin(phase, out=v)
+            u *= gain
+            v *= gain
+            if np.ndim(offset) or offset != 0:
+                u += offset
+                np.hypot(u, v, out=scaled)
+            else:
+                np.abs(gain, out=scaled)
+            _remap_formatted((u, v, scaled), self._cached_kernel(real_type), self.pixel_format, out, workspace)
+        if return_metadata:
+            return out, scale, self.profile
+        else:
+            return out
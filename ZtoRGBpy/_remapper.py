@@ -0,0 +1,769 @@
+# -*- coding: utf-8 -*-
+# =================================================================================
+#  Copyright 2019 Glen Fletcher <mail@glenfletcher.com>
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+#
+#  All documentation this file as docstrings or comments are licensed under the
+#  Creative Commons Attribution-ShareAlike 4.0 International License; you may
+#  not use this documentation except in compliance with this License.
+#  You may obtain a copy of this License at
+#
+#    https://creativecommons.org/licenses/by-sa/4.0
+#
+# =================================================================================
+"""
+ZtoRGB remapper module
+
+Provides the mapping of complex values to RGB triples
+
+.. moduleauthor:: Glen Fletcher <mail@glenfletcher.com>
+"""
+from functools import partial
+
+import numpy as np
+
+from ZtoRGBpy._core import Scale, Workspace, _ELEMENTWISE_CALLS, _Planes, _TILE_BYTES, _block_limits, _check_out, \
+    _chroma_limit, _executor, _magnitude_limits, _resolve_precision, _resolve_profile, _resolve_scale, _row_blocks, \
+    _scale_class, _scale_num_args
+from ZtoRGBpy._kernel import _ColorKernel, _PIXEL_FORMATS, _PIXEL_TYPES, _prepare_out, _remap_block, \
+    _resolve_pixel_format, get_backend
+from ZtoRGBpy._polar import _PolarMixin
+from ZtoRGBpy._iq import _IQMixin
+from ZtoRGBpy._stream import _StreamMixin
+from ZtoRGBpy._batch import _BatchMixin
+
+
+def _is_lazy(data):
+    """Returns whether ``data`` is a chunked lazy array, such as a dask array, which is mapped chunk by chunk"""
+    return (not isinstance(data, np.ndarray) and hasattr(type(data), '__array_function__')
+            and all(hasattr(data, attr) for attr in ('map_blocks', 'chunks', 'dtype')))
+
+
+def _remap_chunk(remapper, scale, chunk, *limits):
+    """Maps one ``chunk`` of a lazy array, fitting the scale to the ``limits`` of the whole array if not given"""
+    if scale is None:
+        limits = tuple(limit[()] for limit in limits)
+        scale = remapper._fit(lambda: limits)
+    return remapper._remap(chunk, lambda chunk_limits: scale, None, None)[0]
+
+
+class Remapper(_PolarMixin, _IQMixin, _StreamMixin, _BatchMixin):
+    """Precompiled mapping of complex values to RGB triples
+
+    Equivalent to `remap`, with the ``scale`` and ``profile`` resolved, and the constants derived from
+    the ``profile`` computed, once when the `Remapper` is created, rather than on every call. Each call
+    then only maps the data, reusing scratch buffers from the previous call in the same thread.
+
+    Changes to the ``profile`` after the `Remapper` is created aren't reflected in the mapping.
+
+    Parameters
+    ----------
+    scale : {`Scale`, 'linear', 'log'}, optional, default: `None`
+        As for `remap`. If a subclass of `Scale`, an instance is fitted to the data on each call.
+
+    profile: {`RGBColorProfile`, 'srgb', 'srgb_high', 'srgb_low'}, optional, default: `None`
+        As for `remap`.
+
+    precision : {'double', 'single', 'auto'}, optional, default: `None`
+        As for `remap`.
+
+    pixel_format : {'float', 'int', 'uint8', 'rgba32'}, optional, default: `None`
+        As for `remap`, `None` is equivalent to 'float'.
+
+    chunk_bytes : `int`, optional, default: `None`
+        As for `remap`.
+
+    workers : {`int`, `Executor <concurrent.futures.Executor>`}, optional, default: `None`
+        As for `remap`.
+
+    engine : {'numpy', 'numexpr', 'numba'}, optional, default: `None`
+        As for `remap`.
+
+    Other Parameters
+    ----------------
+    **kwargs :
+        These parameters are passed to the ``scale`` class when creating an automatic instance for scaling.
+
+    Attributes
+    ----------
+    trans_matrix: `array <numpy.ndarray>` [3, 2, dtype = `float`]
+        UV to RGB transformation matrix of the ``profile``, see `RGBColorProfile.get_transform`.
+    chroma_limit: `float`
+        Limiting chroma of the ``profile``, see `RGBColorProfile.get_chroma_limit`.
+
+    Example
+    -------
+
+        >>> import ZtoRGBpy
+        >>> remapper = ZtoRGBpy.Remapper(ZtoRGBpy.LogScale(1e-3, 1.0), 'srgb_low', pixel_format='uint8')
+        >>> tiles = [remapper(z) for z in requests]
+    """
+    def __init__(self, scale=None, profile=None, precision=None, pixel_format=None, chunk_bytes=None,
+                 workers=None, engine=None, **kwargs):
+        self.profile = _resolve_profile(profile)
+        self.scale = _scale_class(scale)
+        if isinstance(self.scale, type) and issubclass(self.scale, Scale):
+            self._num_args = _scale_num_args(self.scale)
+        elif not isinstance(self.scale, Scale):
+            raise ValueError("scale can't be converted to an instance of Scale.")
+        self.precision = precision
+        self.pixel_format = _resolve_pixel_format(pixel_format, False)
+        self.chunk_bytes = chunk_bytes
+        self.workers = workers
+        self._kwargs = kwargs
+        self._workspace = Workspace()
+        self.trans_matrix = self.profile.get_transform()
+        self.chroma_limit = _chroma_limit(self.trans_matrix)
+        self._kernels = {}
+        self._backend = get_backend(engine)
+
+    def __call__(self, data=None, out=None, workspace=None, return_metadata=False, real=None, imag=None):
+        """Converts an array of complex values to RGB triples
+
+        Parameters
+        ----------
+        data : `array_like <numpy.asarray>` [...], optional
+            Complex input data, or any array like object, or a chunked lazy array, as for `remap`. Required
+            unless ``real`` or ``imag`` is given.
+
+        out : `array <numpy.ndarray>`, optional, default: `None`
+            Array into which the result is written, as for `remap`.
+
+        workspace : `Workspace`, optional, default: `None`
+            Scratch buffers to use for the intermediate results, defaults to the `Remapper`\ 's own buffers
+            for the calling thread.
+
+        return_metadata : `bool`, optional, default: `False`
+            Return the scale and profile instance used to generate the mapping.
+
+        real : `array_like <numpy.asarray>` [...], optional, default: `None`
+            Real part of the input data, in place of ``data``, as for `remap`.
+
+        imag : `array_like <numpy.asarray>` [...], optional, default: `None`
+            Imaginary part of the input data, in place of ``data``, as for `remap`.
+
+        Returns
+        -------
+        rgb : `array <numpy.ndarray>`
+            RGB values, as for `remap`.
+
+        scale : `Scale`
+            Present only if ``return_metadata`` = `True`. The actual `Scale` instance used to generate the mapping.
+
+        profile : `RGBColorProfile`
+            Present only if ``return_metadata`` = `True`. The `RGBColorProfile` used to generate the mapping.
+        """
+        if real is not None or imag is not None:
+            if data is not None:
+                raise ValueError("data can't be given together with real or imag.")
+            data = _Planes(real, imag)
+        elif data is None:
+            raise ValueError("data or at least one of real and imag must be given.")
+        if _is_lazy(data):
+            out, scale = self._remap_lazy(data, out, return_metadata)
+        else:
+            out, scale = self._remap(data, self._fit, out, workspace)
+        if return_metadata:
+            return out, scale, self.profile
+        else:
+            return out
+
+    def _input(self, data):
+        """Returns ``data``, converted to an array unless it can be read in blocks, and its complex and real types"""
+        if not all(hasattr(data, attr) for attr in ('shape', 'dtype', '__getitem__')):
+            data = np.asarray(data)
+        complex_type, real_type = _resolve_precision(self.precision, data.dtype)
+        return data, complex_type, real_type
+
+    def _value_type(self, data, complex_type, real_type):
+        """Returns the type ``data`` is converted to when mapped
+
+        Real data is converted to ``real_type``, and scaled and mapped as real values, without forming complex
+        values, provided the scale transforms each value independently, and the colour stage is the 'numpy'
+        backend. The result is identical, see `_remap_block`.
+        """
+        kernel = type(self._cached_kernel(real_type))
+        if (data.dtype.kind in 'biuf' and self._elementwise() and kernel.__call__ is _ColorKernel.__call__
+                and kernel.quantized is _ColorKernel.quantized):
+            return real_type
+        return complex_type
+
+    def _elementwise(self):
+        """Returns whether the scale is known to transform each value independently"""
+        scale = self.scale if isinstance(self.scale, type) else type(self.scale)
+        return scale.__call__ in _ELEMENTWISE_CALLS
+
+    def _chunk_bytes(self, data, value_type):
+        """Returns the ``chunk_bytes`` used to map ``data``, or `None` to map it all at once
+
+        Data other than a C contiguous complex array of ``value_type`` is mapped in tiles, each converted as it is
+        read, rather than converting all of it at once, provided the scale transforms each value independently.
+        Real data is always mapped in tiles, which keeps the intermediate results in cache.
+        """
+        if self.chunk_bytes is not None:
+            return self.chunk_bytes
+        if self.workers is not None:
+            return _TILE_BYTES
+        if (isinstance(data, np.ndarray) and data.dtype == value_type and value_type.kind == 'c'
+                and data.flags.c_contiguous):
+            return None
+        if self._elementwise():
+            return _TILE_BYTES
+        return None
+
+    def _limits(self, data):
+        """Returns the minimum and maximum magnitude of ``data``, ignoring NaNs"""
+        data, complex_type, real_type = self._input(data)
+        value_type = self._value_type(data, complex_type, real_type)
+        blocks = _row_blocks(data.shape, self._chunk_bytes(data, value_type), real_type)
+        return _magnitude_limits(data, blocks, value_type)
+
+    def _remap(self, data, fit, out, workspace):
+        """Maps ``data`` using the `Scale` returned by ``fit``, called with a function returning the data limits"""
+        data, complex_type, real_type = self._input(data)
+        value_type = self._value_type(data, complex_type, real_type)
+        chunk_bytes = self._chunk_bytes(data, value_type)
+        if workspace is None:
+            workspace = self._workspace.local()
+        out = _prepare_out(out, data.shape, self.pixel_format, real_type)
+        kernel = self._cached_kernel(real_type)
+        if chunk_bytes is None:
+            data = np.asarray(data, value_type)
+            # The magnitude computed to fit the scale is kept, and reused by the scale
+            magnitude = None
+
+            def limits():
+                nonlocal magnitude
+                magnitude = workspace.get('input_magnitude', data.shape, real_type)
+                return _block_limits(data, workspace, magnitude)
+            scale = fit(limits)
+            _remap_block(data, scale, kernel, self.pixel_format, out, workspace, magnitude)
+        else:
+            blocks = _row_blocks(data.shape, chunk_bytes, real_type)
+
+            def remap_block(block):
+                block_workspace = workspace if executor is None else workspace.local()
+                _remap_block(np.asarray(data[block], value_type), scale, kernel, self.pixel_format, out[block],
+                             block_workspace)
+
+            with _executor(self.workers) as executor:
+                mapper = map if executor is None else executor.map
+                scale = fit(lambda: _magnitude_limits(data, blocks, value_type, mapper, workspace))
+                for _ in mapper(remap_block, blocks):
+                    pass
+        return out, scale
+
+
+    def _remap_lazy(self, data, out, fit_scale):
+        """Maps the chunked lazy array ``data`` one chunk at a time, returning a lazy result unless ``out`` is given
+
+        The magnitude limits are reduced lazily, and the `Scale` fitted to them within each chunk, unless
+        ``fit_scale`` is `True`, in which case they are computed to return the fitted `Scale`."""
+        complex_type, real_type = _resolve_precision(self.precision, data.dtype)
+        limits = ()
+        scale = None
+        if not isinstance(self.scale, Scale):
+            magnitude = abs(data.astype(complex_type))
+            limits = (np.nanmin(magnitude), np.nanmax(magnitude))
+            if fit_scale:
+                limits = tuple(np.asarray(np.stack(limits)))
+                scale = self._fit(lambda: limits)
+                limits = ()
+        else:
+            scale = self.scale
+        out_type = _PIXEL_TYPES.get(self.pixel_format, real_type)
+        if self.pixel_format == 'rgba32':
+            layout = {'chunks': data.chunks}
+        else:
+            layout = {'chunks': data.chunks + ((3,),), 'new_axis': len(data.shape)}
+        out_ndim = len(layout['chunks'])
+        rgb = data.map_blocks(partial(_remap_chunk, self, scale), *limits, dtype=out_type,
+                              meta=np.empty((0,) * out_ndim, out_type), **layout)
+        if out is not None:
+            _check_out(out, tuple(rgb.shape), _PIXEL_FORMATS[self.pixel_format])
+            rgb.store(out, lock=False)
+            rgb = out
+        return rgb, scale
+
+
+    def _cached_kernel(self, real_type):
+        """Returns the colour stage used for the given precision, creating it on first use"""
+        kernel = self._kernels.get(real_type)
+        if kernel is None:
+            kernel = self._kernel(real_type)
+            self._kernels[real_type] = kernel
+        return kernel
+
+    def _kernel(self, real_type):
+        """Returns the colour stage used for the given precision"""
+        return self._backend(self.profile, real_type, self.trans_matrix, self.chroma_limit)
+
+    def _fit(self, limits):
+        """Returns the `Scale` instance to use, fitting it to ``limits`` if required"""
+        if isinstance(self.scale, Scale):
+            return self.scale
+        return _resolve_scale(self.scale, limits, self._kwargs, self._num_args)
+
+    def __repr__(self):
+        return "{0:s}.{1:s}({2!r:s}, {3!r:s})".format(type(self).__module__, type(self).__name__,
+                                                     self.scale, self.profile)
+
+
+def remap(data=None, scale=None, profile=None, return_int=False, return_metadata=False,
+          out=None, workspace=None, precision=None, pixel_format=None, chunk_bytes=None, workers=None, engine=None,
+          real=None, imag=None, **kwargs):
+    """Converts an array of complex values to RGB triples
+
+    For 2d arrays of complex numbers the returned array is suitable
+    for passing to `pyplot.imshow <matplotlib.pyplot.imshow>` from matplotlib.
+
+    Parameters
+    ----------
+    data : `array_like <numpy.asarray>` [...], optional
+        Complex input data, required unless ``real`` or ``imag`` is given.
+
+        Data other than a C contiguous array of the complex type selected by ``precision``, such as
+        `complex64 <numpy.complex64>` or real data, or a strided view, is converted one tile of rows at a time
+        as it is mapped, rather than being copied to a converted array first, provided ``scale`` is
+        `LinearScale`, `LogScale` or `TabulatedScale`. The result is identical. For these scales real data is
+        also scaled and mapped as real values, without forming complex values, unless an ``engine`` other than
+        'numpy' is used.
+
+        May also be a chunked lazy array, such as a `dask.array.Array`, which is mapped chunk by chunk, returning
+        a lazy array with the same chunks (and a single chunk for the RGB axis), rather than being converted to an
+        array in memory. The magnitude limits used to fit a subclass of `Scale` are also reduced lazily, unless
+        ``return_metadata`` is `True`, in which case they are computed to return the fitted `Scale`, though the
+        mapping remains lazy. If ``out`` is given the result is computed and stored in ``out`` chunk by chunk.
+        The result is identical to mapping ``numpy.asarray(data)``, provided ``scale`` transforms each value
+        independently.
+
+    scale : {`Scale`, 'linear', 'log'}, optional, default: `None`
+        Use to define the magnitude scaling of the data. Data is transformed by this object to a interval
+        of :math:`[0.0, 1.0]`
+
+        If passed an instance of `Scale`, then this instance is use to scale the data.
+
+        If passed a subclass of `Scale`, an instance is then created of this subclass, as
+        ``scale([min(abs(data)),] max(abs(data)), **kwargs)``.
+
+        'linear' or `None` are equivalent to passing `LinearScale`, while 'log' is equivalent to passing `LogScale`
+
+    profile: {`RGBColorProfile`, 'srgb', 'srgb_high', 'srgb_low'}, optional, default: `None`
+        ColorProfile representing the RGB colorspace to convert the complex data to.
+
+        'srgb' or `None` are equivalent to passing `sRGB`, while 'srgb_high' or 'srgb_low' are respectively
+        equivalent to passing `sRGB_HIGH` or `sRGB_LOW`.
+
+    return_int : `bool`, optional, default: `False`
+        If true, returns integers in the interval :math:`[0, 255]`
+        rather than floats in the interval :math:`[0.0, 1.0]`.
+
+    return_metadata : `bool`, optional, default: `False`
+        Return the scale and profile instance used to generate the mapping.
+
+    pixel_format : {'float', 'int', 'uint8', 'rgba32'}, optional, default: `None`
+        Format of the returned RGB values, overriding ``return_int``. 'float' and 'int' are equivalent to
+        ``return_int`` being `False` or `True` respectively, and `None` uses the format selected by ``return_int``.
+
+        'uint8' returns `uint8 <numpy.uint8>` RGB triplets, rounded to the nearest integer in the interval
+        :math:`[0, 255]`, while 'rgba32' returns these as packed `uint32 <numpy.uint32>` values, with a
+        trailing alpha of 255, whose bytes are ordered R, G, B, A in memory, i.e. ``rgb.view(numpy.uint8)``
+        is an RGBA image. For both formats the rounding is performed blockwise as the mapping progresses.
+
+    out : `array <numpy.ndarray>` [ ``data.shape``, 3], optional, default: `None`
+        Array into which the result is written, rather than allocating a new array. Must have a floating point
+        dtype, or an integer dtype if ``return_int`` is `True`. For the 'uint8' and 'rgba32' ``pixel_format`` it
+        must be a C contiguous array of the returned dtype and shape.
+
+        May be a `numpy.memmap` to write the result directly to disk, see ``chunk_bytes``.
+
+    workspace : `Workspace`, optional, default: `None`
+        Scratch buffers to use for the intermediate results, reusing a `Workspace` across calls avoids
+        reallocating them for data of the same shape.
+
+    precision : {'double', 'single', 'auto'}, optional, default: `None`
+        Floating point precision used for the mapping. 'double' or `None` perform all computations using
+        `float64 <numpy.float64>`, while 'single' uses `float32 <numpy.float32>` throughout, returning
+        `float32 <numpy.float32>` RGB values. 'auto' selects 'single' if ``data`` is
+        `complex64 <numpy.complex64>` or a real type of single precision or less, and 'double' otherwise.
+
+    chunk_bytes : `int`, optional, default: `None`
+        If given, ``data`` is mapped in blocks of rows (along the first axis), with each block
+        requiring approximately ``chunk_bytes`` of memory for the mapping, rather than all at once.
+        ``data`` may then be any array like object providing ``shape`` and ``dtype`` attributes and slicing,
+        such as a `numpy.memmap`, with only one block read into memory at a time. Used together with a
+        `numpy.memmap` as ``out``, the memory required is bounded by ``chunk_bytes`` rather than the size
+        of ``data``.
+
+        A subclass of `Scale` is fitted to the whole of ``data`` in a separate pass, giving exactly the same
+        result as mapping without ``chunk_bytes``; ``scale`` must transform each value independently.
+
+    workers : {`int`, `Executor <concurrent.futures.Executor>`}, optional, default: `None`
+        Number of threads, or an existing `ThreadPoolExecutor <concurrent.futures.ThreadPoolExecutor>`,
+        used to map ``data``. ``data`` is split into tiles of rows, each mapped independently by the full
+        mapping, as are the magnitude limits required to fit a subclass of `Scale`. As for ``chunk_bytes``,
+        ``scale`` must transform each value independently, in which case the result is identical to that
+        using a single thread. The tile size is given by ``chunk_bytes``, if not `None`,
+        otherwise each tile requires approximately 4 MiB to map.
+
+    engine : {'numpy', 'numexpr', 'numba'}, optional, default: `None`
+        Backend used for the colour stage of the mapping, defaults to that set by `set_backend`, initially
+        'numpy', or the name of any backend added by `register_backend`.
+
+    real : `array_like <numpy.asarray>` [...], optional, default: `None`
+        Real part of the input data, given in place of ``data`` as separate planes, which are combined one tile
+        at a time as for ``data``, rather than requiring ``real + 1j * imag`` to be created first. The complex
+        type of the data is that of ``real`` and ``imag`` combined, e.g. `complex64 <numpy.complex64>` for
+        `float32 <numpy.float32>` planes.
+
+    imag : `array_like <numpy.asarray>` [...], optional, default: `None`
+        Imaginary part of the input data, of the same shape as ``real``. If only one of ``real`` and ``imag``
+        is given, the other part is zero.
+
+    Other Parameters
+    ----------------
+    **kwargs :
+        These parameters are passed to the ``scale`` class when creating an automatic instance for scaling.
+
+    Returns
+    -------
+    rgb : `array <numpy.ndarray>` [ ``data.shape``, 3]
+        Array containing RGB color values with the last dimension representing the RGB triplets.
+
+        If ``return_int`` is `False` then the values are floating point in the interval :math:`[0.0, 1.0]`.
+
+        If ``return_int`` is `True` then the values are integers in the interval :math:`[0, 255]`.
+
+        If ``pixel_format`` is 'rgba32' then the shape is ``data.shape``, with each value containing a packed
+        RGBA color.
+
+        If ``out`` is given, then ``out`` is returned.
+
+    scale : `Scale`
+        Present only if ``return_metadata`` = `True`. The actual `Scale` instance used to generate the mapping.
+
+    profile : `RGBColorProfile`
+        Present only if ``return_metadata`` = `True`. The actual `RGBColorProfile`
+        instance used to generate the mapping.
+
+    Notes
+    -----
+    Single precision mapping halves the memory used by ``data`` and all intermediate results. Compared to the
+    double precision mapping of the same (single precision) data, using either `sRGB_HIGH` or `sRGB_LOW`, the
+    RGB values differ by less than :math:`10^{-6}`, for both `LinearScale` and `LogScale` and magnitudes in the
+    interval :math:`[10^{-30}, 10^{30}]`. Hence when ``return_int`` is `True` the integer values are
+    identical, except for values lying within :math:`2.6 \\times 10^{-4}` levels of a boundary between levels,
+    which may differ by one.
+    """
+    remapper = Remapper(scale, profile, precision=precision,
+                        pixel_format=_resolve_pixel_format(pixel_format, return_int),
+                        chunk_bytes=chunk_bytes, workers=workers, engine=engine, **kwargs)
+    return remapper(data, out=out, workspace=workspace, return_metadata=return_metadata, real=real, imag=imag)
+
+
+def remap_polar(magnitude, phase, scale=None, profile=None, return_int=False, return_metadata=False, out=None,
+                workspace=None, precision=None, pixel_format=None, engine=None, **kwargs):
+    """Converts values given by their magnitude and phase to RGB triples
+
+    Equivalent to ``remap(magnitude * numpy.exp(1j * phase), ...)``, but for scales implementing
+    `Scale.polar`, including the built in scales, the magnitude is scaled directly and the colour computed
+    from the cosine and sine of the phase, without forming the complex values, or taking their magnitude again,
+    see `Remapper.polar`. The RGB values differ from those of `remap` only by rounding errors.
+
+    Parameters
+    ----------
+    magnitude : `array_like <numpy.asarray>` [...]
+        Non-negative magnitude of the input data.
+
+    phase : `array_like <numpy.asarray>` [...]
+        Phase of the input data in radians, broadcast against ``magnitude``.
+
+    scale : {`Scale`, 'linear', 'log'}, optional, default: `None`
+        As for `remap`, a subclass of `Scale` is fitted to the range of ``magnitude``.
+
+    profile: {`RGBColorProfile`, 'srgb', 'srgb_high', 'srgb_low'}, optional, default: `None`
+        As for `remap`.
+
+    return_int : `bool`, optional, default: `False`
+        As for `remap`.
+
+    return_metadata : `bool`, optional, default: `False`
+        Return the scale and profile instance used to generate the mapping.
+
+    out : `array <numpy.ndarray>`, optional, default: `None`
+        As for `remap`.
+
+    workspace : `Workspace`, optional, default: `None`
+        As for `remap`.
+
+    precision : {'double', 'single', 'auto'}, optional, default: `None`
+        As for `remap`, with 'auto' selecting 'single' if both ``magnitude`` and ``phase`` are of single precision
+        or less.
+
+    pixel_format : {'float', 'int', 'uint8', 'rgba32'}, optional, default: `None`
+        As for `remap`.
+
+    engine : {'numpy', 'numexpr', 'numba'}, optional, default: `None`
+        As for `remap`, though only used for scales not implementing `Scale.polar`.
+
+    Other Parameters
+    ----------------
+    **kwargs :
+        These parameters are passed to the ``scale`` class when creating an automatic instance for scaling.
+
+    Returns
+    -------
+    rgb : `array <numpy.ndarray>` [ ``magnitude.shape``, 3]
+        RGB values, as for `remap`.
+
+    scale : `Scale`
+        Present only if ``return_metadata`` = `True`. The actual `Scale` instance used to generate the mapping.
+
+    profile : `RGBColorProfile`
+        Present only if ``return_metadata`` = `True`. The actual `RGBColorProfile`
+        instance used to generate the mapping.
+    """
+    remapper = Remapper(scale, profile, precision=precision,
+                        pixel_format=_resolve_pixel_format(pixel_format, return_int), engine=engine, **kwargs)
+    return remapper.polar(magnitude, phase, out=out, workspace=workspace, return_metadata=return_metadata)
+
+
+def remap_iq(buffer, dtype='int16', shape=None, scale=None, profile=None, full_scale=None, return_int=False,
+             return_metadata=False, out=None, workspace=None, precision=None, pixel_format=None, engine=None,
+             **kwargs):
+    """Converts a buffer of interleaved I/Q samples to RGB triples
+
+    Equivalent to ``remap((I + 1j * Q) / full_scale, ...)`` for the in-phase (I) and quadrature (Q) samples
+    interleaved in ``buffer``, such as those received from a software defined radio, but reading the samples in
+    place rather than first decoding them to a complex array, see `Remapper.iq`.
+
+    Parameters
+    ----------
+    buffer : `buffer_like`
+        Object exposing the buffer interface, such as `bytes` or `memoryview`, containing pairs of I/Q samples.
+
+    dtype : `data-type <numpy.dtype>`, optional, default: 'int16'
+        Type of each sample, see `Remapper.iq`.
+
+    shape : `tuple` [ `int` ], optional, default: `None`
+        Shape of the mapped data, the number of I/Q pairs, defaults to a 1d array of all the pairs.
+
+    scale : {`Scale`, 'linear', 'log'}, optional, default: `None`
+        As for `remap`, in units of ``full_scale``.
+
+    profile: {`RGBColorProfile`, 'srgb', 'srgb_high', 'srgb_low'}, optional, default: `None`
+        As for `remap`.
+
+    full_scale : `float`, optional, default: `None`
+        Sample value corresponding to a magnitude of one, see `Remapper.iq`.
+
+    return_int : `bool`, optional, default: `False`
+        As for `remap`.
+
+    return_metadata : `bool`, optional, default: `False`
+        Return the scale and profile instance used to generate the mapping.
+
+    out : `array <numpy.ndarray>`, optional, default: `None`
+        As for `remap`.
+
+    workspace : `Workspace`, optional, default: `None`
+        As for `remap`.
+
+    precision : {'double', 'single', 'auto'}, optional, default: `None`
+        As for `remap`, with 'auto' selecting 'single' for samples of single precision or less, including 'int16'
+        and 'int8'.
+
+    pixel_format : {'float', 'int', 'uint8', 'rgba32'}, optional, default: `None`
+        As for `remap`.
+
+    engine : {'numpy', 'numexpr', 'numba'}, optional, default: `None`
+        As for `remap`.
+
+    Other Parameters
+    ----------------
+    **kwargs :
+        These parameters are passed to the ``scale`` class when creating an automatic instance for scaling.
+
+    Returns
+    -------
+    rgb : `array <numpy.ndarray>` [ ``shape``, 3]
+        RGB values, as for `remap`.
+
+    scale : `Scale`
+        Present only if ``return_metadata`` = `True`. The actual `Scale` instance used to generate the mapping,
+        in units of ``full_scale``.
+
+    profile : `RGBColorProfile`
+        Present only if ``return_metadata`` = `True`. The actual `RGBColorProfile`
+        instance used to generate the mapping.
+
+    Example
+    -------
+
+        >>> import ZtoRGBpy
+        >>> packet = radio.read(2 * 4096 * 2)
+        >>> row = ZtoRGBpy.remap_iq(packet, 'int16', scale=ZtoRGBpy.LogScale(1e-4, 1.0), pixel_format='rgba32')
+    """
+    remapper = Remapper(scale, profile, precision=precision,
+                        pixel_format=_resolve_pixel_format(pixel_format, return_int), engine=engine, **kwargs)
+    return remapper.iq(buffer, dtype, shape, full_scale, out=out, workspace=workspace,
+                       return_metadata=return_metadata)
+
+
+def remap_stream(frames, scale=None, profile=None, warmup=1, decay=None, out=None, return_metadata=False,
+                 precision=None, pixel_format=None, chunk_bytes=None, workers=None, engine=None, **kwargs):
+    """Converts a sequence of arrays of complex values to RGB triples, using a common scale
+
+    Unlike calling `remap` for each frame, a subclass of `Scale` isn't refitted to every frame, which would
+    cause the colors to flicker, but is either fitted to the first ``warmup`` frames, or to a decaying running
+    maximum, see `Remapper.stream`. The frames are mapped lazily, one at a time, as the result is iterated.
+
+    Parameters
+    ----------
+    frames : `iterable` [ `array_like <numpy.asarray>` ]
+        Complex input frames, as for ``data`` in `remap`, may be a generator.
+
+    scale : {`Scale`, 'linear', 'log'}, optional, default: `None`
+        As for `remap`, an instance of `Scale` is used for every frame.
+
+    profile: {`RGBColorProfile`, 'srgb', 'srgb_high', 'srgb_low'}, optional, default: `None`
+        As for `remap`.
+
+    warmup : `int`, optional, default: 1
+        Number of frames used to fit a subclass of `Scale`, see `Remapper.stream`.
+
+    decay : `float`, optional, default: `None`
+        If given, the factor by which the running magnitude range decays between frames, see `Remapper.stream`.
+
+    out : `array <numpy.ndarray>`, optional, default: `None`
+        Array into which every frame is written, see `Remapper.stream`.
+
+    return_metadata : `bool`, optional, default: `False`
+        Yield the scale and profile instance used to generate the mapping of each frame.
+
+    precision : {'double', 'single', 'auto'}, optional, default: `None`
+        As for `remap`.
+
+    pixel_format : {'float', 'int', 'uint8', 'rgba32'}, optional, default: `None`
+        As for `remap`, `None` is equivalent to 'float'.
+
+    chunk_bytes : `int`, optional, default: `None`
+        As for `remap`.
+
+    workers : {`int`, `Executor <concurrent.futures.Executor>`}, optional, default: `None`
+        As for `remap`.
+
+    engine : {'numpy', 'numexpr', 'numba'}, optional, default: `None`
+        As for `remap`.
+
+    Other Parameters
+    ----------------
+    **kwargs :
+        These parameters are passed to the ``scale`` class when creating an automatic instance for scaling.
+
+    Yields
+    ------
+    rgb : `array <numpy.ndarray>`
+        RGB values of each frame, as for `remap`.
+
+    scale : `Scale`
+        Present only if ``return_metadata`` = `True`. The actual `Scale` instance used to map the frame.
+
+    profile : `RGBColorProfile`
+        Present only if ``return_metadata`` = `True`. The `RGBColorProfile` used to map the frame.
+
+    Example
+    -------
+
+        >>> import ZtoRGBpy
+        >>> frames = (field(t) for t in times)
+        >>> for rgb in ZtoRGBpy.remap_stream(frames, 'log', warmup=10, pixel_format='uint8'):
+        ...     writer.append_data(rgb)
+    """
+    remapper = Remapper(scale, profile, precision=precision, pixel_format=pixel_format, chunk_bytes=chunk_bytes,
+                        workers=workers, engine=engine, **kwargs)
+    return remapper.stream(frames, warmup=warmup, decay=decay, out=out, return_metadata=return_metadata)
+
+
+def remap_batch(items, scale=None, profile=None, per_item=False, out=None, return_metadata=False,
+                precision=None, pixel_format=None, chunk_bytes=None, workers=None, engine=None, **kwargs):
+    """Converts a batch of arrays of complex values to RGB triples
+
+    Equivalent to calling `remap` for each item of ``items``, but with the ``scale`` and ``profile`` resolved
+    once, and the whole batch mapped together, see `Remapper.batch`. Items may be stacked along the first axis
+    of a single array, or be a sequence of arrays of different shapes, such as the panels of a figure.
+
+    Parameters
+    ----------
+    items : {`array <numpy.ndarray>` [N, ...], `list` [ `array_like <numpy.asarray>` ]}
+        Complex input data, either stacked along the first axis, or a sequence of arrays.
+
+    scale : {`Scale`, 'linear', 'log'}, optional, default: `None`
+        As for `remap`, a subclass of `Scale` is fitted to the whole batch, unless ``per_item`` is `True`.
+
+    profile: {`RGBColorProfile`, 'srgb', 'srgb_high', 'srgb_low'}, optional, default: `None`
+        As for `remap`.
+
+    per_item : `bool`, optional, default: `False`
+        Fit a subclass of `Scale` to each item, rather than to the whole batch.
+
+    out : {`array <numpy.ndarray>`, `list` [ `array <numpy.ndarray>` ]}, optional, default: `None`
+        Array into which the result is written, or a sequence of arrays, one for each item, see `Remapper.batch`.
+
+    return_metadata : `bool`, optional, default: `False`
+        Return the scale and profile instance used to generate the mapping.
+
+    precision : {'double', 'single', 'auto'}, optional, default: `None`
+        As for `remap`.
+
+    pixel_format : {'float', 'int', 'uint8', 'rgba32'}, optional, default: `None`
+        As for `remap`, `None` is equivalent to 'float'.
+
+    chunk_bytes : `int`, optional, default: `None`
+        As for `remap`.
+
+    workers : {`int`, `Executor <concurrent.futures.Executor>`}, optional, default: `None`
+        As for `remap`.
+
+    engine : {'numpy', 'numexpr', 'numba'}, optional, default: `None`
+        As for `remap`.
+
+    Other Parameters
+    ----------------
+    **kwargs :
+        These parameters are passed to the ``scale`` class when creating an automatic instance for scaling.
+
+    Returns
+    -------
+    rgb : {`array <numpy.ndarray>` [N, ..., 3], `list` [ `array <numpy.ndarray>` ]}
+        RGB values of a stacked ``items``, as for `remap`, or a list of the RGB values of each item.
+
+    scale : {`Scale`, `list` [ `Scale` ]}
+        Present only if ``return_metadata`` = `True`. The actual `Scale` instance used to map the batch,
+        or if ``per_item`` is `True`, a list of the instance used for each item.
+
+    profile : `RGBColorProfile`
+        Present only if ``return_metadata`` = `True`. The `RGBColorProfile` used to generate the mapping.
+
+    Example
+    -------
+
+        >>> import ZtoRGBpy
+        >>> panels = ZtoRGBpy.remap_batch([field(p) for p in params], 'log', per_item=True)
+        >>> for axes, rgb in zip(grid.flat, panels):
+        ...     axes.imshow(rgb)
+    """
+    remapper = Remapper(scale, profile, precision=precision, pixel_format=pixel_format, chunk_bytes=chunk_bytes,
+                        workers=workers, engine=engine, **kwargs)
+    return remapper.batch(items, per_item=per_item, out=out, return_metadata=return_metadata)
@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+# =================================================================================
+#  Copyright 2019 Glen Fletcher <mail@glenfletcher.com>
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+#
+#  All documentation this file as docstrings or comments are licensed under the
+#  Creative Commons Attribution-ShareAlike 4.0 International License; you may
+#  not use this documentation except in compliance with this License.
+#  You may obtain a copy of this License at
+#
+#    https://creativecommons.org/licenses/by-sa/4.0
+#
+# =================================================================================
+"""
+ZtoRGB stream module
+
+Provides the mapping of sequences of frames with a common scale
+
+.. moduleauthor:: Glen Fletcher <mail@glenfletcher.com>
+"""
+from itertools import chain
+
+import numpy as np
+
+from ZtoRGBpy._core import Scale, _merge_limits
+
+
+class _StreamMixin(object):
+    """Methods of `Remapper` mapping sequences of frames with a common scale"""
+    def stream(self, frames, warmup=1, decay=None, out=None, return_metadata=False):
+        """Converts a sequence of arrays of complex values to RGB triples, using a common scale
+
+        Frames are read from ``frames`` and mapped one at a time as the result is iterated, reusing the scratch
+        buffers, so the memory used doesn't depend on the number of frames.
+
+        Parameters
+        ----------
+        frames : `iterable` [ `array_like <numpy.asarray>` ]
+            Complex input frames, as for ``data`` in `remap`, may be a generator.
+
+        warmup : `int`, optional, default: 1
+            Number of frames used to fit a subclass of `Scale`, which is then used for every frame. These frames
+            are held until the scale is fitted, frames which are arrays are copied in case the buffer is reused
+            by ``frames``. Ignored if ``scale`` is an instance of `Scale`, which is used for every frame.
+
+        decay : `float`, optional, default: `None`
+            If given, a subclass of `Scale` is refitted for each frame after the first ``warmup`` frames, to
+            a running maximum magnitude, which is multiplied by ``decay`` before being combined with the
+            maximum magnitude of the frame. Likewise the running minimum magnitude is divided by ``decay``.
+            A ``decay`` of 1 never reduces the magnitude range, while smaller values allow it to follow a
+            decaying signal, changing by at most a factor of ``decay`` between frames.
+
+        out : `array <numpy.ndarray>`, optional, default: `None`
+            Array into which every frame is written, as for `remap`, in which case the same array is yielded for
+            each frame, and must be used before the next frame is requested.
+
+        return_metadata : `bool`, optional, default: `False`
+            Yield the scale and profile instance used to generate the mapping of each frame.
+
+        Yields
+        ------
+        rgb : `array <numpy.ndarray>`
+            RGB values of each frame, as for `remap`.
+
+        scale : `Scale`
+            Present only if ``return_metadata`` = `True`. The actual `Scale` instance used to map the frame.
+
+        profile : `RGBColorProfile`
+            Present only if ``return_metadata`` = `True`. The `RGBColorProfile` used to map the frame.
+        """
+        if isinstance(self.scale, Scale):
+            if decay is not None:
+                raise ValueError("decay can't be used with an instance of Scale.")
+        elif int(warmup) < 1:
+            raise ValueError("warmup must be at least 1.")
+        if decay is not None and not 0 < decay <= 1:
+            raise ValueError("decay must be in the interval (0, 1].")
+        return self._stream(iter(frames), int(warmup), decay, out, return_metadata)
+
+    def _stream(self, frames, warmup, decay, out, return_metadata):
+        pending = []
+        if isinstance(self.scale, Scale):
+            scale = self.scale
+        else:
+            limits = (np.nan, np.nan)
+            for frame in frames:
+                pending.append(np.array(frame) if isinstance(frame, np.ndarray) else frame)
+                limits = _merge_limits(limits, self._limits(pending[-1]))
+                if len(pending) == warmup:
+                    break
+            scale = self._fit(lambda: limits)
+
+        def fit(frame_limits):
+            nonlocal limits, scale
+            if decay is not None:
+                limits = _merge_limits((limits[0] / decay, limits[1] * decay), frame_limits())
+                scale = self._fit(lambda: limits)
+            return scale
+
+        for index, frame in enumerate(chain(pending, frames)):
+            if index < len(pending):
+                pending[index] = None
+                rgb, used = self._remap(frame, lambda frame_limits: scale, out, None)
+            else:
+                rgb, used = self._remap(frame, fit, out, None)
+            if return_metadata:
+                yield rgb, used, self.profile
+            else:
+                yield rgb
@@ -0,0 +1,247 @@
+# -*- coding: utf-8 -*-
+# =================================================================================
+#  Copyright 2019 Glen Fletcher <mail@glenfletcher.com>
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+#
+#  All documentation this file as docstrings or comments are licensed under the
+#  Creative Commons Attribution-ShareAlike 4.0 International License; you may
+#  not use this documentation except in compliance with this License.
+#  You may obtain a copy of this License at
+#
+#    https://creativecommons.org/licenses/by-sa/4.0
+#
+# =================================================================================
+"""
+ZtoRGB tabulated scale module
+
+Provides a scale interpolated from a table
+
+.. moduleauthor:: Glen Fletcher <mail@glenfletcher.com>
+"""
+from copy import copy
+
+import numpy as np
+
+from ZtoRGBpy._core import Scale, LinearScale, LogScale, _ELEMENTWISE_CALLS, _MAGNITUDE_CALLS
+
+
+class TabulatedScale(Scale):
+    """Tabulated Scaling
+
+    Provides a transformation interpolated from a table, usually created by `from_scale` to replace a scale that
+    is expensive to evaluate. The transformation is of the form
+
+    .. math::
+        T(v) = A(|v|) + \\frac{v}{|v|} \\cdot G(|v|)
+
+    with :math:`A` and :math:`G` tabulated at ``n`` evenly spaced points of either :math:`|v|` or
+    :math:`log_{10}(|v|)`, over the interval :math:`[start, stop]`, and linearly interpolated between them.
+    Beyond the interval they are linearly extrapolated from the first and last pair of points.
+
+    Parameters
+    ----------
+    offset: `array_like <numpy.asarray>` [n]
+        Tabulated values of :math:`A`.
+    gain: `array_like <numpy.asarray>` [n]
+        Tabulated values of :math:`G`.
+    start: `float`
+        Magnitude of the first point, or its logarithm for 'log' ``spacing``.
+    stop: `float`
+        Magnitude of the last point, or its logarithm for 'log' ``spacing``.
+    spacing: {'linear', 'log'}, optional, default: 'linear'
+        Whether the points are evenly spaced in the magnitude or its logarithm.
+    ticks: `tuple` [ `Sequence <collections.abc.Sequence>`, `Sequence <collections.abc.Sequence>` ], optional
+        Tick marks returned by `ticks`, if `None` the scale doesn't support a colorbar.
+
+    Attributes
+    ----------
+    max_error: `float`
+        Maximum difference from the original scale, set by `from_scale`, otherwise NaN.
+    """
+
+    def __init__(self, offset, gain, start, stop, *, spacing='linear', ticks=None):
+        Scale.__init__(self)
+        if spacing not in ('linear', 'log'):
+            raise ValueError("spacing must be one of 'linear' or 'log'.")
+        self.offset = np.asarray(offset, float)
+        self.gain = np.asarray(gain, float)
+        if self.offset.ndim != 1 or self.offset.shape != self.gain.shape or self.offset.size < 2:
+            raise ValueError("offset and gain must be 1d arrays of the same size, of at least 2.")
+        if not stop > start:
+            raise ValueError("stop must be greater than start.")
+        self.start = float(start)
+        self.stop = float(stop)
+        self.spacing = spacing
+        self.max_error = np.nan
+        self._ticks = ticks
+        self._source = None
+        self._inverse_step = (self.offset.size - 1) / (self.stop - self.start)
+        self._offset_step = np.diff(self.offset)
+        self._gain_step = np.diff(self.gain)
+        # The offset is constant for radial scales (zero) and `LogScale`, and is then simply added
+        self._constant_offset = self.offset[0] if np.all(self.offset == self.offset[0]) else None
+
+    @classmethod
+    def from_scale(cls, scale, n=4096, vmin=None, vmax=None, spacing=None, samples=100000, seed=0):
+        """Tabulates a scale
+
+        The scale is evaluated once at ``n`` points, and must have the form described above, in particular
+        it must depend on the phase of :math:`v` only through :math:`\\frac{v}{|v|}`, as do `LinearScale`,
+        `LogScale` and any scale that scales only the magnitude of :math:`v`. The ticks of the scale are kept.
+
+        Parameters
+        ----------
+        scale: `Scale`
+            Instance of the scale to tabulate.
+        n: `int`, optional, default: 4096
+            Number of points in the table.
+        vmin: `float`, optional, default: `None`
+            Smallest tabulated magnitude, defaults to 0, or to ``vmin`` for a `LogScale`.
+        vmax: `float`, optional, default: `None`
+            Largest tabulated magnitude, required unless ``scale`` is a `LinearScale` or `LogScale`, in which
+            case it defaults to ``vmax``.
+        spacing: {'linear', 'log'}, optional, default: `None`
+            Whether the points are evenly spaced in the magnitude or its logarithm, defaults to 'log' for
+            a `LogScale` and 'linear' otherwise.
+        samples: `int`, optional, default: 100000
+            Number of random values in the interval ``[vmin, vmax]``, with random phases, used to estimate
+            `max_error`.
+        seed: `int`, optional, default: 0
+            Seed for the random values.
+
+        Returns
+        -------
+        scale: `TabulatedScale`
+            Tabulated scale, with `max_error` set to the largest difference from ``scale`` found.
+        """
+        if not isinstance(scale, Scale):
+            raise ValueError("scale must be an instance of Scale.")
+        if isinstance(scale, LogScale):
+            defaults = (10 ** scale.logmin, 10 ** scale.logmax, 'log')
+        elif isinstance(scale, LinearScale):
+            defaults = (0.0, scale.mag, 'linear')
+        else:
+            defaults = (0.0, None, 'linear')
+        vmin = defaults[0] if vmin is None else vmin
+        vmax = defaults[1] if vmax is None else vmax
+        spacing = defaults[2] if spacing is None else spacing
+        if vmax is None:
+            raise ValueError("vmax must be given for a scale other than LinearScale or LogScale.")
+        if spacing == 'log' and not vmin > 0:
+            raise ValueError("vmin must be greater than 0 for 'log' spacing.")
+        if int(n) < 2:
+            raise ValueError("n must be at least 2.")
+        if spacing == 'log':
+            start, stop = float(np.log10(vmin)), float(np.log10(vmax))
+            radii = np.logspace(start, stop, int(n))
+        else:
+            start, stop = float(vmin), float(vmax)
+            radii = np.linspace(start, stop, int(n))
+        positive = np.asarray(scale(radii.astype(complex)), complex)
+        negative = np.asarray(scale(-radii.astype(complex)), complex)
+        try:
+            ticks = scale.ticks()
+        except NotImplementedError:
+            ticks = None
+        tabulated = cls((positive.real + negative.real) / 2, (positive.real - negative.real) / 2, start, stop,
+                        spacing=spacing, ticks=ticks)
+        tabulated._source = scale
+        random = np.random.RandomState(seed)
+        if spacing == 'log':
+            magnitude = 10 ** random.uniform(start, stop, samples)
+        else:
+            magnitude = random.uniform(start, stop, samples)
+        values = magnitude * np.exp(1j * random.uniform(-np.pi, np.pi, samples))
+        tabulated.max_error = float(np.nanmax(np.abs(tabulated(values) - scale(values.copy()))))
+        return tabulated
+
+    def __call__(self, value, magnitude=None, out=None):
+        value = np.asarray(value)
+        if magnitude is None:
+            magnitude = np.abs(value)
+        offset, gain = self.polar(magnitude)
+        gain /= magnitude
+        if self.spacing == 'linear':
+            np.copyto(gain, 0, where=magnitude == 0)
+        out = np.multiply(value, gain, out=out)
+        if np.ndim(offset) or offset != 0:
+            out += offset
+        return out
+
+    def polar(self, magnitude, out=None):
+        if self.spacing == 'log':
+            position = np.log10(magnitude)
+        else:
+            position = np.array(magnitude, float)
+        position -= self.start
+        position *= self._inverse_step
+        index = np.floor(position)
+        # NaN magnitudes are given the first interval, their position keeps the result NaN
+        np.fmax(index, 0, out=index)
+        np.fmin(index, self.offset.size - 2, out=index)
+        # The fractional position within the interval, outside [0, 1] when extrapolating
+        position -= index
+        index = index.astype(np.intp)
+        gain = np.take(self._gain_step, index)
+        gain *= position
+        gain += np.take(self.gain, index)
+        if out is not None:
+            np.copyto(out, gain, casting='unsafe')
+            gain = out
+        if self._constant_offset is not None:
+            return self._constant_offset, gain
+        offset = np.take(self._offset_step, index)
+        offset *= position
+        offset += np.take(self.offset, index)
+        return offset, gain
+
+    # Only real operations are applied to the value, so the real part of __call__(value + 0j) is __call__(value)
+    _real = __call__
+
+    def _rescaled(self, factor):
+        """Returns the scale transforming ``v`` as this scale transforms ``v * factor``"""
+        scale = copy(self)
+        if self.spacing == 'log':
+            scale.start = self.start - float(np.log10(factor))
+            scale.stop = self.stop - float(np.log10(factor))
+        else:
+            scale.start = self.start / factor
+            scale.stop = self.stop / factor
+            scale._inverse_step = self._inverse_step * factor
+        return scale
+
+    def ticks(self):
+        """Returns a list of tick marks suitable for a colorbar
+
+        Returns
+        -------
+        offsets: `Sequence <collections.abc.Sequence>` [ `float` ]
+            Positions of the tick marks of the tabulated scale.
+        labels: `Sequence <collections.abc.Sequence>` [ `str` ]
+            Labels of the tick marks of the tabulated scale.
+        """
+        if self._ticks is None:
+            raise NotImplementedError()
+        return self._ticks
+
+    def __repr__(self):
+        if self._source is not None:
+            return "{0:s}.{1:s}.from_scale({2!r:s}, n={3:d})".format(type(self).__module__, type(self).__name__,
+                                                                    self._source, self.offset.size)
+        return "{0:s}.{1:s}(<{2:d} points>, {3:g}, {4:g}, spacing={5!r:s})".format(
+            type(self).__module__, type(self).__name__, self.offset.size, self.start, self.stop, self.spacing)
+
+
+_ELEMENTWISE_CALLS.add(TabulatedScale.__call__)
+_MAGNITUDE_CALLS.add(TabulatedScale.__call__)
@@ -0,0 +1,176 @@
+# -*- coding: utf-8 -*-
+# =================================================================================
+#  Copyright 2019 Glen Fletcher <mail@glenfletcher.com>
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+#
+#  All documentation this file as docstrings or comments are licensed under the
+#  Creative Commons Attribution-ShareAlike 4.0 International License; you may
+#  not use this documentation except in compliance with this License.
+#  You may obtain a copy of this License at
+#
+#    https://creativecommons.org/licenses/by-sa/4.0
+#
+# =================================================================================
+"""
+ZtoRGB render target module
+
+Provides a mapped image updated incrementally, in the regions where the data has changed
+
+.. moduleauthor:: Glen Fletcher <mail@glenfletcher.com>
+"""
+import numpy as np
+
+from ZtoRGBpy._core import Workspace
+from ZtoRGBpy._remapper import Remapper
+
+
+class RenderTarget(object):
+    """Mapped image of an array of complex values, remapped only where the values have changed
+
+    The whole of ``data`` is mapped once, when the `RenderTarget` is created, fitting the scale if required.
+    After the values in some regions of ``data`` have been changed, such as by a solver updating the array in
+    place, `update` remaps only those regions, with the same scale and profile, so the cost of each frame is
+    proportional to the changed area, rather than to the size of ``data``. The bounding boxes of the changed
+    regions are returned, so only those need to be redrawn.
+
+    Parameters
+    ----------
+    data : `array_like <numpy.asarray>` [...]
+        Complex input data, as for `remap`. A reference to an array is kept, and read by `update`, so changes
+        made to it in place are seen.
+
+    scale : {`Scale`, 'linear', 'log'}, optional, default: `None`
+        As for `remap`. If a subclass of `Scale`, an instance is fitted to ``data``, and then used for every
+        update.
+
+    profile: {`RGBColorProfile`, 'srgb', 'srgb_high', 'srgb_low'}, optional, default: `None`
+        As for `remap`.
+
+    pixel_format : {'float', 'int', 'uint8', 'rgba32'}, optional, default: `None`
+        As for `remap`.
+
+    Other Parameters
+    ----------------
+    **kwargs :
+        These parameters are passed to `Remapper`.
+
+    Attributes
+    ----------
+    data : `array <numpy.ndarray>` [...]
+        Complex input data read by `update`.
+    rgb : `array <numpy.ndarray>` [..., 3]
+        RGB values of the last mapping of ``data``, as for `remap`, updated in place.
+    scale : `Scale`
+        `Scale` used to map the data.
+
+    Example
+    -------
+
+        >>> import ZtoRGBpy
+        >>> target = ZtoRGBpy.RenderTarget(field, ZtoRGBpy.LogScale(1e-3, 1.0), pixel_format='uint8')
+        >>> image = plt.imshow(target.rgb)
+        >>> for step in range(steps):
+        ...     region = solver.step(field)
+        ...     if target.update(region):
+        ...         image.set_data(target.rgb)
+    """
+    def __init__(self, data, scale=None, profile=None, pixel_format=None, **kwargs):
+        self.remapper = Remapper(scale, profile, pixel_format=pixel_format, **kwargs)
+        self.data = np.asarray(data)
+        self.rgb, self.scale, _ = self.remapper(self.data, return_metadata=True)
+        self.remapper.scale = self.scale
+        self._workspace = Workspace()
+
+    def update(self, regions=None, data=None):
+        """Remaps the values of ``data`` in the given regions
+
+        Parameters
+        ----------
+        regions : {`tuple` [ `slice` ], `list` [ `tuple` ], `array <numpy.ndarray>` [...]}, optional, default: `None`
+            Rectangular region, as a tuple of slices with a step of 1 indexing ``data``, such as
+            ``numpy.s_[10:20, 30:40]``, or a list of such regions, or a boolean mask of the same shape as
+            ``data``, `True` for each changed value. Defaults to the whole of ``data``.
+
+        data : `array_like <numpy.asarray>` [...], optional, default: `None`
+            Array replacing ``data``, of the same shape, read by this and subsequent updates.
+
+        Returns
+        -------
+        boxes : `list` [ `tuple` [ `slice` ] ]
+            Bounding box of each changed region, as a tuple of slices with explicit bounds indexing ``rgb``,
+            omitting empty regions. For a mask a single box bounds all the changed values.
+        """
+        if data is not None:
+            data = np.asarray(data)
+            if data.shape != self.data.shape:
+                raise ValueError("data must have the same shape as the data of the RenderTarget.")
+            self.data = data
+        if regions is None:
+            regions = [()]
+        if isinstance(regions, np.ndarray) and regions.dtype == bool:
+            return self._update_mask(regions)
+        if isinstance(regions, slice) or (isinstance(regions, tuple) and
+                                          all(isinstance(region, slice) for region in regions)):
+            regions = [regions]
+        boxes = [box for box in (self._box(region) for region in regions)
+                 if all(bound.stop > bound.start for bound in box)]
+        for box in boxes:
+            target = self.rgb[box]
+            if self.remapper.pixel_format in ('uint8', 'rgba32') and not target.flags.c_contiguous:
+                # The 8 bit formats are only written to C contiguous arrays, so are copied from a scratch buffer
+                target[...] = self.remapper(self.data[box], out=self._workspace.get('box', target.shape, target.dtype))
+            else:
+                self.remapper(self.data[box], out=target)
+        return boxes
+
+    def _box(self, region):
+        """Returns ``region`` as a tuple of slices, one for every axis, with explicit bounds within ``data``"""
+        if isinstance(region, slice):
+            region = (region,)
+        if not isinstance(region, tuple) or len(region) > self.data.ndim:
+            raise ValueError("regions must be tuples of slices indexing data, or a boolean mask.")
+        box = []
+        for bound, size in zip(region + (slice(None),) * (self.data.ndim - len(region)), self.data.shape):
+            if not isinstance(bound, slice):
+                raise ValueError("regions must be tuples of slices indexing data, or a boolean mask.")
+            start, stop, step = bound.indices(size)
+            if step != 1:
+                raise ValueError("region slices must have a step of 1.")
+            box.append(slice(start, max(start, stop)))
+        return tuple(box)
+
+    def _update_mask(self, mask):
+        """Remaps the values of ``data`` where ``mask`` is `True`, within its bounding box"""
+        if mask.shape != self.data.shape:
+            raise ValueError("mask must have the same shape as data.")
+        # Only the first axis is found from the whole mask, each following axis from the band within the bounds
+        # already found
+        box = ()
+        for axis in range(mask.ndim):
+            band = mask[box]
+            index = np.flatnonzero(np.any(band, axis=tuple(other for other in range(mask.ndim) if other != axis)))
+            if index.size == 0:
+                return []
+            box += (slice(int(index[0]), int(index[-1]) + 1),)
+        # The box is mapped into a scratch buffer, and copied where the mask is set, rather than gathering and
+        # scattering the changed values
+        target = self.rgb[box]
+        mapped = self.remapper(self.data[box], out=self._workspace.get('box', target.shape, target.dtype))
+        np.copyto(target, mapped, where=mask[box] if target.ndim == mask.ndim else mask[box][..., np.newaxis])
+        return [box]
+
+    def __repr__(self):
+        return "{0:s}.{1:s}(<{2:s} array>, {3!r:s}, {4!r:s})".format(
+            type(self).__module__, type(self).__name__, 'x'.join(str(size) for size in self.data.shape),
+            self.scale, self.remapper.profile)
@@ -0,0 +1,226 @@
+# -*- coding: utf-8 -*-
+# =================================================================================
+#  Copyright 2019 Glen Fletcher <mail@glenfletcher.com>
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+#
+#  All documentation this file as docstrings or comments are licensed under the
+#  Creative Commons Attribution-ShareAlike 4.0 International License; you may
+#  not use this documentation except in compliance with this License.
+#  You may obtain a copy of this License at
+#
+#    https://creativecommons.org/licenses/by-sa/4.0
+#
+# =================================================================================
+"""
+ZtoRGB waterfall module
+
+Provides a scrolling image of mapped rows, updated incrementally
+
+.. moduleauthor:: Glen Fletcher <mail@glenfletcher.com>
+"""
+import numpy as np
+
+from ZtoRGBpy._core import Scale, _resolve_precision
+from ZtoRGBpy._kernel import _PIXEL_TYPES
+from ZtoRGBpy._remapper import Remapper
+
+
+class Waterfall(object):
+    """Scrolling image of the most recent rows of complex values, such as a spectrogram
+
+    Rows are mapped once, when appended, with a fixed scale and profile, and kept in a ring buffer of mapped
+    rows, so the cost of each update is proportional to the number of new rows, rather than to ``height``.
+    Each row is written twice, to consecutive copies of the ring, so that the ``height`` most recent rows are
+    always a contiguous view of the buffer, see `rgb`, rather than having to be rolled into a new array.
+
+    Parameters
+    ----------
+    width : `int`
+        Number of values in each row.
+
+    height : `int`
+        Number of rows shown, older rows are discarded.
+
+    scale : {`Scale`, 'linear', 'log'}, optional, default: `None`
+        As for `remap`. If a subclass of `Scale`, an instance is fitted to the first rows appended, and then
+        used for every subsequent row.
+
+    profile: {`RGBColorProfile`, 'srgb', 'srgb_high', 'srgb_low'}, optional, default: `None`
+        As for `remap`.
+
+    newest : {'top', 'bottom'}, optional, default: 'top'
+        Edge of the image at which new rows appear, with older rows moving away from it.
+
+    pixel_format : {'float', 'uint8', 'rgba32'}, optional, default: 'uint8'
+        As for `remap`.
+
+    Other Parameters
+    ----------------
+    **kwargs :
+        These parameters are passed to `Remapper`.
+
+    Attributes
+    ----------
+    scale : `Scale`
+        `Scale` used to map the rows, or the subclass of `Scale` until it's fitted to the first rows.
+    image : `AxesImage <matplotlib.image.AxesImage>`
+        Image updated by `set_data <matplotlib.image.AxesImage.set_data>` as rows are appended, either as
+        created by `imshow`, or assigned, `None` by default.
+
+    Example
+    -------
+
+        >>> import ZtoRGBpy
+        >>> import numpy as np
+        >>> waterfall = ZtoRGBpy.Waterfall(1024, 600, ZtoRGBpy.LogScale(1e-4, 1.0))
+        >>> waterfall.imshow(aspect='auto')
+        >>> for samples in radio:
+        ...     waterfall.append(np.fft.fftshift(np.fft.fft(samples * window)))
+        ...     plt.pause(0.01)
+    """
+    def __init__(self, width, height, scale=None, profile=None, newest='top', pixel_format='uint8', **kwargs):
+        if int(width) < 1 or int(height) < 1:
+            raise ValueError("width and height must be at least 1.")
+        if newest not in ('top', 'bottom'):
+            raise ValueError("newest must be one of 'top' or 'bottom'.")
+        if pixel_format not in ('float', 'uint8', 'rgba32'):
+            raise ValueError("pixel_format must be one of 'float', 'uint8' or 'rgba32'.")
+        self.width = int(width)
+        self.height = int(height)
+        self.newest = newest
+        self.remapper = Remapper(scale, profile, pixel_format=pixel_format, **kwargs)
+        self.scale = self.remapper.scale
+        self.image = None
+        real_type = _resolve_precision(self.remapper.precision, np.complex64)[1]
+        tail = () if pixel_format == 'rgba32' else (3,)
+        self._buffer = np.empty((2 * self.height, self.width) + tail, _PIXEL_TYPES.get(pixel_format, real_type))
+        self._start = 0
+        self.clear()
+
+    @property
+    def rgb(self):
+        """`array <numpy.ndarray>` [``height``, ``width``, 3]: View of the mapped rows, in display order
+
+        A view of the ring buffer, valid until the next rows are appended. If ``pixel_format`` is 'rgba32' the
+        shape is [``height``, ``width``].
+        """
+        return self._buffer[self._start:self._start + self.height]
+
+    def clear(self):
+        """Discards every row, filling the image with the color of a zero value, once the scale is known"""
+        if isinstance(self.scale, Scale):
+            self._buffer[...] = self.remapper(np.zeros(1, np.complex64))[0]
+        else:
+            self._buffer[...] = 0
+        self._start = 0
+        self._update_image()
+
+    def append(self, rows):
+        """Maps and appends rows, scrolling the older rows away from the ``newest`` edge
+
+        Parameters
+        ----------
+        rows : `array_like <numpy.asarray>` [[N, ] ``width``]
+            Complex input data, as for ``data`` in `remap`, either a single row or N rows, oldest first. Only
+            the last ``height`` rows are mapped if more are given.
+
+        Returns
+        -------
+        rgb : `array <numpy.ndarray>` [``height``, ``width``, 3]
+            `rgb`, the view of the mapped rows, in display order.
+        """
+        if not all(hasattr(rows, attr) for attr in ('shape', 'dtype', '__getitem__')):
+            rows = np.asarray(rows)
+        if len(rows.shape) == 1:
+            rows = rows[np.newaxis]
+        if len(rows.shape) != 2 or rows.shape[1] != self.width:
+            raise ValueError("rows must have shape (width,) or (N, width).")
+        rows = rows[max(rows.shape[0] - self.height, 0):]
+        count = rows.shape[0]
+        if count == 0:
+            return self.rgb
+        if not isinstance(self.scale, Scale):
+            self.scale = self.remapper._fit(lambda: self.remapper._limits(rows))
+            self.remapper.scale = self.scale
+            self.clear()
+        if self.newest == 'top':
+            # Newest first, so the rows are written in reverse, in front of the current rows
+            self._start = (self._start - count) % self.height
+            rows = rows[::-1]
+            first = self._start
+        else:
+            self._start = (self._start + count) % self.height
+            first = self._start + self.height - count
+        # At most two runs of consecutive positions in the ring, each written to the first copy, and then
+        # copied to the second
+        done = 0
+        while done < count:
+            position = (first + done) % self.height
+            run = min(count - done, self.height - position)
+            mapped = self._buffer[position:position + run]
+            self.remapper(rows[done:done + run], out=mapped)
+            self._buffer[position + self.height:position + self.height + run] = mapped
+            done += run
+        self._update_image()
+        return self.rgb
+
+    def imshow(self, ax=None, **kwargs):
+        """Displays the mapped rows on the ax or the current axes, updating them as rows are appended
+
+        Parameters
+        ----------
+        ax : `Axes <matplotlib.axes.Axes>`, optional, default: `None`
+            The `axes <matplotlib.axes.Axes>` to plot to. If `None` use the current axes like
+            `pyplot.imshow <matplotlib.pyplot.imshow>`
+
+        Other Parameters
+        ----------------
+        **kwargs : `matplotlib.axes.Axes.imshow` parameters
+            These parameters are passed to the underlying matplotlib function
+
+        Returns
+        -------
+        image : `matplotlib.image.AxesImage`
+            Extra metadata about the complex mapping is added to this object, as for `ZtoRGBpy.imshow`.
+        """
+        import matplotlib.pyplot as plt
+        current_ax = plt.gca()
+        if ax is None:
+            ax = current_ax
+        self.image = ax.imshow(self._image_data(), **kwargs)
+        self._update_image()
+        plt.sca(ax)
+        plt.sci(self.image)
+        return self.image
+
+    def _image_data(self):
+        """Returns `rgb` in a form accepted by matplotlib, with 'rgba32' pixels viewed as 4 bytes"""
+        rgb = self.rgb
+        if rgb.dtype == np.uint32:
+            rgb = rgb.view(np.uint8).reshape(rgb.shape + (4,))
+        return rgb
+
+    def _update_image(self):
+        if self.image is None:
+            return
+        self.image.set_data(self._image_data())
+        # add meta data so ZtoRGBpy.colorbar can pull
+        #   scale and profile automatically
+        if isinstance(self.scale, Scale):
+            self.image._ZtoRGBpy__meta = {"scale": self.scale, "profile": self.remapper.profile}
+
+    def __repr__(self):
+        return "{0:s}.{1:s}({2:d}, {3:d}, {4!r:s}, {5!r:s}, newest={6!r:s})".format(
+            type(self).__module__, type(self).__name__, self.width, self.height, self.scale,
+            self.remapper.profile, self.newest)
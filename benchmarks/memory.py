@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+"""Peak memory of `remap` for complex64, strided and split-plane input
+
+Maps complex64 data, a non-contiguous FFT shifted view, and separate real and imaginary planes, each
+directly and after first converting it to a contiguous complex128 array, as was previously done by `remap`,
+and prints the peak memory allocated, measured by `tracemalloc`, and the time of each. Run from the
+repository, with ZtoRGBpy installed or on the ``PYTHONPATH``:
+
+    python benchmarks/memory.py --size 3000
+"""
+import argparse
+import time
+import tracemalloc
+
+import numpy as np
+
+import ZtoRGBpy
+
+
+def measure(function):
+    """Returns the peak memory allocated by, and the time of, a call to ``function``, after a first call"""
+    function()
+    tracemalloc.start()
+    try:
+        start = time.perf_counter()
+        function()
+        elapsed = time.perf_counter() - start
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return peak, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--size', type=int, default=3000, help="size of the square input array")
+    parser.add_argument('--scale', default='log', choices=('linear', 'log'))
+    args = parser.parse_args()
+
+    random = np.random.RandomState(0)
+    shape = (args.size, args.size)
+    data = (random.normal(size=shape) + 1j * random.normal(size=shape)).astype(np.complex64)
+    shifted = np.fft.fftshift(data)[:, ::-1]
+    real, imag = data.real.copy(), data.imag.copy()
+    out = np.empty(shape + (3,), np.uint8)
+    options = {'scale': args.scale, 'pixel_format': 'uint8', 'out': out}
+    cases = [('complex64', lambda: ZtoRGBpy.remap(data, **options),
+              lambda: ZtoRGBpy.remap(np.asarray(data, complex), **options)),
+             ('strided', lambda: ZtoRGBpy.remap(shifted, **options),
+              lambda: ZtoRGBpy.remap(np.ascontiguousarray(shifted, complex), **options)),
+             ('planes', lambda: ZtoRGBpy.remap(real=real, imag=imag, **options),
+              lambda: ZtoRGBpy.remap(real + 1j * imag, **options))]
+    print("{0:<10s} {1:>14s} {2:>14s} {3:>12s} {4:>12s}".format('input', 'direct (MiB)', 'copied (MiB)',
+                                                               'direct (ms)', 'copied (ms)'))
+    for name, direct, copied in cases:
+        direct_peak, direct_time = measure(direct)
+        copied_peak, copied_time = measure(copied)
+        print("{0:<10s} {1:14.1f} {2:14.1f} {3:12.1f} {4:12.1f}".format(
+            name, direct_peak / 2 ** 20, copied_peak / 2 ** 20, direct_time * 1e3, copied_time * 1e3))
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+"""Time of the colour stage for each built in profile
+
+Compares the colour stage of each backend, specialised for the profile's matrix and gamma, with the generic
+stage it replaced, using `numpy.einsum` and raising to the power ``1 / gamma``, for each built in profile.
+Run from the repository, with ZtoRGBpy installed or on the ``PYTHONPATH``:
+
+    python benchmarks/profiles.py --size 1000
+"""
+import argparse
+import timeit
+from functools import partial
+
+import numpy as np
+
+import ZtoRGBpy
+
+
+def generic_stage(profile, data):
+    """The original colour stage, mapping scaled complex ``data`` to RGB values"""
+    trans_matrix = profile.get_transform()
+    chroma_limit = profile.get_chroma_limit()
+    lightness_cutoff = (4 ** (1 / 3.0)) / 2
+    data = np.array(data, complex)
+    nan = np.isnan(data)
+    data[nan] = 0
+    magnitude = np.abs(data).reshape(*(data.shape + (1,)))
+    data = data.view(float).reshape(*(data.shape + (2,)))
+    luminance = (1 - (1 - lightness_cutoff) * np.clip(magnitude, 0, 1)) ** 3
+    chrome = chroma_limit * (1 - luminance)
+    rgb = np.einsum('qz,...z->...q', trans_matrix, data)
+    rgb /= (magnitude > 0) * magnitude + (magnitude == 0)
+    rgb *= chrome
+    rgb += luminance
+    rgb = profile.remove_gamma(rgb)
+    rgb[nan, :] = 0
+    return rgb
+
+
+def run_kernel(kernel, data, rgb, workspace):
+    """Calls ``kernel`` with a copy of ``data``, as kernels may overwrite their input"""
+    return kernel(data.copy(), rgb, workspace)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--size', type=int, default=1000, help="size of the square input array")
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    random = np.random.RandomState(0)
+    shape = (args.size, args.size)
+    data = (random.normal(size=shape) + 1j * random.normal(size=shape)) * 0.5
+    workspace = ZtoRGBpy.Workspace()
+    rgb = np.empty(shape + (3,))
+    print("{0:<10s} {1:<8s} {2:>10s} {3:>10s} {4:>8s} {5:>10s}".format('profile', 'engine', 'generic', 'time (ms)',
+                                                                      'speedup', 'max diff'))
+    for name in ('sRGB', 'sRGB_HIGH', 'sRGB_LOW'):
+        profile = getattr(ZtoRGBpy, name)
+        expected = generic_stage(profile, data)
+        generic = min(timeit.repeat(partial(generic_stage, profile, data), number=1, repeat=args.repeat))
+        for engine in ('numpy', 'numexpr', 'numba'):
+            try:
+                kernel = ZtoRGBpy.get_backend(engine)(profile, float)
+            except ImportError:
+                continue
+            run_kernel(kernel, data, rgb, workspace)
+            difference = float(np.max(np.abs(rgb - expected)))
+            elapsed = min(timeit.repeat(partial(run_kernel, kernel, data, rgb, workspace), number=1,
+                                        repeat=args.repeat))
+            print("{0:<10s} {1:<8s} {2:10.1f} {3:10.1f} {4:8.2f} {5:10.2g}".format(
+                name, engine, generic * 1e3, elapsed * 1e3, generic / elapsed, difference))
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+"""Scaling of `remap` with the number of worker threads
+
+Maps the same data with 1 to N worker threads, checking that the result is identical to the serial mapping,
+and prints the time of each, and the speedup over the serial mapping. Run from the repository, with ZtoRGBpy
+installed or on the ``PYTHONPATH``:
+
+    python benchmarks/threads.py --size 2000 --threads 8
+"""
+import argparse
+import os
+import timeit
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+import numpy as np
+
+import ZtoRGBpy
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--size', type=int, default=2000, help="size of the square input array")
+    parser.add_argument('--threads', type=int, default=os.cpu_count(), help="largest number of threads")
+    parser.add_argument('--scale', default='log', choices=('linear', 'log'))
+    parser.add_argument('--pixel-format', default='float', choices=('float', 'int', 'uint8', 'rgba32'))
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    random = np.random.RandomState(0)
+    shape = (args.size, args.size)
+    data = (random.normal(size=shape) + 1j * random.normal(size=shape)) * random.uniform(0, 10, shape)
+    options = {'scale': args.scale, 'pixel_format': args.pixel_format, 'workspace': ZtoRGBpy.Workspace()}
+    expected = ZtoRGBpy.remap(data, **options)
+    out = np.empty_like(expected)
+    serial = min(timeit.repeat(partial(ZtoRGBpy.remap, data, out=out, **options), number=1, repeat=args.repeat))
+    print("{0:>8s} {1:>10s} {2:>8s}".format('threads', 'time (ms)', 'speedup'))
+    print("{0:>8s} {1:10.1f} {2:8.2f}".format('serial', serial * 1e3, 1.0))
+    counts = sorted({args.threads} | {2 ** power for power in range(args.threads.bit_length())})
+    for threads in counts:
+        with ThreadPoolExecutor(threads) as executor:
+            ZtoRGBpy.remap(data, out=out, workers=executor, **options)
+            if not np.array_equal(out, expected, equal_nan=True):
+                raise AssertionError("{0:d} threads differ from the serial mapping".format(threads))
+            elapsed = min(timeit.repeat(partial(ZtoRGBpy.remap, data, out=out, workers=executor, **options),
+                                        number=1, repeat=args.repeat))
+        print("{0:8d} {1:10.1f} {2:8.2f}".format(threads, elapsed * 1e3, serial / elapsed))
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
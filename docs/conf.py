@@ -304,4 +304,5 @@ latex_documents = [
 intersphinx_mapping = {'python': ('http://docs.python.org/', None),
                        'numpy': ('http://docs.scipy.org/doc/numpy/', None),
                        'scipy': ('http://docs.scipy.org/doc/scipy/reference/', None),
-                       'matplotlib': ('http://matplotlib.org/2.2.4/', None)}
+                       'matplotlib': ('http://matplotlib.org/2.2.4/', None),
+                       'dask': ('https://docs.dask.org/en/stable/', None)}
@@ -47,7 +47,9 @@ setup(
     setup_requires=['packaging'],
     install_requires=['numpy>=1.6,<2'],
     extras_require={
-        'plot': ['matplotlib>=1.3,<3']
+        'plot': ['matplotlib>=1.3,<3'],
+        'numexpr': ['numexpr'],
+        'numba': ['numba']
     },
     classifiers=[
         "Development Status :: 5 - Production/Stable",
@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+"""Conformance of every registered backend with the 'numpy' reference backend"""
+import numpy as np
+import pytest
+
+import ZtoRGBpy
+from ZtoRGBpy._kernel import _BACKENDS
+
+
+class _CubedGamma(ZtoRGBpy.RGBColorProfile):
+    def remove_gamma(self, RGB, out=None):
+        return np.power(RGB, 3, out=out)
+
+
+_PROFILES = {'srgb': ZtoRGBpy.sRGB, 'srgb_low': ZtoRGBpy.sRGB_LOW, 'gamma2': ZtoRGBpy.RGBColorProfile(gamma=0.5),
+             'gamma045': ZtoRGBpy.RGBColorProfile(gamma=0.45), 'override': _CubedGamma()}
+
+# Maximum difference from the reference, for float RGB values and for the integer pixel formats, in levels
+_TOLERANCE = {'double': 1e-13, 'single': 2e-6}
+
+
+def _backend(name):
+    try:
+        ZtoRGBpy.get_backend(name)(ZtoRGBpy.sRGB, float)
+    except ImportError as error:
+        pytest.skip("backend {0!r:s} isn't available: {1!s:s}".format(name, error))
+    return name
+
+
+def _data():
+    rng = np.random.default_rng(0)
+    data = (rng.standard_normal((64, 48)) + 1j * rng.standard_normal((64, 48))) * np.logspace(-3, 1, 48)
+    data[0, :3] = np.nan
+    data[1, :3] = 0
+    data[2, 0] = complex(np.nan, 1)
+    data[2, 1] = 1e30
+    return data
+
+
+@pytest.mark.parametrize('name', sorted(_BACKENDS))
+@pytest.mark.parametrize('profile', sorted(_PROFILES))
+@pytest.mark.parametrize('precision', ['double', 'single'])
+@pytest.mark.parametrize('scale', ['linear', 'log'])
+def test_float(name, profile, precision, scale):
+    _backend(name)
+    kwargs = dict(scale=scale, profile=_PROFILES[profile], precision=precision)
+    expected = ZtoRGBpy.remap(_data(), engine='numpy', **kwargs)
+    actual = ZtoRGBpy.remap(_data(), engine=name, **kwargs)
+    assert actual.dtype == expected.dtype
+    np.testing.assert_array_equal(np.isnan(actual), np.isnan(expected))
+    np.testing.assert_allclose(actual, expected, rtol=0, atol=_TOLERANCE[precision])
+
+
+@pytest.mark.parametrize('name', sorted(_BACKENDS))
+@pytest.mark.parametrize('profile', ['srgb', 'srgb_low', 'override'])
+@pytest.mark.parametrize('pixel_format', ['int', 'uint8', 'rgba32'])
+def test_quantized(name, profile, pixel_format):
+    _backend(name)
+    kwargs = dict(scale='log', profile=_PROFILES[profile], pixel_format=pixel_format)
+    expected = ZtoRGBpy.remap(_data(), engine='numpy', **kwargs)
+    actual = ZtoRGBpy.remap(_data(), engine=name, **kwargs)
+    assert actual.dtype == expected.dtype
+    if pixel_format == 'rgba32':
+        actual, expected = actual.view(np.uint8), expected.view(np.uint8)
+    assert np.max(np.abs(actual.astype(int) - expected.astype(int))) <= 1
+
+
+@pytest.mark.parametrize('name', sorted(_BACKENDS))
+def test_tiled_threads(name):
+    _backend(name)
+    expected = ZtoRGBpy.remap(_data(), 'log', engine='numpy')
+    actual = ZtoRGBpy.remap(_data(), 'log', engine=name, chunk_bytes=4096, workers=2)
+    np.testing.assert_allclose(actual, expected, rtol=0, atol=_TOLERANCE['double'])
+
+
+class _MinimalKernel(object):
+    """Kernel implementing only the required methods, delegating to the reference backend"""
+    def __init__(self, profile, real_type, trans_matrix=None, chroma_limit=None):
+        self._reference = ZtoRGBpy.get_backend('numpy')(profile, real_type, trans_matrix, chroma_limit)
+        self.dtype = self._reference.dtype
+
+    def __call__(self, data, rgb, workspace):
+        return self._reference(data, rgb, workspace)
+
+    def quantized(self, data, out, workspace):
+        return self._reference.quantized(data, out, workspace)
+
+
+@pytest.fixture
+def minimal_backend():
+    ZtoRGBpy.register_backend('minimal', _MinimalKernel)
+    yield 'minimal'
+    del _BACKENDS['minimal']
+
+
+@pytest.mark.parametrize('pixel_format', ['float', 'uint8', 'rgba32'])
+def test_minimal_kernel(minimal_backend, pixel_format):
+    magnitude = np.abs(_data())
+    phase = np.angle(_data())
+    for args, remap in (((magnitude, phase), ZtoRGBpy.remap_polar), ((_data().real,), ZtoRGBpy.remap)):
+        expected = remap(*args, scale='log', pixel_format=pixel_format, engine='numpy')
+        actual = remap(*args, scale='log', pixel_format=pixel_format, engine=minimal_backend)
+        if pixel_format == 'float':
+            np.testing.assert_allclose(actual, expected, rtol=0, atol=_TOLERANCE['double'])
+        else:
+            actual, expected = actual.view(np.uint8), expected.view(np.uint8)
+            assert np.max(np.abs(actual.astype(int) - expected.astype(int))) <= 1
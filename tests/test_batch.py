@@ -0,0 +1,33 @@
+# -*- coding: utf-8 -*-
+"""Tests of mapping batches of arrays"""
+import numpy as np
+import pytest
+
+import ZtoRGBpy
+
+
+def _items():
+    random = np.random.RandomState(7)
+    return [(random.normal(size=shape) + 1j * random.normal(size=shape)) * 10.0 ** power
+            for power, shape in enumerate([(5, 7), (12, 3), (1, 20)])]
+
+
+@pytest.mark.parametrize('scale', ['linear', 'log'])
+@pytest.mark.parametrize('chunk_bytes', [None, 256])
+def test_batch_per_item_matches_remap(scale, chunk_bytes):
+    items = _items()
+    rgb, scales, _ = ZtoRGBpy.remap_batch(items, scale, per_item=True, chunk_bytes=chunk_bytes, return_metadata=True)
+    for item, item_rgb, item_scale in zip(items, rgb, scales):
+        expected, expected_scale = ZtoRGBpy.remap(item, scale, return_metadata=True)[:2]
+        assert repr(item_scale) == repr(expected_scale)
+        np.testing.assert_array_equal(item_rgb, expected)
+
+
+@pytest.mark.parametrize('scale', ['linear', 'log', ZtoRGBpy.LogScale(0.01, 10.0)])
+def test_batch_matches_remap(scale):
+    items = _items()
+    stacked = np.concatenate([item.reshape(-1) for item in items])
+    expected, expected_scale = ZtoRGBpy.remap(stacked, scale, return_metadata=True)[:2]
+    rgb, actual_scale, _ = ZtoRGBpy.remap_batch(items, scale, return_metadata=True)
+    assert repr(actual_scale) == repr(expected_scale)
+    np.testing.assert_array_equal(np.concatenate([item_rgb.reshape(-1, 3) for item_rgb in rgb]), expected)
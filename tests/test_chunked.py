@@ -0,0 +1,41 @@
+# -*- coding: utf-8 -*-
+"""Tests of mapping in blocks of rows, and from and to memory mapped arrays"""
+import numpy as np
+import pytest
+
+import ZtoRGBpy
+
+
+def _data(dtype=complex):
+    random = np.random.RandomState(11)
+    data = (random.normal(size=(67, 41)) + 1j * random.normal(size=(67, 41))) * random.uniform(0, 8, (67, 41))
+    data[5, 6] = np.nan
+    return data.astype(dtype)
+
+
+@pytest.mark.parametrize('pixel_format', ['float', 'int', 'uint8', 'rgba32'])
+@pytest.mark.parametrize('scale', ['linear', 'log', ZtoRGBpy.LogScale(0.1, 10.0)])
+@pytest.mark.parametrize('chunk_bytes', [1, 4096, 100000])
+def test_chunked_matches_in_memory(pixel_format, scale, chunk_bytes):
+    data = _data()
+    expected, expected_scale, _ = ZtoRGBpy.remap(data, scale, pixel_format=pixel_format, return_metadata=True)
+    actual, actual_scale, _ = ZtoRGBpy.remap(data, scale, pixel_format=pixel_format, chunk_bytes=chunk_bytes,
+                                             return_metadata=True)
+    assert repr(actual_scale) == repr(expected_scale)
+    np.testing.assert_array_equal(actual, expected)
+
+
+@pytest.mark.parametrize('dtype', [complex, np.complex64, float])
+@pytest.mark.parametrize('pixel_format', ['float', 'uint8'])
+def test_memmap_matches_in_memory(tmp_path, dtype, pixel_format):
+    data = _data(np.complex128 if dtype is float else dtype)
+    if dtype is float:
+        data = data.real.copy()
+    np.save(tmp_path / 'data.npy', data)
+    expected = ZtoRGBpy.remap(data, 'log', pixel_format=pixel_format)
+    source = np.load(tmp_path / 'data.npy', mmap_mode='r')
+    out = np.lib.format.open_memmap(tmp_path / 'rgb.npy', 'w+', expected.dtype, expected.shape)
+    assert ZtoRGBpy.remap(source, 'log', pixel_format=pixel_format, chunk_bytes=2048, out=out) is out
+    out.flush()
+    del out
+    np.testing.assert_array_equal(np.load(tmp_path / 'rgb.npy'), expected)
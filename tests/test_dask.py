@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+"""Tests of mapping chunked lazy dask arrays"""
+import numpy as np
+import pytest
+
+import ZtoRGBpy
+
+dask = pytest.importorskip('dask')
+da = pytest.importorskip('dask.array')
+
+
+def _forbid_compute(*args, **kwargs):
+    raise AssertionError("the mapping was computed before being requested")
+
+
+def _data(dtype=complex):
+    random = np.random.RandomState(29)
+    data = (random.normal(size=(150, 120)) + 1j * random.normal(size=(150, 120))) * np.logspace(-3, 1, 120)
+    data[5, 5] = np.nan
+    return data.real.copy() if dtype is float else data.astype(dtype)
+
+
+@pytest.mark.parametrize('dtype', [complex, np.complex64, float])
+@pytest.mark.parametrize('pixel_format', ['float', 'int', 'uint8', 'rgba32'])
+@pytest.mark.parametrize('scale', ['linear', 'log', ZtoRGBpy.LogScale(1e-3, 10.0)])
+def test_lazy_matches_numpy(dtype, pixel_format, scale):
+    data = _data(dtype)
+    lazy = da.from_array(data, chunks=(64, 50))
+    with dask.config.set(scheduler=_forbid_compute):
+        rgb = ZtoRGBpy.remap(lazy, scale, pixel_format=pixel_format)
+    assert isinstance(rgb, da.Array)
+    assert rgb.chunks[:2] == lazy.chunks
+    expected = ZtoRGBpy.remap(data, scale, pixel_format=pixel_format)
+    assert rgb.dtype == expected.dtype
+    np.testing.assert_array_equal(rgb.compute(scheduler='synchronous'), expected)
+
+
+def test_lazy_metadata_and_out():
+    data = _data()
+    lazy = da.from_array(data, chunks=(64, 50))
+    expected, expected_scale, _ = ZtoRGBpy.remap(data, 'log', return_metadata=True)
+    with dask.config.set(scheduler='synchronous'):
+        # The fitted scale is returned, so the limits are computed, while the mapping stays lazy
+        rgb, scale, _ = ZtoRGBpy.remap(lazy, 'log', return_metadata=True)
+        assert isinstance(rgb, da.Array)
+        assert repr(scale) == repr(expected_scale)
+        np.testing.assert_array_equal(rgb.compute(), expected)
+        out = np.empty_like(expected)
+        assert ZtoRGBpy.remap(lazy, 'log', out=out) is out
+    np.testing.assert_array_equal(out, expected)
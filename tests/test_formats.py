@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+"""Tests of the pixel formats of the mapped RGB values"""
+import numpy as np
+import pytest
+
+import ZtoRGBpy
+
+
+def _data():
+    random = np.random.RandomState(5)
+    data = (random.normal(size=(70, 90)) + 1j * random.normal(size=(70, 90))) * random.uniform(0, 4, (70, 90))
+    data[1, 2] = np.nan
+    data[3, 4] = 0
+    return data
+
+
+@pytest.mark.parametrize('precision', ['double', 'single'])
+@pytest.mark.parametrize('scale', ['linear', 'log'])
+@pytest.mark.parametrize('real', [False, True])
+def test_uint8_rounds_float(precision, scale, real):
+    data = _data().real if real else _data()
+    rgb = ZtoRGBpy.remap(data, scale, precision=precision)
+    expected = np.clip(np.rint(rgb * 255), 0, 255).astype(np.uint8)
+    actual = ZtoRGBpy.remap(data, scale, precision=precision, pixel_format='uint8')
+    assert actual.dtype == np.uint8 and actual.shape == data.shape + (3,)
+    np.testing.assert_array_equal(actual, expected)
+    np.testing.assert_array_equal(actual[1, 2], 0)
+
+
+@pytest.mark.parametrize('precision', ['double', 'single'])
+def test_rgba32_packs_uint8(precision):
+    data = _data()
+    expected = ZtoRGBpy.remap(data, 'log', precision=precision, pixel_format='uint8')
+    actual = ZtoRGBpy.remap(data, 'log', precision=precision, pixel_format='rgba32')
+    assert actual.dtype == np.uint32 and actual.shape == data.shape
+    # The bytes are ordered R, G, B, A in memory
+    channels = actual.view(np.uint8).reshape(data.shape + (4,))
+    np.testing.assert_array_equal(channels[..., :3], expected)
+    np.testing.assert_array_equal(channels[..., 3], 255)
+
+
+def test_int_truncates_float():
+    data = _data()
+    expected = (ZtoRGBpy.remap(data) * 255).astype('i8')
+    np.testing.assert_array_equal(ZtoRGBpy.remap(data, pixel_format='int'), expected)
+    np.testing.assert_array_equal(ZtoRGBpy.remap(data, return_int=True), expected)
+
+
+@pytest.mark.parametrize('pixel_format', ['uint8', 'rgba32'])
+def test_quantized_out(pixel_format):
+    data = _data()
+    expected = ZtoRGBpy.remap(data, pixel_format=pixel_format)
+    out = np.empty_like(expected)
+    assert ZtoRGBpy.remap(data, pixel_format=pixel_format, out=out) is out
+    np.testing.assert_array_equal(out, expected)
+    with pytest.raises(ValueError):
+        ZtoRGBpy.remap(data[:, :45], pixel_format=pixel_format, out=np.empty_like(expected)[:, ::2])
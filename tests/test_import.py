@@ -0,0 +1,42 @@
+# -*- coding: utf-8 -*-
+"""Tests of the package namespace and import time"""
+import subprocess
+import sys
+
+import pytest
+
+import ZtoRGBpy
+
+
+def _run(code):
+    return subprocess.run([sys.executable, '-c', code], check=True, capture_output=True, text=True).stdout.split()
+
+
+def test_import_defers_slow_modules():
+    # matplotlib.pyplot, multiprocessing and concurrent.futures dominate the import time when imported eagerly
+    loaded = _run("import sys, ZtoRGBpy\n"
+                  "print(*[name for name in ('matplotlib', 'multiprocessing', 'concurrent.futures')"
+                  " if name in sys.modules])")
+    assert loaded == []
+
+
+def test_import_time():
+    # Importing ZtoRGBpy after numpy takes a few milliseconds, against several hundred for matplotlib.pyplot alone,
+    # the bound leaves room for slow machines while catching an eager import of it
+    elapsed = _run("import time, numpy\n"
+                   "start = time.perf_counter()\n"
+                   "import ZtoRGBpy\n"
+                   "print(time.perf_counter() - start)")
+    assert float(elapsed[0]) < 0.25
+
+
+def test_star_import_includes_lazy_names():
+    pytest.importorskip('matplotlib')
+    names = _run("from ZtoRGBpy import *\n"
+                 "print(*[name for name in ('imshow', 'colorbar', 'colorwheel', 'ProcessRemapper') if name in globals()])")
+    assert names == ['imshow', 'colorbar', 'colorwheel', 'ProcessRemapper']
+
+
+def test_all_names_defined():
+    for name in ZtoRGBpy.__all__:
+        assert getattr(ZtoRGBpy, name).__module__ == 'ZtoRGBpy'
@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+"""Tests of the blockwise magnitude limits used to fit a scale"""
+import numpy as np
+import pytest
+
+import ZtoRGBpy
+from ZtoRGBpy._core import _BLOCK_SIZE, _block_limits
+
+
+def _values(size, dtype=complex, seed=19):
+    random = np.random.RandomState(seed)
+    values = (random.normal(size=size) + 1j * random.normal(size=size)) * random.uniform(0, 100, size)
+    values[::97] = np.nan
+    return values.astype(dtype)
+
+
+def _expected(values):
+    magnitude = np.abs(values.astype(float) if values.dtype.kind in 'biu' else values)
+    return np.nanmin(magnitude), np.nanmax(magnitude)
+
+
+@pytest.mark.parametrize('size', [2, 1000, _BLOCK_SIZE, 2 * _BLOCK_SIZE + 17])
+@pytest.mark.parametrize('dtype', [complex, np.complex64, float, np.float32])
+def test_block_limits_match_global(size, dtype):
+    values = _values(size, dtype if np.dtype(dtype).kind == 'c' else complex)
+    if np.dtype(dtype).kind == 'f':
+        values = values.real.astype(dtype)
+    assert _block_limits(values) == _expected(values)
+    # With magnitude given, the magnitude of every value is also written to it
+    magnitude = np.empty(values.shape, np.finfo(values.dtype).dtype)
+    assert _block_limits(values, ZtoRGBpy.Workspace(), magnitude) == _expected(values)
+    np.testing.assert_array_equal(magnitude, np.abs(values))
+
+
+def test_block_limits_nan_blocks():
+    # A block of only NaNs doesn't affect the limits, which are NaN only if every value is NaN
+    values = _values(3 * _BLOCK_SIZE)
+    values[:_BLOCK_SIZE] = np.nan
+    assert _block_limits(values) == _expected(values)
+    values[:] = np.nan
+    assert all(np.isnan(limit) for limit in _block_limits(values))
+
+
+@pytest.mark.parametrize('options', [{}, {'chunk_bytes': 20000}, {'workers': 2}, {'chunk_bytes': 20000, 'workers': 2}])
+def test_fitted_scale_matches_global_limits(options):
+    values = _values(300 * 401).reshape(300, 401)
+    scale = ZtoRGBpy.remap(values, 'log', return_metadata=True, **options)[1]
+    assert repr(scale) == repr(ZtoRGBpy.LogScale(*_expected(values)))
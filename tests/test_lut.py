@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+"""Tests of mapping using a lookup table"""
+import numpy as np
+import pytest
+
+import ZtoRGBpy
+
+
+def _data():
+    y, x = np.mgrid[-1:1:61j, -1:1:53j]
+    data = (x + 1j * y) * 3
+    data[3, 4] = np.nan
+    return data
+
+
+@pytest.mark.parametrize('size, interpolation, error', [((64, 256), 'nearest', 0.019),
+                                                        ((64, 256), 'bilinear', 0.00013),
+                                                        ((256, 1024), 'nearest', 0.0048),
+                                                        ((256, 1024), 'bilinear', 0.0000078)])
+def test_max_error_as_documented(size, interpolation, error):
+    # The errors given in the notes of LUTRemapper, to two significant figures
+    actual = ZtoRGBpy.LUTRemapper(size=size, interpolation=interpolation).max_error()
+    assert actual == pytest.approx(error, rel=0.05)
+
+
+@pytest.mark.parametrize('interpolation', ['nearest', 'bilinear'])
+def test_rgba32_matches_uint8(interpolation):
+    data = _data()
+    rgb = ZtoRGBpy.LUTRemapper('log', interpolation=interpolation, pixel_format='uint8')(data)
+    rgba = ZtoRGBpy.LUTRemapper('log', interpolation=interpolation, pixel_format='rgba32')(data)
+    assert rgba.dtype == np.uint32 and rgba.shape == data.shape
+    rgba = rgba.view(np.uint8).reshape(data.shape + (4,))
+    np.testing.assert_array_equal(rgba[..., :3], rgb)
+    np.testing.assert_array_equal(rgba[..., 3], 255)
+    np.testing.assert_array_equal(rgb[3, 4], 0)
+
+
+@pytest.mark.parametrize('interpolation', ['nearest', 'bilinear'])
+def test_uint8_matches_float(interpolation):
+    data = _data()
+    expected = np.rint(ZtoRGBpy.LUTRemapper('log', interpolation=interpolation)(data) * 255)
+    actual = ZtoRGBpy.LUTRemapper('log', interpolation=interpolation, pixel_format='uint8')(data)
+    # The nearest 8 bit colours are looked up from a table rounded from the float table
+    np.testing.assert_array_equal(actual, expected)
+
+
+def test_planes_use_table():
+    # Real values and values given by their magnitude and phase are looked up from the table, as are complex values
+    data = _data()
+    remapper = ZtoRGBpy.LUTRemapper(ZtoRGBpy.LinearScale(5.0), size=(8, 16), interpolation='bilinear')
+    exact = ZtoRGBpy.Remapper(ZtoRGBpy.LinearScale(5.0))
+    expected = remapper(data.real + 0j)
+    np.testing.assert_allclose(remapper(data.real), expected, rtol=0, atol=1e-12)
+    assert np.nanmax(np.abs(exact(data.real) - expected)) > 1e-3
+    magnitude, phase = np.abs(data), np.angle(data)
+    expected = remapper(data)
+    np.testing.assert_allclose(remapper.polar(magnitude, phase), expected, rtol=0, atol=1e-9)
+    assert np.nanmax(np.abs(exact.polar(magnitude, phase) - expected)) > 1e-3
+    pairs = np.stack([data.real, data.imag], -1).astype(np.float32)
+    np.testing.assert_allclose(remapper.iq(pairs, 'float32', data.shape), remapper(pairs[..., 0] + 1j * pairs[..., 1]),
+                               rtol=0, atol=1e-6)
@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+"""Tests of mapping using a pool of processes"""
+import gc
+
+import numpy as np
+import pytest
+
+import ZtoRGBpy
+
+shared_memory = pytest.importorskip('multiprocessing.shared_memory')
+
+
+class _TanhScale(ZtoRGBpy.Scale):
+    # A scale implemented in python, fitted in the parent and sent to the workers with each tile
+    def __init__(self, vmax=1.0):
+        ZtoRGBpy.Scale.__init__(self)
+        self.mag = float(vmax)
+
+    def __call__(self, value):
+        return np.tanh(value / self.mag)
+
+
+def _data():
+    y, x = np.mgrid[-1:1:97j, -1:1:83j]
+    return (x + 1j * y) * 3
+
+
+@pytest.mark.parametrize('pixel_format', ['float', 'uint8'])
+@pytest.mark.parametrize('scale', ['linear', 'log', ZtoRGBpy.LogScale(0.01, 5.0), _TanhScale, _TanhScale(2.0)])
+def test_process_remapper_matches_remap(scale, pixel_format):
+    data = _data()
+    expected, expected_scale, profile = ZtoRGBpy.remap(data, scale, pixel_format=pixel_format, return_metadata=True)
+    with ZtoRGBpy.ProcessRemapper(scale, processes=2, pixel_format=pixel_format, chunk_bytes=2 ** 14) as remapper:
+        rgb, actual_scale, actual_profile = remapper(data, return_metadata=True)
+        np.testing.assert_array_equal(rgb, expected)
+        assert repr(actual_scale) == repr(expected_scale)
+        assert actual_profile is profile
+        # A later call with smaller data reuses the shared memory
+        np.testing.assert_array_equal(remapper(data[:50]), ZtoRGBpy.remap(data[:50], scale, pixel_format=pixel_format))
+
+
+def test_process_remapper_released_when_collected():
+    remapper = ZtoRGBpy.ProcessRemapper('linear', processes=1)
+    remapper(_data())
+    names = [block.name for block in remapper._shared.values()]
+    pool = remapper._pool
+    del remapper
+    gc.collect()
+    for name in names:
+        with pytest.raises(FileNotFoundError):
+            shared_memory.SharedMemory(name)
+    with pytest.raises(ValueError):
+        pool.apply(int)
@@ -0,0 +1,25 @@
+# -*- coding: utf-8 -*-
+"""Tests of mapping values given by their magnitude and phase"""
+import numpy as np
+import pytest
+
+import ZtoRGBpy
+
+
+class _SqrtScale(ZtoRGBpy.LinearScale):
+    # Overrides only __call__, so the inherited LinearScale.polar doesn't match it
+    def __call__(self, value, magnitude=None, out=None):
+        return np.sqrt(value / self.mag)
+
+
+def _polar_data():
+    y, x = np.mgrid[-1:1:37j, -1:1:41j]
+    data = (x + 1j * y) * 3
+    return np.abs(data), np.angle(data)
+
+
+@pytest.mark.parametrize('scale', ['linear', 'log', _SqrtScale, _SqrtScale(2.0)])
+def test_polar_matches_remap(scale):
+    magnitude, phase = _polar_data()
+    expected = ZtoRGBpy.remap(magnitude * np.exp(1j * phase), scale)
+    np.testing.assert_allclose(ZtoRGBpy.remap_polar(magnitude, phase, scale), expected, rtol=0, atol=1e-12)
@@ -0,0 +1,34 @@
+# -*- coding: utf-8 -*-
+"""Tests of RGBColorProfile subclasses overriding remove_gamma"""
+import numpy as np
+import pytest
+
+import ZtoRGBpy
+
+
+class _Cubed(ZtoRGBpy.RGBColorProfile):
+    """Baseline signature, without ``out``"""
+    def remove_gamma(self, RGB):
+        return np.asarray(RGB) ** 3
+
+
+class _CubedCopy(ZtoRGBpy.RGBColorProfile):
+    """Accepts ``out``, but returns a new array"""
+    def remove_gamma(self, RGB, out=None):
+        return np.asarray(RGB) ** 3
+
+
+class _CubedInPlace(ZtoRGBpy.RGBColorProfile):
+    def remove_gamma(self, RGB, out=None):
+        return np.power(RGB, 3, out=out)
+
+
+@pytest.mark.parametrize('profile', [_Cubed, _CubedCopy, _CubedInPlace])
+@pytest.mark.parametrize('engine', ['numpy', 'numexpr', 'numba'])
+def test_remove_gamma_override(profile, engine):
+    if engine != 'numpy':
+        pytest.importorskip(engine)
+    data = np.array([0.3 + 0.4j, -0.7 + 0.1j, np.nan])
+    expected = ZtoRGBpy.remap(data, ZtoRGBpy.LinearScale(1), ZtoRGBpy.RGBColorProfile(gamma=1)) ** 3
+    actual = ZtoRGBpy.remap(data, ZtoRGBpy.LinearScale(1), profile(gamma=1), engine=engine)
+    np.testing.assert_allclose(actual, expected, rtol=1e-12, atol=0)
@@ -0,0 +1,44 @@
+# -*- coding: utf-8 -*-
+"""Tests of the fast path for real input"""
+import numpy as np
+import pytest
+
+import ZtoRGBpy
+
+
+def _data(dtype):
+    random = np.random.RandomState(31)
+    data = random.normal(size=(80, 70)) * random.uniform(0, 6, (80, 70))
+    data[0, :4] = [0, -0.0, np.nan, 1e-300]
+    return data.astype(dtype)
+
+
+_SCALES = ['linear', 'log', ZtoRGBpy.LinearScale(2.0), ZtoRGBpy.LogScale(0.01, 4.0),
+           ZtoRGBpy.TabulatedScale.from_scale(ZtoRGBpy.LogScale(0.01, 4.0))]
+
+
+@pytest.mark.parametrize('dtype', [np.float64, np.float32])
+@pytest.mark.parametrize('pixel_format', ['float', 'uint8', 'rgba32'])
+@pytest.mark.parametrize('scale', _SCALES)
+def test_real_matches_complex(dtype, pixel_format, scale):
+    data = _data(dtype)
+    complex_data = data.astype(np.result_type(dtype, np.complex64))
+    expected = ZtoRGBpy.remap(complex_data, scale, pixel_format=pixel_format, precision='auto')
+    actual = ZtoRGBpy.remap(data, scale, pixel_format=pixel_format, precision='auto')
+    np.testing.assert_array_equal(actual, expected)
+
+
+@pytest.mark.parametrize('scale', _SCALES[2:])
+def test_real_infinities_match_complex(scale):
+    # Infinite scaled values have a NaN imaginary part, so are mapped as complex values
+    data = _data(np.float64)
+    data[1, :2] = [np.inf, -np.inf]
+    np.testing.assert_array_equal(ZtoRGBpy.remap(data, scale), ZtoRGBpy.remap(data + 0j, scale))
+
+
+@pytest.mark.parametrize('scale', [ZtoRGBpy.LinearScale(2.0), ZtoRGBpy.LogScale(0.01, 4.0)])
+def test_scale_real_is_real_part(scale):
+    data = _data(np.float64)
+    expected = scale(data + 0j).real
+    np.testing.assert_array_equal(scale._real(data, out=np.empty_like(data)), expected)
+    np.testing.assert_array_equal(scale._real(data, np.abs(data), out=np.empty_like(data)), expected)
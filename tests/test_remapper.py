@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+"""Tests of the precompiled Remapper against remap"""
+import numpy as np
+import pytest
+
+import ZtoRGBpy
+
+
+def _data(shape=(64, 64), seed=13):
+    random = np.random.RandomState(seed)
+    return (random.normal(size=shape) + 1j * random.normal(size=shape)) * random.uniform(0, 5, shape)
+
+
+@pytest.mark.parametrize('profile', [None, 'srgb_high', 'srgb_low', ZtoRGBpy.sRGB])
+@pytest.mark.parametrize('scale', [None, 'log', ZtoRGBpy.LogScale(0.01, 2.0), ZtoRGBpy.LinearScale])
+@pytest.mark.parametrize('options', [{}, {'pixel_format': 'uint8'}, {'pixel_format': 'int'},
+                                     {'precision': 'single'}])
+def test_remapper_matches_remap(profile, scale, options):
+    remapper = ZtoRGBpy.Remapper(scale, profile, **options)
+    # Repeated calls, with data of different shapes, reuse the remapper's buffers
+    for data in (_data(), _data((8, 100), 14), _data(seed=15)):
+        expected, expected_scale, expected_profile = ZtoRGBpy.remap(data, scale, profile, return_metadata=True,
+                                                                    **options)
+        actual, actual_scale, actual_profile = remapper(data, return_metadata=True)
+        np.testing.assert_array_equal(actual, expected)
+        assert repr(actual_scale) == repr(expected_scale)
+        assert repr(actual_profile) == repr(expected_profile)
+
+
+def test_remapper_scale_arguments():
+    # Keyword arguments are passed to the fitted scale on every call
+    data = _data()
+    expected, scale, _ = ZtoRGBpy.remap(data, 'log', lmax=0.5, return_metadata=True)
+    assert scale.lightness_max == 0.5
+    np.testing.assert_array_equal(ZtoRGBpy.Remapper('log', lmax=0.5)(data), expected)
+
+
+def test_remapper_out_and_workspace():
+    data = _data()
+    remapper = ZtoRGBpy.Remapper('log')
+    expected = ZtoRGBpy.remap(data, 'log')
+    out = np.empty_like(expected)
+    assert remapper(data, out=out, workspace=ZtoRGBpy.Workspace()) is out
+    np.testing.assert_array_equal(out, expected)
+    np.testing.assert_array_equal(remapper(real=data.real, imag=data.imag), expected)
+
+
+def test_remapper_invalid_arguments():
+    with pytest.raises(ValueError):
+        ZtoRGBpy.Remapper(scale='cubic')
+    with pytest.raises(ValueError):
+        ZtoRGBpy.Remapper(profile='adobe')
@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+"""Tests of the built in scales"""
+import numpy as np
+import pytest
+
+import ZtoRGBpy
+
+
+@pytest.mark.parametrize('data', [np.ones((4, 4), complex), np.array([0.5 + 0.5j]), np.full((3, 2), 2.0)])
+@pytest.mark.parametrize('precision', ['double', 'single'])
+def test_log_constant_magnitude(data, precision):
+    # A LogScale fitted to data of constant magnitude has vmin == vmax, the values are undefined and map to black
+    rgb, scale, _ = ZtoRGBpy.remap(data, 'log', precision=precision, return_metadata=True)
+    assert scale.factor == np.inf
+    np.testing.assert_array_equal(rgb, 0)
+
+
+def test_log_constant_magnitude_incremental():
+    rows = np.ones((2, 3), complex)
+    np.testing.assert_array_equal(ZtoRGBpy.Waterfall(3, 2, 'log').append(rows), 0)
+    target = ZtoRGBpy.RenderTarget(rows, 'log')
+    target.update(np.s_[:1])
+    np.testing.assert_array_equal(target.rgb, 0)
+    for rgb in ZtoRGBpy.remap_stream([rows, rows], 'log'):
+        np.testing.assert_array_equal(rgb, 0)
+
+
+@pytest.mark.parametrize('dtype', [bool, np.int8, np.int64, np.uint16])
+def test_fit_integer_data(dtype):
+    data = np.array([1, 0, 5, 3, 1], dtype)
+    if np.dtype(dtype).kind == 'i':
+        data[1] = np.iinfo(dtype).min
+    expected = ZtoRGBpy.remap(data, 'log', return_metadata=True)[1]
+    assert repr(ZtoRGBpy.fit_scale(data, 'log')) == repr(expected)
+
+
+@pytest.mark.parametrize('dtype', [bool, np.int8, np.int16, np.int64, np.uint16])
+def test_fit_percentile_integer_data(dtype):
+    data = np.array([1, 0, 5, 3, 1], dtype)
+    if np.dtype(dtype).kind == 'i':
+        data[1] = np.iinfo(dtype).min
+    magnitude = np.abs(data.astype(float))
+    scale = ZtoRGBpy.fit_scale(data, 'linear', percentile=(0, 100))
+    assert scale.mag == magnitude.max()
+
+
+@pytest.mark.parametrize('estimator', [ZtoRGBpy.MinMaxEstimator, ZtoRGBpy.QuantileSketch])
+@pytest.mark.parametrize('dtype', [bool, np.int8, np.int64, np.uint16])
+def test_estimator_integer_data(estimator, dtype):
+    data = np.array([1, 0, 5, 3, 1], dtype)
+    if np.dtype(dtype).kind == 'i':
+        data[1] = np.iinfo(dtype).min
+    magnitude = np.abs(data.astype(float))
+    limits = estimator().update(data[:2]).update(data[2:]).limits()
+    if estimator is ZtoRGBpy.MinMaxEstimator:
+        assert limits == (magnitude.min(), magnitude.max())
+    else:
+        assert magnitude.min() <= limits[0] <= limits[1] <= magnitude.max()
+
+
+class _LegacyScale(ZtoRGBpy.Scale):
+    # A user scale written for the original protocol, whose __call__ accepts only the value
+    def __init__(self, vmax=1.0):
+        ZtoRGBpy.Scale.__init__(self)
+        self.mag = float(vmax)
+
+    def __call__(self, value):
+        return np.tanh(value / self.mag)
+
+
+def _scale_data():
+    y, x = np.mgrid[-1:1:23j, -1:1:19j]
+    return (x + 1j * y) * 3
+
+
+@pytest.mark.parametrize('scale', [ZtoRGBpy.LinearScale(3.0), ZtoRGBpy.LogScale(0.1, 5.0),
+                                   ZtoRGBpy.TabulatedScale.from_scale(ZtoRGBpy.LogScale(0.1, 5.0))])
+def test_call_magnitude_and_out(scale):
+    data = _scale_data()
+    expected = scale(data.copy())
+    magnitude = np.abs(data)
+    np.testing.assert_array_equal(scale(data.copy(), magnitude=magnitude.copy()), expected)
+    out = np.empty_like(data)
+    assert scale(data.copy(), magnitude=magnitude, out=out) is out
+    np.testing.assert_array_equal(out, expected)
+    # Neither the value nor its magnitude are modified
+    np.testing.assert_array_equal(magnitude, np.abs(data))
+    value = data.copy()
+    scale(value, out=out)
+    np.testing.assert_array_equal(value, data)
+    # Scaling in place, with out the value itself
+    assert scale(value, out=value) is value
+    np.testing.assert_array_equal(value, expected)
+
+
+@pytest.mark.parametrize('real', [False, True])
+def test_legacy_scale(real):
+    data = _scale_data()
+    if real:
+        data = data.real.copy()
+    expected = ZtoRGBpy.remap(np.tanh(data / 3.0), ZtoRGBpy.LinearScale(1.0))
+    np.testing.assert_allclose(ZtoRGBpy.remap(data, _LegacyScale(3.0)), expected, rtol=0, atol=1e-12)
+    # Fitted to the maximum magnitude of the data
+    expected = ZtoRGBpy.remap(np.tanh(data / np.abs(data).max()), ZtoRGBpy.LinearScale(1.0))
+    np.testing.assert_allclose(ZtoRGBpy.remap(data, _LegacyScale), expected, rtol=0, atol=1e-12)
+    remapper = ZtoRGBpy.Remapper(_LegacyScale)
+    out = remapper(data)
+    assert remapper(data, out=out) is out
+    np.testing.assert_allclose(out, expected, rtol=0, atol=1e-12)
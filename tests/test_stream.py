@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+"""Tests of mapping sequences of frames with a common scale"""
+import numpy as np
+import pytest
+
+import ZtoRGBpy
+
+
+def _frames(count=6, amplitude=(8.0, 1.0)):
+    random = np.random.RandomState(17)
+    for value in np.geomspace(amplitude[0], amplitude[1], count):
+        yield (random.normal(size=(9, 11)) + 1j * random.normal(size=(9, 11))) * value
+
+
+def _limits(frame):
+    return np.nanmin(np.abs(frame)), np.nanmax(np.abs(frame))
+
+
+@pytest.mark.parametrize('warmup', [1, 3, 10])
+def test_warmup_fits_scale_to_first_frames(warmup):
+    frames = list(_frames())
+    minima, maxima = zip(*(_limits(frame) for frame in frames[:warmup]))
+    scale = ZtoRGBpy.LogScale(min(minima), max(maxima))
+    results = list(ZtoRGBpy.remap_stream(_frames(), 'log', warmup=warmup, return_metadata=True))
+    assert len(results) == len(frames)
+    for frame, (rgb, used, _) in zip(frames, results):
+        assert repr(used) == repr(scale)
+        np.testing.assert_array_equal(rgb, ZtoRGBpy.remap(frame, scale))
+
+
+def test_warmup_copies_reused_buffers():
+    # The frames held during the warmup are copied, so a generator may reuse its buffer
+    frames = list(_frames())
+
+    def reused():
+        buffer = np.empty_like(frames[0])
+        for frame in frames:
+            buffer[...] = frame
+            yield buffer
+    expected = [rgb.copy() for rgb in ZtoRGBpy.remap_stream(frames, 'log', warmup=3)]
+    for rgb, reference in zip(ZtoRGBpy.remap_stream(reused(), 'log', warmup=3), expected):
+        np.testing.assert_array_equal(rgb, reference)
+
+
+@pytest.mark.parametrize('decay', [1.0, 0.8])
+def test_decay_follows_running_limits(decay):
+    frames = list(_frames())
+    results = list(ZtoRGBpy.remap_stream(_frames(), 'log', warmup=2, decay=decay, return_metadata=True))
+    minima, maxima = zip(*(_limits(frame) for frame in frames[:2]))
+    limits = min(minima), max(maxima)
+    for index, (frame, (rgb, used, _)) in enumerate(zip(frames, results)):
+        if index >= 2:
+            # The running limits are widened by the decay, then combined with those of the frame
+            frame_limits = _limits(frame)
+            limits = min(limits[0] / decay, frame_limits[0]), max(limits[1] * decay, frame_limits[1])
+        scale = ZtoRGBpy.LogScale(*limits)
+        assert repr(used) == repr(scale)
+        np.testing.assert_array_equal(rgb, ZtoRGBpy.remap(frame, scale))
+    if decay == 1.0:
+        # The range never shrinks, so stays that of the first frame of the decreasing signal
+        assert used.logmax == pytest.approx(np.log10(_limits(frames[0])[1]))
+    else:
+        assert used.logmax < np.log10(_limits(frames[0])[1])
+
+
+def test_fixed_scale_and_out():
+    scale = ZtoRGBpy.LinearScale(4.0)
+    out = np.empty((9, 11, 3))
+    for frame, rgb in zip(_frames(), ZtoRGBpy.remap_stream(_frames(), scale, out=out)):
+        assert rgb is out
+        np.testing.assert_array_equal(rgb, ZtoRGBpy.remap(frame, scale))
+
+
+def test_invalid_arguments():
+    with pytest.raises(ValueError):
+        ZtoRGBpy.remap_stream(_frames(), ZtoRGBpy.LinearScale(4.0), decay=0.5)
+    with pytest.raises(ValueError):
+        ZtoRGBpy.remap_stream(_frames(), 'log', warmup=0)
+    with pytest.raises(ValueError):
+        ZtoRGBpy.remap_stream(_frames(), 'log', decay=1.5)
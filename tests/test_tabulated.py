@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+"""Tests of the error of TabulatedScale"""
+import numpy as np
+import pytest
+
+import ZtoRGBpy
+
+
+class _SoftScale(ZtoRGBpy.Scale):
+    # An expensive scale of the magnitude only, without ticks
+    def __init__(self, vmax=1.0):
+        ZtoRGBpy.Scale.__init__(self)
+        self.mag = float(vmax)
+
+    def __call__(self, value):
+        magnitude = np.abs(value)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.where(magnitude > 0, value / magnitude, 0) * np.tanh(magnitude / self.mag)
+
+
+def _samples(vmin, vmax, spacing, count=20000, seed=23):
+    random = np.random.RandomState(seed)
+    if spacing == 'log':
+        magnitude = 10 ** random.uniform(np.log10(vmin), np.log10(vmax), count)
+    else:
+        magnitude = random.uniform(vmin, vmax, count)
+    return magnitude * np.exp(1j * random.uniform(-np.pi, np.pi, count))
+
+
+_SCALES = [(ZtoRGBpy.LinearScale(3.0), {}, (0.0, 3.0, 'linear')),
+           (ZtoRGBpy.LogScale(1e-3, 10.0), {}, (1e-3, 10.0, 'log')),
+           (_SoftScale(2.0), {'vmax': 6.0}, (0.0, 6.0, 'linear')),
+           (_SoftScale(2.0), {'vmin': 1e-2, 'vmax': 6.0, 'spacing': 'log'}, (1e-2, 6.0, 'log'))]
+
+
+@pytest.mark.parametrize('scale, options, interval', _SCALES)
+def test_max_error_bounds_error(scale, options, interval):
+    tabulated = ZtoRGBpy.TabulatedScale.from_scale(scale, **options)
+    assert 0 <= tabulated.max_error < 1e-5
+    # The reported error is estimated from random samples, other samples stay within it, up to the variation
+    # of the sampled maximum
+    values = _samples(*interval)
+    error = np.nanmax(np.abs(tabulated(values) - scale(values.copy())))
+    assert error <= tabulated.max_error * 1.1 + 1e-15
+
+
+@pytest.mark.parametrize('scale, options, interval', _SCALES[2:])
+def test_error_is_second_order(scale, options, interval):
+    # For linear interpolation of a smooth scale, the error falls by about 4 as the number of points is doubled,
+    # the built in scales are linear in the tabulated coordinate, so are tabulated exactly
+    coarse = ZtoRGBpy.TabulatedScale.from_scale(scale, n=256, **options)
+    fine = ZtoRGBpy.TabulatedScale.from_scale(scale, n=512, **options)
+    assert 3 < coarse.max_error / fine.max_error < 5
+
+
+@pytest.mark.parametrize('scale, options, interval', _SCALES)
+def test_tabulated_remap_and_ticks(scale, options, interval):
+    tabulated = ZtoRGBpy.TabulatedScale.from_scale(scale, **options)
+    values = _samples(*interval, count=1000).reshape(25, 40)
+    np.testing.assert_allclose(ZtoRGBpy.remap(values, tabulated), ZtoRGBpy.remap(values, scale), rtol=0,
+                               atol=10 * tabulated.max_error + 1e-12)
+    try:
+        expected = scale.ticks()
+    except NotImplementedError:
+        with pytest.raises(NotImplementedError):
+            tabulated.ticks()
+    else:
+        offsets, labels = tabulated.ticks()
+        np.testing.assert_array_equal(offsets, expected[0])
+        assert list(labels) == list(expected[1])
+
+
+def test_vmax_required():
+    with pytest.raises(ValueError):
+        ZtoRGBpy.TabulatedScale.from_scale(_SoftScale(2.0))
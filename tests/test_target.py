@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+"""Tests of remapping the changed regions of a RenderTarget"""
+import tracemalloc
+
+import numpy as np
+import pytest
+
+import ZtoRGBpy
+
+
+def _data(shape=(40, 30)):
+    random = np.random.RandomState(3)
+    return random.normal(size=shape) + 1j * random.normal(size=shape)
+
+
+def _change(data, region):
+    data[region] = 3 * data[region] + 1j
+
+
+@pytest.mark.parametrize('pixel_format', ['float', 'int', 'uint8', 'rgba32'])
+@pytest.mark.parametrize('regions', [None, np.s_[5:9, 7:20], [np.s_[:3], np.s_[10:12, -4:], np.s_[20:20]],
+                                     np.s_[30:]])
+def test_update_matches_remap(pixel_format, regions):
+    data = _data()
+    target = ZtoRGBpy.RenderTarget(data, 'log', pixel_format=pixel_format)
+    for region in [()] if regions is None else regions if isinstance(regions, list) else [regions]:
+        _change(data, region)
+    target.update(regions)
+    expected = ZtoRGBpy.remap(data, target.scale, pixel_format=pixel_format)
+    np.testing.assert_array_equal(target.rgb, expected)
+
+
+@pytest.mark.parametrize('pixel_format', ['float', 'uint8', 'rgba32'])
+@pytest.mark.parametrize('shape', [(40, 30), (12, 9, 10), (50,)])
+def test_update_mask_matches_remap(pixel_format, shape):
+    data = _data(shape)
+    target = ZtoRGBpy.RenderTarget(data, 'log', pixel_format=pixel_format)
+    mask = np.zeros(shape, bool)
+    mask[(slice(2, 6),) * len(shape)] = True
+    mask[(3,) * len(shape)] = False
+    mask[(7,) * len(shape)] = True
+    _change(data, mask)
+    # Values changed outside the mask aren't remapped
+    unmasked = np.zeros(shape, bool)
+    unmasked[(0,) * len(shape)] = True
+    _change(data, unmasked)
+    expected = ZtoRGBpy.remap(data, target.scale, pixel_format=pixel_format)
+    previous = target.rgb.copy()
+    boxes = target.update(mask)
+    assert boxes == [(slice(2, 8),) * len(shape)]
+    np.testing.assert_array_equal(target.rgb[mask], expected[mask])
+    np.testing.assert_array_equal(target.rgb[~mask], previous[~mask])
+    assert target.update(np.zeros(shape, bool)) == []
+
+
+@pytest.mark.parametrize('pixel_format', ['float', 'uint8'])
+def test_update_steady_state_allocation(pixel_format):
+    # The regions are mapped directly into rgb, or into a reused scratch buffer, rather than into new arrays
+    data = _data((600, 500))
+    target = ZtoRGBpy.RenderTarget(data, ZtoRGBpy.LogScale(0.01, 5.0), pixel_format=pixel_format)
+    mask = np.zeros(data.shape, bool)
+    mask[100:400, 50:450] = True
+    for regions in (np.s_[100:400, 50:450], mask):
+        target.update(regions)
+        tracemalloc.start()
+        try:
+            target.update(regions)
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+        assert peak < data[100:400, 50:450].real.nbytes // 4
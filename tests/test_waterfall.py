@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+"""Tests of the scrolling Waterfall image against a full remap"""
+import numpy as np
+import pytest
+
+import ZtoRGBpy
+
+
+def _rows(count, width, seed):
+    random = np.random.RandomState(seed)
+    return (random.normal(size=(count, width)) + 1j * random.normal(size=(count, width))) * 2
+
+
+def _expected(history, height, newest, scale, pixel_format):
+    """A full remap of the ``height`` most recent rows of ``history``, padded with zero rows, in display order"""
+    recent = np.zeros((height, history.shape[1]), complex)
+    count = min(height, history.shape[0])
+    recent[height - count:] = history[history.shape[0] - count:]
+    if newest == 'top':
+        recent = recent[::-1]
+    return ZtoRGBpy.remap(recent, scale, pixel_format=pixel_format)
+
+
+@pytest.mark.parametrize('pixel_format', ['float', 'uint8', 'rgba32'])
+@pytest.mark.parametrize('newest', ['top', 'bottom'])
+def test_ring_wrap_matches_remap(newest, pixel_format):
+    width, height = 13, 7
+    scale = ZtoRGBpy.LogScale(0.01, 10.0)
+    waterfall = ZtoRGBpy.Waterfall(width, height, scale, newest=newest, pixel_format=pixel_format)
+    history = np.empty((0, width), complex)
+    # Batches of single rows, several rows wrapping around the ring, and more rows than the height
+    for seed, count in enumerate([1, 3, 2, 5, 1, 6, 7, 11, 4, 0, 1]):
+        rows = _rows(count, width, seed)
+        rgb = waterfall.append(rows[0] if count == 1 else rows)
+        history = np.concatenate([history, rows])
+        expected = _expected(history, height, newest, scale, pixel_format)
+        np.testing.assert_array_equal(rgb, expected)
+        np.testing.assert_array_equal(waterfall.rgb, expected)
+
+
+def test_fitted_scale_and_clear():
+    width, height = 9, 5
+    waterfall = ZtoRGBpy.Waterfall(width, height, 'log', pixel_format='float')
+    first = _rows(3, width, 0)
+    waterfall.append(first)
+    scale = ZtoRGBpy.remap(first, 'log', return_metadata=True)[1]
+    assert repr(waterfall.scale) == repr(scale)
+    history = np.concatenate([first, _rows(4, width, 1)])
+    waterfall.append(history[3:])
+    np.testing.assert_array_equal(waterfall.rgb, _expected(history, height, 'top', scale, 'float'))
+    waterfall.clear()
+    np.testing.assert_array_equal(waterfall.rgb, _expected(history[:0], height, 'top', scale, 'float'))
@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+"""Tests of the scratch buffers kept by Workspace"""
+import gc
+import threading
+import tracemalloc
+
+import numpy as np
+import pytest
+
+import ZtoRGBpy
+
+
+def test_local_released_with_thread():
+    workspace = ZtoRGBpy.Workspace()
+    locals_ = []
+
+    def run():
+        locals_.append(workspace.local())
+        locals_[-1].get('buffer', (1000,), float)
+    threads = [threading.Thread(target=run) for _ in range(10)]
+    for thread in threads:
+        thread.start()
+        thread.join()
+    assert len({id(local) for local in locals_}) == 10
+    assert workspace.nbytes == 10 * 8000
+    del threads, thread, locals_
+    gc.collect()
+    assert workspace.nbytes == 0
+    assert workspace.local() is workspace.local()
+
+
+def test_remapper_workers_retains_no_thread_buffers():
+    data = np.exp(1j * np.linspace(0, 10, 512 * 512)).reshape(512, 512)
+    remapper = ZtoRGBpy.Remapper('log', workers=4, chunk_bytes=1 << 16)
+    remapper(data)
+    retained = remapper._workspace.nbytes
+    for _ in range(20):
+        remapper(data)
+    gc.collect()
+    assert remapper._workspace.nbytes == retained
+
+
+@pytest.mark.parametrize('pixel_format', ['float', 'uint8'])
+@pytest.mark.parametrize('real', [False, True])
+@pytest.mark.parametrize('scale', [ZtoRGBpy.LinearScale(3.0), ZtoRGBpy.LogScale(0.01, 5.0)])
+def test_remapper_steady_state_allocation(scale, real, pixel_format):
+    # Once the workspace holds its buffers, mapping into out allocates nothing of the size of the data, only
+    # numpy's fixed size casting buffers
+    y, x = np.mgrid[-1:1:600j, -1:1:515j]
+    data = (x + 1j * y) * 3
+    if real:
+        data = data.real.copy()
+    remapper = ZtoRGBpy.Remapper(scale, pixel_format=pixel_format)
+    out = remapper(data)
+    remapper(data, out=out)
+    tracemalloc.start()
+    try:
+        remapper(data, out=out)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    assert peak < x.nbytes // 4